@@ -0,0 +1,230 @@
+"""
+Benchmark: méthodes de lecture et d'écriture de DatabaseManager.
+
+Chaque scénario appelle une méthode `--repetitions` fois (après un appel
+d'échauffement non compté) avec des paramètres tirés de la base par une graine
+fixe, puis rapporte min / moyenne / p50 / p95 / max en ms et, d'après
+instrumentation.py, la répartition médiane entre attente du pool, exécution et
+lecture des résultats. Le rapport JSON (volumes des tables, version du
+serveur, commit) se compare d'un commit à l'autre avec `--comparer`.
+
+Les scénarios d'écriture modifient la base (chaque appel de
+majMontantEtHistorique porte sur une autre facture, chaque abrogate_contract
+termine un autre contrat) : à lancer sur une base de test remplie par
+benchmarks/donnees.py.
+
+`--base` est obligatoire et doit différer de la base de l'application
+(config.json) : l'outil refuse de tourner sur la base de production.
+
+Usage (depuis la racine du projet):
+    python benchmarks/bench_bd.py --base Planificator_bench [--repetitions 20]
+                                  [--sortie rapport.json] [--comparer ancien.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from instrumentation import mesures  # noqa: E402
+
+TABLES = ['Client', 'Contrat', 'Traitement', 'Planning', 'PlanningDetails', 'Facture', 'Remarque',
+          'Historique_prix']
+CATEGORIES = ['PC', 'NI: Nettoyage Industriel', 'AT: Anti termites', 'RO: Ramassage Ordures']
+
+
+def _quantile(valeurs, q):
+    return valeurs[min(len(valeurs) - 1, int(q * len(valeurs)))]
+
+
+def resumer(durees):
+    durees = sorted(durees)
+    return {'compte': len(durees), 'min': durees[0], 'moyenne': sum(durees) / len(durees),
+            'p50': _quantile(durees, 0.5), 'p95': _quantile(durees, 0.95), 'max': durees[-1]}
+
+
+def commit():
+    try:
+        sortie = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=RACINE,
+                                capture_output=True, text=True, check=True)
+        return sortie.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def choisir_base(config, base):
+    """Vise la base de test `base` ; refuse la base configurée pour l'application."""
+    production = config.get('base', "Planificator")
+    if base.casefold() == production.casefold():
+        raise SystemExit(f"❌ {base} est la base de l'application (config.json) : indiquer une base de test")
+    config['base'] = base
+
+
+async def lignes(database, requete, parametres=()):
+    async with database.pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(requete, parametres)
+            lignes = await cur.fetchall()
+        await conn.commit()
+    return lignes
+
+
+async def echantillons(database, graine, nombre):
+    """Paramètres des scénarios, identiques d'une exécution à l'autre sur les mêmes données."""
+    clients = await lignes(database, """
+        SELECT c.client_id, c.nom, MIN(tt.typeTraitement)
+        FROM Client c
+        JOIN Contrat co ON co.client_id = c.client_id
+        JOIN Traitement t ON t.contrat_id = co.contrat_id
+        JOIN TypeTraitement tt ON tt.id_type_traitement = t.id_type_traitement
+        GROUP BY c.client_id, c.nom
+        ORDER BY RAND(%s) LIMIT %s""", (graine, nombre))
+    factures = await lignes(database, """
+        SELECT facture_id, montant FROM Facture
+        WHERE etat = 'À venir' ORDER BY RAND(%s) LIMIT %s""", (graine, nombre + 1))
+    # Une date de planning par contrat actif : chaque abrogation porte sur un contrat différent
+    abrogations = await lignes(database, """
+        SELECT MIN(pd.planning_detail_id)
+        FROM Contrat co
+        JOIN Traitement t ON t.contrat_id = co.contrat_id
+        JOIN Planning p ON p.traitement_id = t.traitement_id
+        JOIN PlanningDetails pd ON pd.planning_id = p.planning_id
+        WHERE co.statut_contrat = 'Actif'
+        GROUP BY co.contrat_id
+        ORDER BY RAND(%s) LIMIT %s""", (graine, nombre + 1))
+    if not clients or not factures or not abrogations:
+        raise RuntimeError("Base vide : la remplir d'abord avec benchmarks/donnees.py")
+    return clients, factures, [ligne[0] for ligne in abrogations]
+
+
+def scenarios(database, clients, factures, abrogations, alea):
+    """{méthode: fabrique} ; chaque appel de la fabrique retourne une coroutine (un appel de la méthode)."""
+    aujourdhui = date.today()
+    mois = [(aujourdhui.year + (aujourdhui.month - 1 + d) // 12, (aujourdhui.month - 1 + d) % 12 + 1)
+            for d in range(-6, 6)]
+    client = lambda: clients[alea.randrange(len(clients))]  # noqa: E731
+    factures = iter(factures)
+    abrogations = iter(abrogations)
+
+    def facture_client():
+        client_id, _, traitement = client()
+        return database.get_facture(client_id, traitement)
+
+    async def maj_montant():
+        facture_id, montant = next(factures)
+        await database.majMontantEtHistorique(facture_id, montant, montant + 1000, 'benchmark')
+
+    return {
+        # Lectures
+        'traitement_en_cours': lambda: database.traitement_en_cours(*alea.choice(mois)),
+        'traitement_prevision': lambda: database.traitement_prevision(*alea.choice(mois)),
+        'get_client': lambda: database.get_client(),
+        'get_all_client': lambda: database.get_all_client(),
+        'get_all_planning': lambda: database.get_all_planning(),
+        'get_historic': lambda: database.get_historic(alea.choice(CATEGORIES)),
+        'get_historic_par_client': lambda: database.get_historic_par_client(client()[1]),
+        'get_facture': facture_client,
+        'traitement_par_client': lambda: database.traitement_par_client(client()[0]),
+        # Exports Excel
+        'get_factures_data_for_client_comprehensive':
+            lambda: database.get_factures_data_for_client_comprehensive(client()[1]),
+        'obtenirDataFactureClient': lambda: database.obtenirDataFactureClient(client()[1], *alea.choice(mois)),
+        'get_traitements_for_month': lambda: database.get_traitements_for_month(*alea.choice(mois)),
+        # Écritures
+        'majMontantEtHistorique': maj_montant,
+        'abrogate_contract': lambda: database.abrogate_contract(next(abrogations)),
+    }
+
+
+async def mesurer(nom, fabrique, repetitions):
+    await fabrique()  # Échauffement (caches du serveur, préparation)
+    mesures.reinitialiser()
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        await fabrique()
+        durees.append((time.perf_counter() - debut) * 1000)
+    resultat = resumer(durees)
+    # Répartition médiane d'après l'instrumentation
+    phases = mesures.resume().get(nom)
+    if phases is not None:
+        resultat['phases_p50'] = {phase: phases[phase]['p50']
+                                  for phase in ('attente_pool', 'execution', 'lecture')}
+        resultat['lignes_p50'] = phases['lignes']['p50']
+    return resultat
+
+
+async def executer(database, repetitions, graine, selection=None):
+    clients, factures, abrogations = await echantillons(database, graine, repetitions)
+    rapport = {
+        'horodatage': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit(),
+        'python': platform.python_version(),
+        'serveur': (await lignes(database, "SELECT VERSION()"))[0][0],
+        'graine': graine,
+        'repetitions': repetitions,
+        'volumes': {table: (await lignes(database, f"SELECT COUNT(*) FROM {table}"))[0][0] for table in TABLES},
+        'methodes': {},
+    }
+    for nom, fabrique in scenarios(database, clients, factures, abrogations, random.Random(graine)).items():
+        if selection and nom not in selection:
+            continue
+        rapport['methodes'][nom] = resultat = await mesurer(nom, fabrique, repetitions)
+        print(f"  {nom:<44} p50 {resultat['p50']:9.1f} ms   p95 {resultat['p95']:9.1f} ms")
+    return rapport
+
+
+def comparer(ancien, nouveau):
+    print(f"\nComparaison avec {ancien.get('commit')} ({ancien.get('horodatage')})")
+    if ancien.get('volumes') != nouveau.get('volumes'):
+        print("  ⚠️ Volumes différents : comparaison indicative")
+    for nom, resultat in nouveau['methodes'].items():
+        reference = ancien['methodes'].get(nom)
+        if reference is None:
+            continue
+        ecart = (resultat['p50'] - reference['p50']) / reference['p50'] * 100 if reference['p50'] else 0.0
+        print(f"  {nom:<44} p50 {reference['p50']:9.1f} → {resultat['p50']:9.1f} ms  ({ecart:+.0f} %)")
+
+
+async def _principal(arguments):
+    from setting_bd import DatabaseManager, config
+
+    choisir_base(config, arguments.base)
+    # Les messages INFO par appel ne font pas partie de ce qui est mesuré
+    logging.getLogger('setting_bd').setLevel(logging.WARNING)
+    database = DatabaseManager(asyncio.get_running_loop())
+    await database.connect()
+    try:
+        rapport = await executer(database, arguments.repetitions, arguments.graine, arguments.methodes)
+    finally:
+        await database.close()
+
+    sortie = arguments.sortie or os.path.join(
+        RACINE, 'benchmarks', 'resultats', f"bd_{rapport['commit'] or 'inconnu'}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2, default=str)
+    print(f"📄 Rapport : {sortie}")
+    if arguments.comparer:
+        with open(arguments.comparer, encoding='utf-8') as f:
+            comparer(json.load(f), rapport)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mesure les méthodes de DatabaseManager sur une base de test")
+    parser.add_argument('--repetitions', type=int, default=20)
+    parser.add_argument('--graine', type=int, default=1)
+    parser.add_argument('--base', required=True, help="Base de test mesurée (pas celle de config.json)")
+    parser.add_argument('--methodes', nargs='*', help="Limiter aux scénarios nommés")
+    parser.add_argument('--sortie', help="Fichier du rapport JSON (par défaut benchmarks/resultats/)")
+    parser.add_argument('--comparer', help="Rapport JSON d'un autre commit à comparer")
+    asyncio.run(_principal(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""
+Benchmark: génération de 10 000 dates de planning.
+
+Compare l'ancienne méthode de planning_per_year (jours_feries recalculé pour
+chaque date puis parcours linéaire de feries.values()) avec ajuster_dates
+(ensembles de fériés mis en cache par année).
+
+Usage (depuis la racine du projet):
+    python benchmarks/bench_dates.py [nombre_de_dates]
+"""
+import calendar
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tester_date import ajuster_dates, ajuster_si_weekend, feries_annee, jours_feries  # noqa: E402
+
+
+def ajouter_mois(date_depart, nombre_mois):
+    mois = date_depart.month - 1 + nombre_mois
+    annee = date_depart.year + mois // 12
+    mois = mois % 12 + 1
+    return date(annee, mois, min(date_depart.day, calendar.monthrange(annee, mois)[1]))
+
+
+def dates_brutes(nombre):
+    """Plannings mensuels de 12 dates, un nouveau planning chaque jour à partir de 2025."""
+    debut = date(2025, 1, 1)
+    dates = []
+    planning = 0
+    while len(dates) < nombre:
+        depart = debut + timedelta(days=planning)
+        dates.extend(ajouter_mois(depart, i) for i in range(12))
+        planning += 1
+    return dates[:nombre]
+
+
+def ancienne_methode(dates):
+    resultat = []
+    for jour in dates:
+        jour = ajuster_si_weekend(jour)
+        feries = jours_feries(jour.year)
+        while jour in feries.values():
+            jour += timedelta(days=1)
+        resultat.append(jour)
+    return resultat
+
+
+def mesurer(fonction, dates, repetitions=5):
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        feries_annee.cache_clear()  # Inclut le coût de remplissage du cache
+        debut = time.perf_counter()
+        fonction(dates)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main():
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    dates = dates_brutes(nombre)
+
+    ancien = mesurer(ancienne_methode, dates)
+    nouveau = mesurer(ajuster_dates, dates)
+
+    print(f"{nombre} dates de planning")
+    print(f"  jours_feries par date : {ancien * 1000:8.2f} ms")
+    print(f"  ajuster_dates         : {nouveau * 1000:8.2f} ms  (x{ancien / nouveau:.1f})")
+
+
+if __name__ == '__main__':
+    main()
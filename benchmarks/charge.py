@@ -0,0 +1,255 @@
+"""
+Simulation de charge : plusieurs postes de travail sur un même serveur MySQL.
+
+Chaque poste simulé a son propre DatabaseManager (donc son propre pool) et
+enchaîne, avec une pause aléatoire (loi exponentielle de moyenne `--pause`)
+entre deux actions, un mélange proche de l'usage réel :
+
+  - tableau_de_bord : traitement_en_cours + traitement_prevision du mois ;
+  - remarque        : create_remarque, update_etat_planning, update_etat_facture ;
+  - prix            : majMontantEtHistorique ;
+  - nouveau_contrat : create_full_contract (un traitement, 12 dates).
+
+Remarques et changements de prix visent les dates du mois en cours, comme en
+exploitation : les postes se disputent les mêmes lignes. Le rapport donne le
+débit, les percentiles de latence par action, les interblocages et attentes
+de verrou expirées (compteurs du serveur) et les réessais de DatabaseManager.
+
+Une action compte comme erreur si elle lève une exception, retourne False ou
+si l'une de ses requêtes échoue : create_remarque, update_etat_facture et
+majMontantEtHistorique journalisent leurs erreurs sans les propager, les
+échecs sont donc relevés par l'instrumentation (instrumentation.echecs_sql).
+Une requête réessayée avec succès (interblocage) compte aussi ; le rapport
+donne le détail des échecs par code d'erreur.
+
+Tous les postes tournent sur la boucle asyncio de ce processus ; au-delà
+d'une dizaine, lancer plusieurs instances pour que le client ne soit pas le
+goulot. Les réglages du pool et des verrous viennent de config.json
+("pool_min", "pool_max", "attente_verrou_s") ou des options du même nom.
+
+À lancer sur une base de test remplie par benchmarks/donnees.py : la
+simulation écrit dans la base, `--base` est obligatoire et la base configurée
+pour l'application est refusée.
+
+Usage (depuis la racine du projet):
+    python benchmarks/charge.py --base Planificator_bench --postes 8 --duree 120 [--pause 1.0] [--pool-max 5]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_bd import RACINE, choisir_base, commit, lignes, resumer  # noqa: E402
+from instrumentation import echecs_sql  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Poids relatifs des actions d'un poste
+MELANGE = {'tableau_de_bord': 60, 'remarque': 20, 'prix': 15, 'nouveau_contrat': 5}
+
+
+async def compteurs_serveur(database):
+    """{'interblocages', 'attentes_expirees'} cumulés par le serveur (None si indisponible)."""
+    try:
+        valeurs = dict(await lignes(database, """
+            SELECT NAME, COUNT FROM information_schema.INNODB_METRICS
+            WHERE NAME IN ('lock_deadlocks', 'lock_timeouts')"""))
+        if 'lock_deadlocks' in valeurs:
+            return {'interblocages': valeurs['lock_deadlocks'], 'attentes_expirees': valeurs.get('lock_timeouts')}
+    except Exception:
+        pass
+    try:
+        # MariaDB
+        statut = await lignes(database, "SHOW GLOBAL STATUS LIKE 'Innodb_deadlocks'")
+        return {'interblocages': int(statut[0][1]), 'attentes_expirees': None}
+    except Exception:
+        return {'interblocages': None, 'attentes_expirees': None}
+
+
+class Poste:
+    """Un poste de travail simulé."""
+
+    def __init__(self, numero, database, alea, cibles):
+        self.numero = numero
+        self.database = database
+        self.alea = alea
+        self.cibles = cibles  # [(client_id, planning_detail_id, facture_id, montant)] du mois en cours
+        self.durees = {action: [] for action in MELANGE}
+        self.erreurs = {action: 0 for action in MELANGE}
+        self.echecs = Counter()  # requêtes en échec par code d'erreur
+        self._contrats = 0
+
+    async def tableau_de_bord(self):
+        aujourdhui = date.today()
+        await asyncio.gather(self.database.traitement_en_cours(aujourdhui.year, aujourdhui.month),
+                             self.database.traitement_prevision(aujourdhui.year, aujourdhui.month))
+        return True
+
+    async def remarque(self):
+        client_id, detail_id, facture_id, _ = self.alea.choice(self.cibles)
+        await self.database.create_remarque(client_id, detail_id, facture_id, "Traitement effectué", None,
+                                            "Contrôle de routine")
+        effectue = await self.database.update_etat_planning(detail_id)
+        await self.database.update_etat_facture(facture_id, f"F-{self.numero}-{detail_id}", 'Espèce', None,
+                                                date.today(), None)
+        return effectue
+
+    async def prix(self):
+        _, _, facture_id, montant = self.alea.choice(self.cibles)
+        return await self.database.majMontantEtHistorique(facture_id, montant, montant + 1000,
+                                                          f"poste {self.numero}")
+
+    async def nouveau_contrat(self):
+        self._contrats += 1
+        suffixe = f"{self.numero}-{self._contrats}-{time.time_ns()}"
+        jour = date.today()
+        dates = [date(jour.year + (jour.month - 1 + i) // 12, (jour.month - 1 + i) % 12 + 1, 10) for i in range(12)]
+        await self.database.create_full_contract({
+            'client': {'nom': f"Charge {suffixe}", 'prenom': 'Test', 'email': f"charge{suffixe}@exemple.mg",
+                       'telephone': '0340000000', 'adresse': 'Antananarivo', 'date_ajout': jour,
+                       'categorie': 'Particulier', 'axe': 'Centre (C)', 'nif': None, 'stat': None},
+            'contrat': {'reference': f"L{suffixe}"[:20], 'date_contrat': jour, 'date_debut': jour,
+                        'date_fin': 'Indéterminée', 'duree_contrat': None, 'duree': 'Indeterminée',
+                        'categorie': 'Nouveau'},
+            'traitements': [{'categorie': 'PC', 'type': 'Dératisation (PC)', 'montant': 100000,
+                             'axe': 'Centre (C)',
+                             'planning': {'date_debut': jour, 'mois_debut': jour.month, 'mois_fin': 0,
+                                          'redondance': 1, 'date_fin': dates[-1]},
+                             'dates': dates}],
+        })
+        return True
+
+    async def travailler(self, fin, pause):
+        actions, poids = zip(*MELANGE.items())
+        while time.monotonic() < fin:
+            await asyncio.sleep(self.alea.expovariate(1 / pause) if pause else 0)
+            action = self.alea.choices(actions, poids)[0]
+            debut = time.perf_counter()
+            with echecs_sql() as echecs:
+                try:
+                    succes = await getattr(self, action)()
+                except Exception as e:
+                    logger.warning(f"⚠️ Poste {self.numero} - {action}: {e}")
+                    succes = False
+            self.durees[action].append((time.perf_counter() - debut) * 1000)
+            self.echecs.update(echecs)
+            if succes is False or echecs:
+                self.erreurs[action] += 1
+
+
+async def simuler(nombre_postes, duree, pause, graine=1):
+    from setting_bd import DatabaseManager, compteurs_reessais
+
+    boucle = asyncio.get_running_loop()
+    bases = [DatabaseManager(boucle) for _ in range(nombre_postes)]
+    for database in bases:
+        await database.connect()
+    try:
+        aujourdhui = date.today()
+        cibles = await lignes(bases[0], """
+            SELECT co.client_id, pd.planning_detail_id, f.facture_id, f.montant
+            FROM PlanningDetails pd
+            JOIN Facture f ON f.planning_detail_id = pd.planning_detail_id
+            JOIN Planning p ON p.planning_id = pd.planning_id
+            JOIN Traitement t ON t.traitement_id = p.traitement_id
+            JOIN Contrat co ON co.contrat_id = t.contrat_id
+            WHERE YEAR(pd.date_planification) = %s AND MONTH(pd.date_planification) = %s
+            LIMIT 2000""", (aujourdhui.year, aujourdhui.month))
+        if not cibles:
+            raise RuntimeError("Aucune date ce mois-ci : remplir la base avec benchmarks/donnees.py")
+
+        serveur_avant = await compteurs_serveur(bases[0])
+        compteurs_reessais.clear()
+        postes = [Poste(i + 1, database, random.Random(graine + i), cibles) for i, database in enumerate(bases)]
+        debut = time.monotonic()
+        await asyncio.gather(*(poste.travailler(debut + duree, pause) for poste in postes))
+        ecoule = time.monotonic() - debut
+        serveur_apres = await compteurs_serveur(bases[0])
+        reessais = bases[0].statistiques_reessais()
+    finally:
+        for database in bases:
+            await database.close()
+
+    actions = {}
+    for action in MELANGE:
+        durees = [d for poste in postes for d in poste.durees[action]]
+        if durees:
+            actions[action] = {**resumer(durees), 'erreurs': sum(poste.erreurs[action] for poste in postes)}
+    toutes = [d for poste in postes for durees in poste.durees.values() for d in durees]
+    echecs = sum((poste.echecs for poste in postes), Counter())
+    return {
+        'duree_s': ecoule,
+        'debit_par_s': len(toutes) / ecoule,
+        'global': resumer(toutes) if toutes else None,
+        'actions': actions,
+        'serveur': {cle: (serveur_apres[cle] - serveur_avant[cle]
+                          if serveur_apres[cle] is not None and serveur_avant[cle] is not None else None)
+                    for cle in serveur_avant},
+        'reessais': reessais,
+        'requetes_en_echec': {str(code): nombre for code, nombre in echecs.most_common()},
+    }
+
+
+async def _principal(arguments):
+    from setting_bd import config
+
+    choisir_base(config, arguments.base)
+    for option, cle in (('pool_min', 'pool_min'), ('pool_max', 'pool_max'),
+                        ('attente_verrou', 'attente_verrou_s')):
+        if getattr(arguments, option) is not None:
+            config[cle] = getattr(arguments, option)
+    logging.getLogger('setting_bd').setLevel(logging.WARNING)
+
+    resultat = await simuler(arguments.postes, arguments.duree, arguments.pause, arguments.graine)
+    rapport = {
+        'horodatage': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit(),
+        'postes': arguments.postes,
+        'pause_s': arguments.pause,
+        'melange': MELANGE,
+        'reglages': {cle: config.get(cle) for cle in ('pool_min', 'pool_max', 'attente_verrou_s')},
+        **resultat,
+    }
+
+    print(f"{arguments.postes} poste(s), {rapport['duree_s']:.0f} s : {rapport['debit_par_s']:.1f} action(s)/s")
+    for action, stats in rapport['actions'].items():
+        print(f"  {action:<16} {stats['compte']:>6}  p50 {stats['p50']:8.1f} ms  p95 {stats['p95']:8.1f} ms  "
+              f"max {stats['max']:8.1f} ms  erreurs {stats['erreurs']}")
+    print(f"  interblocages {rapport['serveur']['interblocages']}, "
+          f"attentes de verrou expirées {rapport['serveur']['attentes_expirees']}, "
+          f"réessais {sum(c.get('reessais', 0) for c in rapport['reessais'].values())}")
+    if rapport['requetes_en_echec']:
+        print("  requêtes en échec : " + ', '.join(f"{code} × {nombre}"
+                                                  for code, nombre in rapport['requetes_en_echec'].items()))
+
+    sortie = arguments.sortie or os.path.join(
+        RACINE, 'benchmarks', 'resultats',
+        f"charge_{rapport['commit'] or 'inconnu'}_{arguments.postes}p_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2, default=str)
+    print(f"📄 Rapport : {sortie}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simule plusieurs postes de travail sur la même base")
+    parser.add_argument('--postes', type=int, default=8)
+    parser.add_argument('--duree', type=float, default=60, help="Durée de la simulation (secondes)")
+    parser.add_argument('--pause', type=float, default=1.0, help="Pause moyenne entre deux actions (secondes)")
+    parser.add_argument('--graine', type=int, default=1)
+    parser.add_argument('--base', required=True,
+                        help="Base de test visée (la base de config.json est refusée)")
+    parser.add_argument('--pool-min', dest='pool_min', type=int)
+    parser.add_argument('--pool-max', dest='pool_max', type=int)
+    parser.add_argument('--attente-verrou', dest='attente_verrou', type=int,
+                        help="innodb_lock_wait_timeout des connexions (secondes)")
+    parser.add_argument('--sortie', help="Fichier du rapport JSON (par défaut benchmarks/resultats/)")
+    asyncio.run(_principal(parser.parse_args()))
@@ -0,0 +1,204 @@
+"""
+Jeu de données synthétique pour mesurer DatabaseManager à l'échelle.
+
+Remplit une base créée avec scripts/Planificator.sql puis scripts/Migration.sql
+(index) : clients, contrats (un traitement et un planning chacun), dates de
+planning (une facture par date) et remarques sur une partie des dates
+effectuées. Les identifiants sont fixés par le script et les valeurs tirées
+d'un générateur initialisé par `--graine` : deux bases remplies avec les mêmes
+volumes et la même graine sont identiques.
+
+À lancer sur une base de test, jamais sur la base de production : `--vider`
+vide toutes les tables métier avant de remplir. La base visée est donnée par
+`--base`, obligatoire ; le script refuse la base de l'application (config.json).
+
+Les scripts SQL visent la base Planificator par leur nom : les rediriger
+vers la base de test (Planificator.sql commence par DROP DATABASE).
+
+Usage (depuis la racine du projet):
+    sed 's/Planificator;/Planificator_bench;/' scripts/Planificator.sql | mysql -u root -p
+    sed 's/Planificator;/Planificator_bench;/' scripts/Migration.sql | mysql -u root -p
+    python benchmarks/donnees.py --base Planificator_bench --clients 10000 --contrats 30000 --details 1000000 --vider
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_bd import choisir_base  # noqa: E402
+from recurrence import ajouter_mois  # noqa: E402
+
+TAILLE_LOT = 5000
+
+TYPES_TRAITEMENT = [
+    ('PC', 'Dératisation (PC)'),
+    ('PC', 'Désinfection (PC)'),
+    ('PC', 'Désinsectisation (PC)'),
+    ('PC', 'Fumigation (PC)'),
+    ('NI: Nettoyage Industriel', 'Nettoyage industriel (NI)'),
+    ('AT: Anti termites', 'Anti termites (AT)'),
+    ('RO: Ramassage Ordures', 'Ramassage ordures (RO)'),
+]
+AXES = ['Nord (N)', 'Sud (S)', 'Est (E)', 'Ouest (O)', 'Centre (C)']
+CATEGORIES_CLIENT = ['Particulier', 'Organisation', 'Société']
+MODES = ['Chèque', 'Espèce', 'Mobile Money', 'Virement']
+# Tables vidées par --vider
+TABLES = ['Historique', 'Signalement', 'Remarque', 'Historique_prix', 'Facture', 'PlanningDetails',
+          'Planning', 'Traitement', 'Contrat', 'Client', 'TypeTraitement']
+
+
+def clients(alea, nombre, debut):
+    for client_id in range(1, nombre + 1):
+        categorie = alea.choice(CATEGORIES_CLIENT)
+        societe = categorie != 'Particulier'
+        yield (client_id, f"Client {client_id:06d}", f"Prénom {client_id}", f"client{client_id}@exemple.mg",
+               f"034{alea.randrange(10 ** 7):07d}", f"Lot {alea.randrange(1, 999)} Antananarivo",
+               f"NIF{client_id:08d}" if societe else None, f"STAT{client_id:08d}" if societe else None,
+               debut + timedelta(days=alea.randrange(365)), categorie, alea.choice(AXES))
+
+
+def contrats(alea, nombre, nombre_clients, debut):
+    """(contrat, traitement, planning) : un traitement et un planning par contrat."""
+    for contrat_id in range(1, nombre + 1):
+        # Chaque client a au moins un contrat, le reste est réparti au hasard
+        client_id = contrat_id if contrat_id <= nombre_clients else alea.randrange(1, nombre_clients + 1)
+        date_debut = debut + timedelta(days=alea.randrange(730))
+        determinee = alea.random() < 0.3
+        redondance = alea.choice((1, 1, 1, 2, 3, 6))
+        yield ((contrat_id, client_id, f"C{contrat_id:07d}", date_debut, date_debut,
+                str(ajouter_mois(date_debut, 12)) if determinee else 'Indéterminée', 'Actif',
+                12 if determinee else None, 'Déterminée' if determinee else 'Indeterminée',
+                alea.choice(('Nouveau', 'Renouvellement'))),
+               (contrat_id, contrat_id, alea.randrange(1, len(TYPES_TRAITEMENT) + 1)),
+               (contrat_id, contrat_id, date_debut, date_debut.month, 12, 12, redondance, None))
+
+
+def details(alea, nombre, plannings, aujourdhui):
+    """(date de planning, facture, remarque ou None), répartis également entre les plannings."""
+    par_planning, reste = divmod(nombre, len(plannings))
+    detail_id = 0
+    for planning_id, client_id, date_debut, redondance, axe in plannings:
+        montant = alea.randrange(50, 500) * 1000
+        for rang in range(par_planning + (planning_id <= reste)):
+            detail_id += 1
+            jour = ajouter_mois(date_debut, rang * redondance)
+            passe = jour < aujourdhui
+            etat = ('Payé' if alea.random() < 0.9 else 'Non payé') if passe else 'À venir'
+            remarque = None
+            if passe and alea.random() < 0.1:
+                remarque = (detail_id, client_id, detail_id, detail_id, "Traitement effectué", None,
+                            "Contrôle de routine")
+            yield ((detail_id, planning_id, jour, 'Effectué' if passe else 'À venir'),
+                   (detail_id, detail_id, f"F{detail_id:09d}", montant, alea.choice(MODES) if etat == 'Payé' else None,
+                    jour, etat, axe),
+                   remarque)
+
+
+async def inserer(conn, requete, lignes):
+    total = 0
+    lignes = iter(lignes)
+    async with conn.cursor() as cur:
+        while lot := list(islice(lignes, TAILLE_LOT)):
+            await cur.executemany(requete, lot)
+            await conn.commit()
+            total += len(lot)
+    return total
+
+
+async def remplir(database, nombre_clients, nombre_contrats, nombre_details, graine=1, vider=False):
+    """Remplit la base ; retourne {table: lignes insérées}."""
+    alea = random.Random(graine)
+    debut = date(2023, 1, 1)
+    aujourdhui = date.today()
+    inserees = {}
+    async with database.pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+            if vider:
+                for table in TABLES:
+                    await cur.execute(f"TRUNCATE TABLE {table}")
+            await cur.execute("SELECT COUNT(*) FROM Client")
+            if (await cur.fetchone())[0]:
+                raise RuntimeError("La table Client n'est pas vide (relancer avec --vider sur une base de test)")
+
+        inserees['TypeTraitement'] = await inserer(
+            conn, "INSERT INTO TypeTraitement (id_type_traitement, categorieTraitement, typeTraitement) "
+                  "VALUES (%s, %s, %s)",
+            [(i, categorie, type_) for i, (categorie, type_) in enumerate(TYPES_TRAITEMENT, 1)])
+
+        lignes_clients = list(clients(alea, nombre_clients, debut))
+        inserees['Client'] = await inserer(
+            conn, "INSERT INTO Client (client_id, nom, prenom, email, telephone, adresse, nif, stat, date_ajout, "
+                  "categorie, axe) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", lignes_clients)
+
+        lignes_contrats = list(contrats(alea, nombre_contrats, nombre_clients, debut))
+        inserees['Contrat'] = await inserer(
+            conn, "INSERT INTO Contrat (contrat_id, client_id, reference_contrat, date_contrat, date_debut, "
+                  "date_fin, statut_contrat, duree_contrat, duree, categorie) "
+                  "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", (c for c, _, _ in lignes_contrats))
+        inserees['Traitement'] = await inserer(
+            conn, "INSERT INTO Traitement (traitement_id, contrat_id, id_type_traitement) VALUES (%s, %s, %s)",
+            (t for _, t, _ in lignes_contrats))
+        inserees['Planning'] = await inserer(
+            conn, "INSERT INTO Planning (planning_id, traitement_id, date_debut_planification, mois_debut, "
+                  "mois_fin, duree_traitement, redondance, date_fin_planification) "
+                  "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", (p for _, _, p in lignes_contrats))
+
+        axes = {c[0]: c[10] for c in lignes_clients}
+        plannings = [(p[0], c[1], p[2], p[6], axes[c[1]]) for c, _, p in lignes_contrats]
+        del lignes_clients, lignes_contrats
+        # Les trois tables sont générées ensemble : la génération est rejouée (même graine) pour chacune
+        for table, rang, requete in (
+                ('PlanningDetails', 0, "INSERT INTO PlanningDetails (planning_detail_id, planning_id, "
+                                       "date_planification, statut) VALUES (%s, %s, %s, %s)"),
+                ('Facture', 1, "INSERT INTO Facture (facture_id, planning_detail_id, reference_facture, montant, "
+                               "mode, date_traitement, etat, axe) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"),
+                ('Remarque', 2, "INSERT INTO Remarque (remarque_id, client_id, planning_detail_id, facture_id, "
+                                "contenu, issue, action) VALUES (%s, %s, %s, %s, %s, %s, %s)")):
+            alea_details = random.Random(graine + 1)
+            inserees[table] = await inserer(
+                conn, requete, (ligne[rang] for ligne in details(alea_details, nombre_details, plannings, aujourdhui)
+                                if ligne[rang] is not None))
+
+        async with conn.cursor() as cur:
+            await cur.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+            for table in ('Client', 'Contrat', 'PlanningDetails', 'Facture'):
+                await cur.execute(f"ANALYZE TABLE {table}")
+                await cur.fetchall()
+    return inserees
+
+
+async def _principal(arguments):
+    from setting_bd import DatabaseManager, config
+
+    choisir_base(config, arguments.base)
+    database = DatabaseManager(asyncio.get_running_loop())
+    await database.connect()
+    try:
+        debut = time.perf_counter()
+        inserees = await remplir(database, arguments.clients, arguments.contrats, arguments.details,
+                                 arguments.graine, arguments.vider)
+        duree = time.perf_counter() - debut
+        for table, nombre in inserees.items():
+            print(f"  {table:<16} {nombre:>10}")
+        print(f"✅ {sum(inserees.values())} ligne(s) insérée(s) en {duree:.1f} s")
+    finally:
+        await database.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Remplit une base de test avec des données synthétiques")
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--contrats', type=int, default=30_000)
+    parser.add_argument('--details', type=int, default=1_000_000,
+                        help="Dates de planning (une facture par date)")
+    parser.add_argument('--graine', type=int, default=1)
+    parser.add_argument('--base', required=True, help="Base de test à remplir (pas celle de config.json)")
+    parser.add_argument('--vider', action='store_true', help="Vide les tables métier avant de remplir")
+    asyncio.run(_principal(parser.parse_args()))
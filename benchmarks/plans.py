@@ -0,0 +1,177 @@
+"""
+Contrôle des plans d'exécution des requêtes du registre (requetes.py).
+
+Chaque requête passe par EXPLAIN FORMAT=JSON avec ses paramètres d'exemple,
+sur une base remplie par benchmarks/donnees.py. Sont relevés, sur les tables
+dont l'estimation dépasse `--seuil` lignes :
+
+  - les parcours complets de table (access_type ALL) ;
+  - les tris sans index (filesort) ;
+  - les tables temporaires (GROUP BY, DISTINCT, tri sur une jointure).
+
+Le relevé est comparé à une référence (benchmarks/plans_reference.json par
+défaut) : le contrôle échoue (code de sortie 1) quand une requête a un
+problème absent de la référence ou examine nettement plus de lignes
+(`--tolerance`). Les problèmes déjà présents dans la référence sont affichés
+mais acceptés. `--mettre-a-jour` enregistre les plans courants comme
+nouvelle référence, après avoir vérifié qu'ils conviennent ; sans référence
+(ni `--mettre-a-jour`), le contrôle échoue aussi.
+
+EXPLAIN n'exécute pas les UPDATE et DELETE du registre : la base n'est pas
+modifiée. Les estimations dépendent des volumes et des statistiques (ANALYZE
+TABLE, fait par donnees.py) : référence et contrôle sur une base remplie avec
+les mêmes volumes.
+
+Usage (depuis la racine du projet):
+    python benchmarks/plans.py [--base Planificator_bench] [--seuil 10000]
+                               [--reference plans_reference.json] [--mettre-a-jour]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_bd import RACINE, commit, lignes  # noqa: E402
+from requetes import REQUETES  # noqa: E402
+
+SEUIL_LIGNES = 10_000
+TOLERANCE = 1.0  # +100 % de lignes examinées
+REFERENCE = os.path.join(RACINE, 'benchmarks', 'plans_reference.json')
+
+
+def _tables(noeud):
+    """Accès aux tables d'un plan JSON (MySQL ou MariaDB), dans l'ordre du plan."""
+    if isinstance(noeud, list):
+        for element in noeud:
+            yield from _tables(element)
+    elif isinstance(noeud, dict):
+        if 'table_name' in noeud and 'access_type' in noeud:
+            yield {'table': noeud['table_name'], 'acces': noeud['access_type'], 'index': noeud.get('key'),
+                   'lignes': int(noeud.get('rows_examined_per_scan', noeud.get('rows', 0)) or 0)}
+        for valeur in noeud.values():
+            yield from _tables(valeur)
+
+
+def _operations(noeud):
+    """(opération, lignes) pour chaque tri ou table temporaire du plan ; lignes = plus grande table en dessous."""
+    if isinstance(noeud, list):
+        for element in noeud:
+            yield from _operations(element)
+    elif isinstance(noeud, dict):
+        # MySQL : "using_filesort": true ; MariaDB : noeud "filesort"
+        for operation, cles in (('filesort', ('using_filesort', 'filesort')),
+                                ('temporaire', ('using_temporary_table', 'temporary_table'))):
+            if any(noeud.get(cle) for cle in cles):
+                yield operation, max((t['lignes'] for t in _tables(noeud)), default=0)
+        for valeur in noeud.values():
+            yield from _operations(valeur)
+
+
+def analyser(plan, seuil=SEUIL_LIGNES):
+    """{'tables', 'lignes', 'problemes'} d'un plan EXPLAIN FORMAT=JSON."""
+    tables = list(_tables(plan))
+    problemes = {f"ALL {t['table']}" for t in tables if t['acces'] == 'ALL' and t['lignes'] >= seuil}
+    problemes.update(operation for operation, nombre in _operations(plan) if nombre >= seuil)
+    return {'tables': tables, 'lignes': sum(t['lignes'] for t in tables), 'problemes': sorted(problemes)}
+
+
+async def expliquer(database, requete):
+    sql = requete.sql.format(**requete.champs) if requete.champs else requete.sql
+    (plan,), = await lignes(database, "EXPLAIN FORMAT=JSON " + sql, requete.exemple)
+    return json.loads(plan)
+
+
+async def relever(database, seuil=SEUIL_LIGNES, selection=None):
+    resultats = {}
+    for nom, requete in REQUETES.items():
+        if selection and nom not in selection:
+            continue
+        try:
+            resultats[nom] = analyser(await expliquer(database, requete), seuil)
+        except Exception as e:
+            resultats[nom] = {'tables': [], 'lignes': 0, 'problemes': ['erreur'], 'erreur': str(e)}
+    return resultats
+
+
+def comparer(reference, requetes, tolerance=TOLERANCE, seuil=SEUIL_LIGNES):
+    """[(requête, motif)] des plans moins bons que la référence."""
+    regressions = []
+    for nom, resultat in requetes.items():
+        avant = reference['requetes'].get(nom)
+        if avant is None:
+            continue
+        for probleme in sorted(set(resultat['problemes']) - set(avant['problemes'])):
+            regressions.append((nom, f"nouveau : {probleme}"))
+        if resultat['lignes'] > avant['lignes'] * (1 + tolerance) and resultat['lignes'] - avant['lignes'] >= seuil:
+            regressions.append((nom, f"lignes examinées {avant['lignes']} → {resultat['lignes']}"))
+    return regressions
+
+
+async def _principal(arguments):
+    from setting_bd import DatabaseManager, config
+
+    if arguments.base:
+        config['base'] = arguments.base
+    logging.getLogger('setting_bd').setLevel(logging.WARNING)
+    database = DatabaseManager(asyncio.get_running_loop())
+    await database.connect()
+    try:
+        rapport = {
+            'horodatage': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit(),
+            'serveur': (await lignes(database, "SELECT VERSION()"))[0][0],
+            'seuil': arguments.seuil,
+            'requetes': await relever(database, arguments.seuil, arguments.requetes),
+        }
+    finally:
+        await database.close()
+
+    for nom, resultat in rapport['requetes'].items():
+        if 'erreur' in resultat:
+            print(f"  ❌ {nom:<44} {resultat['erreur']}")
+        elif resultat['problemes']:
+            print(f"  ⚠️ {nom:<44} {', '.join(resultat['problemes'])} (~{resultat['lignes']} lignes)")
+        else:
+            print(f"  ✅ {nom:<44} ~{resultat['lignes']} lignes")
+
+    if arguments.mettre_a_jour:
+        with open(arguments.reference, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+        print(f"📄 Référence enregistrée : {arguments.reference}")
+        return 0
+    if not os.path.exists(arguments.reference):
+        print(f"❌ Pas de référence ({arguments.reference}) : la créer avec --mettre-a-jour")
+        return 1
+
+    with open(arguments.reference, encoding='utf-8') as f:
+        reference = json.load(f)
+    print(f"\nComparaison avec {reference.get('commit')} ({reference.get('horodatage')})")
+    for nom in sorted(set(rapport['requetes']) - set(reference['requetes'])):
+        print(f"  ➕ {nom} : absente de la référence")
+    regressions = comparer(reference, rapport['requetes'], arguments.tolerance, arguments.seuil)
+    for nom, motif in regressions:
+        print(f"  ❌ {nom:<44} {motif}")
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) de plan")
+        return 1
+    print("✅ Aucun plan moins bon que la référence")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Vérifie les plans d'exécution des requêtes du registre")
+    parser.add_argument('--base', help="Base visée (par défaut celle de config.json)")
+    parser.add_argument('--seuil', type=int, default=SEUIL_LIGNES,
+                        help="Lignes estimées à partir desquelles une table compte comme grande")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Hausse relative des lignes examinées acceptée (1.0 = +100 %%)")
+    parser.add_argument('--reference', default=REFERENCE, help="Fichier des plans de référence")
+    parser.add_argument('--mettre-a-jour', dest='mettre_a_jour', action='store_true',
+                        help="Enregistre les plans courants comme référence")
+    parser.add_argument('--requetes', nargs='*', help="Limiter aux requêtes nommées")
+    sys.exit(asyncio.run(_principal(parser.parse_args())))
@@ -0,0 +1,170 @@
+"""
+Rejeu d'une session enregistrée (enregistrement.py) contre une base locale.
+
+Chaque appel de la session est relancé sur DatabaseManager au même instant
+relatif que dans la session (`--vitesse 1`), plus vite (`--vitesse 10` :
+dix fois plus serré, les appels se chevauchent comme en production) ou l'un
+après l'autre sans pause (`--vitesse 0`). Le rapport JSON donne, pour chaque
+appel, la durée d'origine et celle du rejeu, et par méthode les percentiles
+des deux.
+
+Pour comparer deux versions du code : rejouer la même session sur la même
+base (restaurée ou remplie par benchmarks/donnees.py avec la même graine)
+avec chaque version, puis `--comparer` le rapport de l'autre version : écarts
+appel par appel, par méthode et plus fortes régressions.
+
+Les identifiants de la session ne correspondent à des lignes que sur une
+copie de la base d'origine ; sur une base synthétique, certains appels ne
+trouvent rien ou échouent (comptés dans 'erreurs').
+
+Une session rejoue des écritures (contrats, suppressions, prix…) : `--base`
+est obligatoire et le rejeu refuse la base de l'application (config.json).
+
+Usage (depuis la racine du projet):
+    python benchmarks/rejeu.py logs/session_20260101_090000.jsonl.gz --base Planificator_bench [--vitesse 1]
+                               [--sortie rapport.json] [--comparer autre_version.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_bd import RACINE, choisir_base, commit, resumer  # noqa: E402
+from enregistrement import lire  # noqa: E402
+
+
+def _rejouable(valeur):
+    if isinstance(valeur, dict):
+        return '$repr' not in valeur and all(_rejouable(v) for v in valeur.values())
+    if isinstance(valeur, list):
+        return all(_rejouable(v) for v in valeur)
+    return True
+
+
+async def rejouer(database, appels, vitesse=1.0):
+    """[{'m', 'd_original', 'd', 'e'}, ...] dans l'ordre de la session."""
+    resultats = [None] * len(appels)
+
+    async def executer(rang, appel):
+        methode = getattr(database, appel['m'], None)
+        if methode is None or not _rejouable(appel['a']) or not _rejouable(appel['k']):
+            resultats[rang] = {'m': appel['m'], 'd_original': appel['d'], 'd': None, 'e': 'non rejouable'}
+            return
+        erreur = None
+        debut = time.perf_counter()
+        try:
+            await methode(*appel['a'], **appel['k'])
+        except Exception as e:
+            erreur = type(e).__name__
+        resultats[rang] = {'m': appel['m'], 'd_original': appel['d'],
+                           'd': (time.perf_counter() - debut) * 1000, 'e': erreur}
+
+    if not vitesse:
+        for rang, appel in enumerate(appels):
+            await executer(rang, appel)
+        return resultats
+
+    taches = []
+    depart = time.perf_counter()
+    for rang, appel in enumerate(appels):
+        attente = appel['t'] / vitesse - (time.perf_counter() - depart)
+        if attente > 0:
+            await asyncio.sleep(attente)
+        taches.append(asyncio.create_task(executer(rang, appel)))
+    await asyncio.gather(*taches)
+    return resultats
+
+
+def par_methode(resultats):
+    methodes = {}
+    for resultat in resultats:
+        if resultat['d'] is not None:
+            methodes.setdefault(resultat['m'], []).append(resultat)
+    resume = {}
+    for nom, appels in sorted(methodes.items()):
+        original = resumer([a['d_original'] for a in appels])
+        rejeu = resumer([a['d'] for a in appels])
+        resume[nom] = {'original': original, 'rejeu': rejeu,
+                       'ecart_p50_pct': ((rejeu['p50'] - original['p50']) / original['p50'] * 100
+                                         if original['p50'] else None)}
+    return resume
+
+
+def comparer(reference, rapport, limite=10):
+    """Écarts appel par appel entre deux rejeux de la même session (rapport - référence)."""
+    print(f"\nComparaison avec {reference.get('commit')} ({reference.get('horodatage')})")
+    if reference['session'] != rapport['session'] or len(reference['appels']) != len(rapport['appels']):
+        print("  ⚠️ Sessions différentes : comparaison impossible appel par appel")
+        return
+    ecarts = {}
+    pires = []
+    for rang, (avant, apres) in enumerate(zip(reference['appels'], rapport['appels'])):
+        if avant['d'] is None or apres['d'] is None:
+            continue
+        ecart = apres['d'] - avant['d']
+        ecarts.setdefault(apres['m'], []).append(ecart)
+        pires.append((ecart, rang, apres['m'], avant['d'], apres['d']))
+    for nom, valeurs in sorted(ecarts.items()):
+        stats = resumer(valeurs)
+        print(f"  {nom:<44} {stats['compte']:>6}  écart p50 {stats['p50']:+8.1f} ms  p95 {stats['p95']:+8.1f} ms")
+    print("  Plus fortes régressions :")
+    for ecart, rang, nom, avant, apres in sorted(pires, reverse=True)[:limite]:
+        print(f"    #{rang:<6} {nom:<40} {avant:8.1f} → {apres:8.1f} ms ({ecart:+.1f})")
+
+
+async def _principal(arguments):
+    from setting_bd import DatabaseManager, config
+
+    choisir_base(config, arguments.base)
+    logging.getLogger('setting_bd').setLevel(logging.WARNING)
+    entete, appels = lire(arguments.session)
+
+    database = DatabaseManager(asyncio.get_running_loop())
+    await database.connect()
+    try:
+        debut = time.perf_counter()
+        resultats = await rejouer(database, appels, arguments.vitesse)
+        duree = time.perf_counter() - debut
+    finally:
+        await database.close()
+
+    rapport = {
+        'horodatage': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit(),
+        'session': {'fichier': os.path.basename(arguments.session), **entete},
+        'vitesse': arguments.vitesse,
+        'duree_s': duree,
+        'erreurs': sum(1 for r in resultats if r['e'] is not None),
+        'methodes': par_methode(resultats),
+        'appels': resultats,
+    }
+    print(f"{len(appels)} appel(s) rejoué(s) en {duree:.1f} s, {rapport['erreurs']} erreur(s)")
+    for nom, stats in rapport['methodes'].items():
+        print(f"  {nom:<44} p50 {stats['original']['p50']:8.1f} → {stats['rejeu']['p50']:8.1f} ms")
+
+    sortie = arguments.sortie or os.path.join(
+        RACINE, 'benchmarks', 'resultats', f"rejeu_{rapport['commit'] or 'inconnu'}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, default=str)
+    print(f"📄 Rapport : {sortie}")
+    if arguments.comparer:
+        with open(arguments.comparer, encoding='utf-8') as f:
+            comparer(json.load(f), rapport)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rejoue une session DatabaseManager enregistrée")
+    parser.add_argument('session', help="Fichier session_*.jsonl.gz (dossier logs)")
+    parser.add_argument('--vitesse', type=float, default=1.0,
+                        help="1 = rythme d'origine, 10 = dix fois plus vite, 0 = à la suite sans pause")
+    parser.add_argument('--base', required=True, help="Base de test visée (pas celle de config.json)")
+    parser.add_argument('--sortie', help="Fichier du rapport JSON (par défaut benchmarks/resultats/)")
+    parser.add_argument('--comparer', help="Rapport de rejeu de la même session par une autre version")
+    asyncio.run(_principal(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Détection des gels de l'interface Kivy.
+
+Le thread principal signale chaque image (`battement`, appelé par Clock). Un
+thread de surveillance vérifie toutes les `periode` secondes que le dernier
+battement date de moins de `seuil_ms` ; sinon l'interface est gelée : il
+échantillonne la pile du thread principal (sys._current_frames) tant que le
+gel dure. À la reprise, le gel est journalisé avec sa durée, le site d'appel
+le plus souvent échantillonné (première ligne du code de l'application en
+partant du haut de la pile) et la pile du premier échantillon. Les gels sont
+agrégés par site d'appel (`statistiques`, affichées dans Diagnostics).
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+SEUIL_GEL_MS = 250
+PERIODE = 0.05
+DOSSIER_APPLICATION = os.path.dirname(os.path.abspath(__file__))
+
+
+def site_appel(pile):
+    """'fichier.py:ligne fonction' du cadre le plus profond appartenant à l'application."""
+    for cadre in reversed(pile):
+        fichier = os.path.abspath(cadre.filename)
+        if fichier.startswith(DOSSIER_APPLICATION) and fichier != os.path.abspath(__file__):
+            return f"{os.path.basename(cadre.filename)}:{cadre.lineno} {cadre.name}"
+    cadre = pile[-1]
+    return f"{os.path.basename(cadre.filename)}:{cadre.lineno} {cadre.name}"
+
+
+class _Gel:
+    __slots__ = ('debut', 'pile', 'echantillons')
+
+    def __init__(self, debut, pile):
+        self.debut = debut
+        self.pile = pile
+        self.echantillons = Counter()
+
+
+class ChienDeGarde:
+    """Surveille le thread qui appelle `demarrer` (le thread Kivy)."""
+
+    def __init__(self, seuil_ms=SEUIL_GEL_MS, periode=PERIODE):
+        self.seuil = seuil_ms / 1000
+        self.periode = periode
+        self.gels = {}  # {site: {'gels', 'total_ms', 'max_ms'}}
+        self._dernier_battement = time.monotonic()
+        self._ident = None
+        self._arret = threading.Event()
+        self._thread = None
+
+    def battement(self, *args):
+        """Callback Clock.schedule_interval(..., 0) : une image a été produite."""
+        self._dernier_battement = time.monotonic()
+
+    def demarrer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._ident = threading.get_ident()
+        self._dernier_battement = time.monotonic()
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._surveiller, name='chien_de_garde', daemon=True)
+        self._thread.start()
+
+    def arreter(self):
+        self._arret.set()
+
+    def statistiques(self):
+        """Gels agrégés par site d'appel, les plus coûteux en premier."""
+        return dict(sorted(self.gels.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+    def _surveiller(self):
+        gel = None
+        while not self._arret.wait(self.periode):
+            dernier = self._dernier_battement
+            if gel is not None and dernier != gel.debut:
+                # Une image a été produite depuis le début du gel : il est terminé
+                self._terminer(gel, (dernier - gel.debut) * 1000)
+                gel = None
+            if time.monotonic() - dernier >= self.seuil:
+                cadre = sys._current_frames().get(self._ident)
+                if cadre is None:
+                    continue
+                pile = traceback.extract_stack(cadre)
+                del cadre
+                if gel is None:
+                    gel = _Gel(dernier, pile)
+                gel.echantillons[site_appel(pile)] += 1
+
+    def _terminer(self, gel, duree_ms):
+        site = gel.echantillons.most_common(1)[0][0]
+        agregat = self.gels.setdefault(site, {'gels': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        agregat['gels'] += 1
+        agregat['total_ms'] += duree_ms
+        agregat['max_ms'] = max(agregat['max_ms'], duree_ms)
+        logger.warning(f"🧊 Interface gelée {duree_ms:.0f} ms - {site} ({agregat['gels']} gel(s) à cet endroit)\n"
+                       + ''.join(traceback.format_list(gel.pile)))
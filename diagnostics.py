@@ -0,0 +1,146 @@
+"""
+Instantanés de performance pour l'écran Diagnostics (administrateurs).
+
+Regroupe l'état du pool, la latence BD glissante, les histogrammes par
+méthode (instrumentation.py), les réessais, l'attente du verrou de
+DatabaseManager, le taux de succès des caches lru_cache, la durée des
+images Kivy et les gels de l'interface (chien_de_garde.py). L'instantané est un dict sérialisable en JSON, joint tel quel
+aux rapports de bug (`exporter`).
+"""
+import json
+import os
+from collections import deque
+from datetime import datetime
+
+from instrumentation import Histogramme
+from modeles import curseur
+from recurrence import fenetre
+from tester_date import feries_annee
+from vue_tableaux import format_frequence, inverser_date
+
+# Nombre de mesures de latence conservées (une par rafraîchissement de l'écran)
+FENETRE_LATENCE = 60
+
+CACHES = {
+    'inverser_date': inverser_date,
+    'format_frequence': format_frequence,
+    'feries_annee': feries_annee,
+    'fenetre': fenetre,
+    'curseur': curseur,
+}
+
+
+def etat_caches():
+    """{nom: {succes, echecs, taille, ratio}} des caches lru_cache de l'application."""
+    etat = {}
+    for nom, fonction in CACHES.items():
+        info = fonction.cache_info()
+        appels = info.hits + info.misses
+        etat[nom] = {'succes': info.hits, 'echecs': info.misses, 'taille': info.currsize,
+                     'ratio': info.hits / appels if appels else None}
+    return etat
+
+
+class Diagnostics:
+    """Collecte des mesures côté application ; `instantane` lit le reste depuis DatabaseManager."""
+
+    def __init__(self, database, chien_de_garde=None):
+        self.database = database
+        self.chien_de_garde = chien_de_garde
+        self.latences = deque(maxlen=FENETRE_LATENCE)
+        self.images = Histogramme()
+
+    def image(self, dt):
+        """Callback Clock appelé à chaque image tant que l'écran est ouvert."""
+        self.images.ajouter(dt * 1000)
+
+    def reinitialiser_images(self):
+        self.images = Histogramme()
+
+    async def instantane(self):
+        pool = await self.database.get_pool_status()
+        latence = await self.database.check_latency()
+        if latence.get('latency_ms') is not None:
+            self.latences.append(latence['latency_ms'])
+        latences = list(self.latences)
+        return {
+            'horodatage': datetime.now().isoformat(timespec='seconds'),
+            'pool': pool,
+            'latence': {
+                'derniere': latences[-1] if latences else None,
+                'moyenne': sum(latences) / len(latences) if latences else None,
+                'max': max(latences, default=None),
+                'mesures': len(latences),
+            },
+            'requetes': self.database.statistiques_requetes(),
+            'reessais': self.database.statistiques_reessais(),
+            'verrou': self.database.lock.attente.resume(),
+            'detention': ({'duree': self.database.pool.detention.resume(),
+                           'detenteurs': self.database.pool.detenteurs()}
+                          if self.database.pool is not None else None),
+            'caches': etat_caches(),
+            'images': self.images.resume(),
+            'gels': self.chien_de_garde.statistiques() if self.chien_de_garde is not None else {},
+        }
+
+
+def _ms(valeur):
+    return '-' if valeur is None else f'{valeur:.1f} ms'
+
+
+def _pourcentage(ratio):
+    return '-' if ratio is None else f'{ratio:.0%}'
+
+
+def textes(instantane, limite=15):
+    """Textes des libellés de l'écran : {'pool', 'latence', 'verrou', 'images', 'gels', 'caches', 'reessais', 'requetes'}."""
+    pool = instantane['pool']
+    gels = instantane['gels']
+    pire = next(iter(gels.items()), None)
+    latence = instantane['latence']
+    verrou = instantane['verrou']
+    images = instantane['images']
+    detention = instantane['detention']
+    reessais = instantane['reessais']
+    reessayees = sorted((item for item in reessais.items() if item[1].get('reessais') or item[1].get('echecs')),
+                        key=lambda item: item[1].get('reessais', 0), reverse=True)[:3]
+    requetes = sorted(instantane['requetes'].items(),
+                      key=lambda item: item[1]['total']['p95'] or 0, reverse=True)[:limite]
+    return {
+        'pool': (f"Pool : {pool.get('total_connections', '-')} connexion(s), "
+                 f"{pool.get('free_connections', '-')} libre(s), {pool.get('active_connections', '-')} active(s)"
+                 if pool.get('status') == 'connected' else f"Pool : {pool.get('message', pool.get('status'))}")
+                + (f"\nDétention : p95 {_ms(detention['duree']['p95'])}, max {_ms(detention['duree']['max'])}"
+                   + ''.join(f"\n  {d['methode']} ({d['site']}) depuis {_ms(d['depuis_ms'])}"
+                             for d in detention['detenteurs'])
+                   if detention else ''),
+        'latence': (f"Latence BD : {_ms(latence['derniere'])} (moyenne {_ms(latence['moyenne'])}, "
+                    f"max {_ms(latence['max'])} sur {latence['mesures']} mesure(s))"),
+        'verrou': f"Attente verrou BD : p50 {_ms(verrou['p50'])}, p95 {_ms(verrou['p95'])}, max {_ms(verrou['max'])}",
+        'images': (f"Images Kivy : p50 {_ms(images['p50'])}, p95 {_ms(images['p95'])}, "
+                   f"max {_ms(images['max'])} ({images['compte']} image(s))"),
+        'gels': (f"Gels interface : {sum(g['gels'] for g in gels.values())}, le plus coûteux {pire[0]} "
+                 f"({pire[1]['gels']} fois, max {_ms(pire[1]['max_ms'])})" if pire else "Gels interface : aucun"),
+        'caches': 'Caches : ' + ', '.join(f"{nom} {_pourcentage(cache['ratio'])}"
+                                         for nom, cache in instantane['caches'].items()),
+        'reessais': (f"Réessais BD : {sum(c.get('reessais', 0) for c in reessais.values())} réessai(s), "
+                     f"{sum(c.get('echecs', 0) for c in reessais.values())} abandon(s) sur "
+                     f"{sum(c.get('appels', 0) for c in reessais.values())} appel(s)"
+                     + (' - ' + ', '.join(
+                         f"{nom} {c.get('reessais', 0)} ("
+                         + ', '.join(f"{cle[len('erreur_'):]}×{n}" for cle, n in c.items() if cle.startswith('erreur_'))
+                         + ")"
+                         for nom, c in reessayees) if reessayees else '')),
+        'requetes': '\n'.join(
+            f"{nom:<40} {h['total']['compte']:>6}  p50 {_ms(h['total']['p50']):>10}  p95 {_ms(h['total']['p95']):>10}"
+            for nom, h in requetes) or 'Aucune requête mesurée',
+    }
+
+
+def exporter(instantane, dossier):
+    """Écrit l'instantané dans `dossier`/diagnostic_AAAAMMJJ_HHMMSS.json et retourne le chemin."""
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, f"diagnostic_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(instantane, f, ensure_ascii=False, indent=2, default=str)
+    return chemin
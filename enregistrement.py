@@ -0,0 +1,101 @@
+"""
+Enregistrement des appels DatabaseManager pour les rejouer (benchmarks/rejeu.py).
+
+Quand l'enregistreur est actif ("enregistrement": true dans config.json),
+chaque appel de méthode DatabaseManager lancé par l'application (pas ceux
+qu'une méthode fait elle-même) est ajouté au fichier de session : instant
+relatif au début de la session, méthode, arguments, durée et erreur
+éventuelle. Le fichier est du JSON Lines compressé en gzip, écrit par un
+thread : enregistrer un appel ne fait qu'ajouter un tuple à une file.
+
+Les méthodes de gestion du pool et celles qui reçoivent un mot de passe ne
+sont pas enregistrées (NON_ENREGISTREES).
+"""
+import datetime
+import gzip
+import json
+import queue
+import threading
+import time
+from decimal import Decimal
+
+VERSION = 1
+NON_ENREGISTREES = {'connect', 'reconnect', 'close', 'add_user', 'update_user', 'verify_user', 'get_user'}
+
+
+def _encoder(valeur):
+    if isinstance(valeur, datetime.datetime):
+        return {'$dt': valeur.isoformat()}
+    if isinstance(valeur, datetime.date):
+        return {'$d': valeur.isoformat()}
+    if isinstance(valeur, Decimal):
+        return {'$dec': str(valeur)}
+    if isinstance(valeur, (set, frozenset)):
+        return list(valeur)
+    return {'$repr': repr(valeur)}
+
+
+def _decoder(objet):
+    if len(objet) == 1:
+        if '$dt' in objet:
+            return datetime.datetime.fromisoformat(objet['$dt'])
+        if '$d' in objet:
+            return datetime.date.fromisoformat(objet['$d'])
+        if '$dec' in objet:
+            return Decimal(objet['$dec'])
+    return objet
+
+
+def lire(chemin):
+    """(en-tête, [appel, ...]) d'un fichier de session ; appel = {'t', 'm', 'a', 'k', 'd', 'e'}."""
+    with gzip.open(chemin, 'rt', encoding='utf-8') as fichier:
+        entete = json.loads(fichier.readline())
+        if entete.get('version') != VERSION:
+            raise ValueError(f"Version de session non prise en charge: {entete.get('version')}")
+        return entete, [json.loads(ligne, object_hook=_decoder) for ligne in fichier if ligne.strip()]
+
+
+class Enregistreur:
+    """File des appels et thread d'écriture du fichier de session."""
+
+    def __init__(self):
+        self.actif = False
+        self.chemin = None
+        self._debut = None
+        self._file = queue.SimpleQueue()
+        self._ecrivain = None
+
+    def activer(self, chemin):
+        if self.actif:
+            return
+        self.chemin = chemin
+        self._debut = time.perf_counter()
+        self._file.put({'version': VERSION, 'debut': datetime.datetime.now().isoformat(timespec='seconds')})
+        self.actif = True
+        self._ecrivain = threading.Thread(target=self._ecrire, name='enregistrement', daemon=True)
+        self._ecrivain.start()
+
+    def arreter(self):
+        """Écrit les appels en attente et ferme le fichier."""
+        if not self.actif:
+            return
+        self.actif = False
+        self._file.put(None)
+        self._ecrivain.join(timeout=5)
+
+    def enregistrer(self, methode, args, kwargs, debut, duree_ms, erreur=None):
+        """`debut` en time.perf_counter() ; `args` sans self."""
+        if methode not in NON_ENREGISTREES:
+            self._file.put({'t': round(debut - self._debut, 6), 'm': methode, 'a': args, 'k': kwargs,
+                            'd': round(duree_ms, 3), 'e': erreur})
+
+    def _ecrire(self):
+        with gzip.open(self.chemin, 'wt', encoding='utf-8') as fichier:
+            while True:
+                appel = self._file.get()
+                if appel is None:
+                    break
+                fichier.write(json.dumps(appel, ensure_ascii=False, default=_encoder, separators=(',', ':')) + '\n')
+
+
+enregistreur = Enregistreur()
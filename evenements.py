@@ -0,0 +1,165 @@
+"""
+Bus d'événements métier en mémoire.
+
+Les méthodes d'écriture de DatabaseManager publient un événement typé après
+chaque COMMIT réussi (ex: FacturePayee(123), PlanningDecale(45, ...)).
+Les vues s'abonnent uniquement aux types qui les concernent : seules les
+vues touchées par une écriture sont rafraîchies.
+"""
+import logging
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Événements retenus par l'unité de travail en cours (None = publication immédiate)
+_retenus = ContextVar('evenements_retenus', default=None)
+
+
+# ---- Comptes ----
+
+class CompteCree(NamedTuple):
+    email: str
+
+
+class CompteModifie(NamedTuple):
+    id_compte: int
+
+
+class CompteSupprime(NamedTuple):
+    email: str
+
+
+# ---- Clients et contrats ----
+
+class ClientCree(NamedTuple):
+    client_id: int
+
+
+class ClientSupprime(NamedTuple):
+    client_id: int
+
+
+class ContratCree(NamedTuple):
+    contrat_id: int
+    client_id: int
+
+
+class ContratResilie(NamedTuple):
+    contrat_id: int
+    planning_id: int
+
+
+class TraitementCree(NamedTuple):
+    traitement_id: int
+    contrat_id: int
+
+
+# ---- Planning ----
+
+class PlanningCree(NamedTuple):
+    planning_id: int
+    traitement_id: int
+
+
+class DetailPlanningCree(NamedTuple):
+    planning_detail_id: int
+    planning_id: int
+
+
+class PlanningDecale(NamedTuple):
+    """Toutes les dates d'un planning à partir de `planning_detail_id` décalées de `mois`."""
+    planning_id: int
+    planning_detail_id: int
+    option: str
+    mois: int
+
+
+class PlanningsEtendus(NamedTuple):
+    """Nouvelles dates (et leurs factures) ajoutées en lot : extension d'horizon, contrat complet."""
+    plannings: tuple
+    details: int
+
+
+class DatePlanifieeModifiee(NamedTuple):
+    planning_detail_id: int
+    date: object
+
+
+class TraitementEffectue(NamedTuple):
+    planning_detail_id: int
+
+
+class SignalementCree(NamedTuple):
+    planning_detail_id: int
+    type: str
+
+
+class RemarqueCreee(NamedTuple):
+    client_id: int
+    planning_detail_id: int
+
+
+# ---- Factures ----
+
+class FactureCreee(NamedTuple):
+    facture_id: int
+    planning_detail_id: int
+
+
+class FacturePayee(NamedTuple):
+    facture_id: int
+
+
+class MontantFactureModifie(NamedTuple):
+    facture_id: int
+    ancien: Optional[float]
+    nouveau: float
+
+
+class BusEvenements:
+    """
+    Distribue les événements aux abonnés de leur type exact.
+
+    Synchrone : `publier` appelle les abonnés dans le thread de l'appelant
+    (la boucle asyncio pour DatabaseManager). Un abonné en erreur est
+    journalisé sans bloquer les suivants ni l'écriture qui a publié.
+    """
+
+    def __init__(self):
+        self._abonnes = defaultdict(list)
+
+    def abonner(self, types, rappel):
+        """Abonne `rappel(evenement)` à un type d'événement ou à un tuple de types."""
+        for type_evenement in types if isinstance(types, tuple) else (types,):
+            self._abonnes[type_evenement].append(rappel)
+
+    def desabonner(self, types, rappel):
+        for type_evenement in types if isinstance(types, tuple) else (types,):
+            if rappel in self._abonnes[type_evenement]:
+                self._abonnes[type_evenement].remove(rappel)
+
+    def retenir(self):
+        """Retient les événements publiés dans la tâche courante jusqu'à relacher() (unité de travail)."""
+        return _retenus.set([])
+
+    def relacher(self, jeton, publier=True):
+        """Fin de la rétention : publie les événements retenus (après COMMIT) ou les abandonne (ROLLBACK)."""
+        evenements = _retenus.get()
+        _retenus.reset(jeton)
+        if publier:
+            for evenement in evenements:
+                self.publier(evenement)
+
+    def publier(self, evenement):
+        retenus = _retenus.get()
+        if retenus is not None:
+            retenus.append(evenement)
+            return
+        logger.debug(f"📣 {evenement}")
+        for rappel in list(self._abonnes[type(evenement)]):
+            try:
+                rappel(evenement)
+            except Exception as e:
+                logger.error(f"❌ Abonné en erreur pour {type(evenement).__name__}: {e}", exc_info=True)
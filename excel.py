@@ -1,3 +1,4 @@
+import logging
 import pandas as pd
 from pathlib import Path
 import datetime
@@ -6,6 +7,10 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
+from modeles import LigneFactureClient, LigneFactureMois, LigneTraitementMois
+
+logger = logging.getLogger(__name__)
+
 
 def getdesktoppath():
 
@@ -28,10 +33,17 @@ for nom in dossier:
     path = (desktop / nom)
     path.mkdir(parents=True, exist_ok=True)
     paths.append(path)
-    print(f'Dossier {nom} créer')
+    logger.debug(f'Dossier {nom} créé')
+
+
+def tableau(data):
+    """DataFrame d'une liste de lignes `modeles` : colonnes nommées par les LIBELLES du modèle."""
+    if not data:
+        return pd.DataFrame()
+    return pd.DataFrame.from_records(data, columns=data[0].LIBELLES)
 
 
-def generate_comprehensive_facture_excel(data: list[dict], client_full_name: str):
+def generate_comprehensive_facture_excel(data: list[LigneFactureClient], client_full_name: str):
     report_period = datetime.date.today().year
 
     safe_client_name = "".join(c for c in client_full_name if c.isalnum() or c in (' ', '-', '_')).replace(' ',
@@ -57,9 +69,9 @@ def generate_comprehensive_facture_excel(data: list[dict], client_full_name: str
     # Informations du client (en-tête)
     if data:
         client_info = data[0]
-        client_display_name = f"{client_info['client_nom']} {client_info['client_prenom']}"
-        if client_info['client_categorie'] != 'Particulier':
-            client_display_name = f"{client_info['client_nom']} (Responsable: {client_info['client_prenom'] if client_info['client_prenom'] else 'N/A'})"
+        client_display_name = f"{client_info.client_nom} {client_info.client_prenom}"
+        if client_info.client_categorie != 'Particulier':
+            client_display_name = f"{client_info.client_nom} (Responsable: {client_info.client_prenom if client_info.client_prenom else 'N/A'})"
 
         ws.cell(row=current_row, column=1, value="Client :").font = bold_font
         ws.cell(row=current_row, column=2, value=client_display_name)
@@ -67,23 +79,23 @@ def generate_comprehensive_facture_excel(data: list[dict], client_full_name: str
 
         # Ajout du numéro de contrat
         ws.cell(row=current_row, column=1, value="N° Contrat :").font = bold_font
-        ws.cell(row=current_row, column=2, value=client_info.get('Référence Contrat', 'N/A'))
+        ws.cell(row=current_row, column=2, value=client_info.reference_contrat)
         current_row += 1
 
         ws.cell(row=current_row, column=1, value="Adresse :").font = bold_font
-        ws.cell(row=current_row, column=2, value=client_info['client_adresse'])
+        ws.cell(row=current_row, column=2, value=client_info.client_adresse)
         current_row += 1
 
         ws.cell(row=current_row, column=1, value="Téléphone :").font = bold_font
-        ws.cell(row=current_row, column=2, value=client_info['client_telephone'])
+        ws.cell(row=current_row, column=2, value=client_info.client_telephone)
         current_row += 1
 
         ws.cell(row=current_row, column=1, value="Catégorie Client :").font = bold_font
-        ws.cell(row=current_row, column=2, value=client_info['client_categorie'])
+        ws.cell(row=current_row, column=2, value=client_info.client_categorie)
         current_row += 1
 
         ws.cell(row=current_row, column=1, value="Axe Client :").font = bold_font
-        ws.cell(row=current_row, column=2, value=client_info['client_axe'])
+        ws.cell(row=current_row, column=2, value=client_info.client_axe)
         current_row += 1
 
     current_row += 1
@@ -114,7 +126,7 @@ def generate_comprehensive_facture_excel(data: list[dict], client_full_name: str
         ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(table_headers))
         current_row += 1
     else:
-        df_invoice_data = pd.DataFrame(data)
+        df_invoice_data = tableau(data)
 
         for r_idx, row_dict in enumerate(df_invoice_data.to_dict('records'), start=current_row):
             # Gérer le numéro de facture: afficher "Aucun" si vide ou None
@@ -170,7 +182,7 @@ def generate_comprehensive_facture_excel(data: list[dict], client_full_name: str
 
     # Calcul et affichage des totaux
     if data:
-        df_calc = pd.DataFrame(data)
+        df_calc = tableau(data)
 
         grand_total = df_calc['Montant Facturé'].sum()
         ws.cell(row=current_row, column=1, value="Montant Total Facturé sur la période :").font = bold_font
@@ -238,12 +250,12 @@ def generate_comprehensive_facture_excel(data: list[dict], client_full_name: str
         with open(file_name, 'wb') as f:
             f.write(output.getvalue())
 
-        print(f"Fichier '{file_name}' généré avec succès.")
+        logger.info(f"✅ Fichier '{file_name}' généré avec succès")
     except Exception as e:
-        print(f"Erreur lors de la génération du fichier Excel de la facture : {e}")
+        logger.error(f"❌ Erreur lors de la génération du fichier Excel de la facture : {e}", exc_info=True)
 
 
-def generer_facture_excel(data: list[dict], client_full_name: str, year: int, month: int):
+def generer_facture_excel(data: list[LigneFactureMois], client_full_name: str, year: int, month: int):
     month_name_fr = datetime.date(year, month, 1).strftime('%B').capitalize()
 
     safe_client_name = "".join(c for c in client_full_name if c.isalnum() or c in (' ', '-', '_')).replace(' ',
@@ -271,9 +283,9 @@ def generer_facture_excel(data: list[dict], client_full_name: str, year: int, mo
     # Informations du client (en-tête)
     if data:
         infoClient = data[0]
-        affichageNomClient = f"{infoClient['client_nom']} {infoClient['client_prenom']}"
-        if infoClient['client_categorie'] != 'Particulier':
-            affichageNomClient = f"{infoClient['client_nom']} (Responsable: {infoClient['client_prenom'] if infoClient['client_prenom'] else 'N/A'})"
+        affichageNomClient = f"{infoClient.client_nom} {infoClient.client_prenom}"
+        if infoClient.client_categorie != 'Particulier':
+            affichageNomClient = f"{infoClient.client_nom} (Responsable: {infoClient.client_prenom if infoClient.client_prenom else 'N/A'})"
 
         ws.cell(row=ligneActuelle, column=1, value="Client :").font = bold_font
         ws.cell(row=ligneActuelle, column=2, value=affichageNomClient)
@@ -281,23 +293,23 @@ def generer_facture_excel(data: list[dict], client_full_name: str, year: int, mo
 
         # Ajout du numéro de contrat
         ws.cell(row=ligneActuelle, column=1, value="N° Contrat :").font = bold_font
-        ws.cell(row=ligneActuelle, column=2, value=infoClient.get('Référence Contrat', 'N/A'))
+        ws.cell(row=ligneActuelle, column=2, value=infoClient.reference_contrat)
         ligneActuelle += 1
 
         ws.cell(row=ligneActuelle, column=1, value="Adresse :").font = bold_font
-        ws.cell(row=ligneActuelle, column=2, value=infoClient['client_adresse'])
+        ws.cell(row=ligneActuelle, column=2, value=infoClient.client_adresse)
         ligneActuelle += 1
 
         ws.cell(row=ligneActuelle, column=1, value="Téléphone :").font = bold_font
-        ws.cell(row=ligneActuelle, column=2, value=infoClient['client_telephone'])
+        ws.cell(row=ligneActuelle, column=2, value=infoClient.client_telephone)
         ligneActuelle += 1
 
         ws.cell(row=ligneActuelle, column=1, value="Catégorie Client :").font = bold_font
-        ws.cell(row=ligneActuelle, column=2, value=infoClient['client_categorie'])
+        ws.cell(row=ligneActuelle, column=2, value=infoClient.client_categorie)
         ligneActuelle += 1
 
         ws.cell(row=ligneActuelle, column=1, value="Axe Client :").font = bold_font
-        ws.cell(row=ligneActuelle, column=2, value=infoClient['client_axe'])
+        ws.cell(row=ligneActuelle, column=2, value=infoClient.client_axe)
         ligneActuelle += 1
 
     ligneActuelle += 1
@@ -329,7 +341,7 @@ def generer_facture_excel(data: list[dict], client_full_name: str, year: int, mo
         ligneActuelle += 1
     else:
         # Convertir en DataFrame pour un traitement plus facile
-        df_invoice_data = pd.DataFrame(data)
+        df_invoice_data = tableau(data)
 
         for r_idx, row_dict in enumerate(df_invoice_data.to_dict('records'), start=ligneActuelle):
             # Gérer le numéro de facture: afficher "Aucun" si vide ou None
@@ -385,7 +397,7 @@ def generer_facture_excel(data: list[dict], client_full_name: str, year: int, mo
 
     # Calcul et affichage des totaux
     if data:
-        df_calc = pd.DataFrame(data)
+        df_calc = tableau(data)
 
         total_by_type_paid = df_calc[df_calc['Etat paiement (Payée ou non)'] == 'Payé'].groupby('Traitement (Type)')[
             'montant_facture'].sum()
@@ -446,12 +458,12 @@ def generer_facture_excel(data: list[dict], client_full_name: str, year: int, mo
         with open(file_name, 'wb') as f:
             f.write(output.getvalue())
 
-        print(f"Fichier '{file_name}' généré avec succès.")
+        logger.info(f"✅ Fichier '{file_name}' généré avec succès")
     except Exception as e:
-        print(f"Erreur lors de la génération du fichier Excel de la facture : {e}")
+        logger.error(f"❌ Erreur lors de la génération du fichier Excel de la facture : {e}", exc_info=True)
 
 
-def generate_traitements_excel(data: list[dict], year: int, month: int):
+def generate_traitements_excel(data: list[LigneTraitementMois], year: int, month: int):
     month_name_fr = datetime.date(year, month, 1).strftime('%B').capitalize()
 
     wb = Workbook()
@@ -485,7 +497,7 @@ def generate_traitements_excel(data: list[dict], year: int, month: int):
     # Ligne vide pour la séparation
     ws.cell(row=4, column=1, value="")
 
-    df = pd.DataFrame(data)
+    df = tableau(data)
 
     if df.empty:
         ws.cell(row=5, column=1, value="Aucun traitement trouvé pour ce mois.").border = thin_border
@@ -498,9 +510,8 @@ def generate_traitements_excel(data: list[dict], year: int, month: int):
             cell.border = thin_border # Appliquer la bordure aux en-têtes
 
         # Itérer sur les données et appliquer la couleur
-        for r_idx, row_dict in enumerate(data, start=6):
-            for c_idx, col_name in enumerate(headers, 1): # Itérer sur les noms de colonnes pour maintenir l'ordre
-                value = row_dict.get(col_name, 'N/A') # Obtenir la valeur par nom de colonne
+        for r_idx, ligne in enumerate(data, start=6):
+            for c_idx, (col_name, value) in enumerate(zip(headers, ligne), 1): # Colonnes dans l'ordre du modèle
                 cell = ws.cell(row=r_idx, column=c_idx, value=value)
                 cell.border = thin_border # Appliquer la bordure aux cellules de données
 
@@ -536,6 +547,6 @@ def generate_traitements_excel(data: list[dict], year: int, month: int):
         with open(file_name, 'wb') as f:
             f.write(output.getvalue())
 
-        print(f"Fichier '{file_name}' généré avec succès.")
+        logger.info(f"✅ Fichier '{file_name}' généré avec succès")
     except Exception as e:
-        print(f"Erreur lors de la génération du fichier Excel des traitements : {e}")
+        logger.error(f"❌ Erreur lors de la génération du fichier Excel des traitements : {e}", exc_info=True)
@@ -18,6 +18,7 @@ def gestion_ecran(root):
         root.get_screen('Sidebar').ids['gestion_ecran'].add_widget(Builder.load_file('screen/client/Client.kv'))
         root.get_screen('Sidebar').ids['gestion_ecran'].add_widget(Builder.load_file('screen/compte/compte.kv'))
         root.get_screen('Sidebar').ids['gestion_ecran'].add_widget(Builder.load_file('screen/compte/compte_not_admin.kv'))
+        root.get_screen('Sidebar').ids['gestion_ecran'].add_widget(Builder.load_file('screen/diagnostics.kv'))
 
         root.get_screen('Sidebar').ids['gestion_ecran'].transition = SlideTransition(direction='up')
         logger.info("✅ Écrans principaux chargés avec succès")
@@ -0,0 +1,90 @@
+"""
+Extension glissante des plannings à durée indéterminée.
+
+Les contrats indéterminés ne reçoivent leurs dates (PlanningDetails) et
+factures que jusqu'à l'horizon de création (recurrence.HORIZON_ANNEES). Ce
+travail, lancé chaque jour depuis la boucle asyncio de l'application ou en
+tâche planifiée sans interface, prolonge en lot tous les plannings dont la
+dernière date entre dans la fenêtre d'anticipation. Il resynchronise d'abord
+la table JoursFeries (scripts/Migration_feries.sql) sur tester_date.
+
+Usage sans interface (cron / planificateur de tâches) :
+    python horizon.py [--fenetre JOURS] [--annees N]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from recurrence import HORIZON_ANNEES, horizon
+
+logger = logging.getLogger(__name__)
+
+# Un planning est prolongé quand sa dernière date tombe dans les FENETRE_JOURS à venir
+FENETRE_JOURS = 90
+
+
+async def etendre(database, fenetre=FENETRE_JOURS, annees=HORIZON_ANNEES, aujourdhui=None):
+    """Prolonge les plannings concernés jusqu'à `annees` ans après aujourd'hui. Retourne {planning_id: ajouts}."""
+    aujourdhui = aujourdhui or date.today()
+    return await database.etendre_plannings_ouverts(aujourdhui + timedelta(days=fenetre),
+                                                    horizon(aujourdhui, annees))
+
+
+class ExtensionHorizon:
+    """Lance `etendre` au démarrage puis toutes les `intervalle` secondes sur la boucle de l'application."""
+
+    def __init__(self, database, intervalle=24 * 3600, fenetre=FENETRE_JOURS, annees=HORIZON_ANNEES):
+        self.database = database
+        self.intervalle = intervalle
+        self.fenetre = fenetre
+        self.annees = annees
+        self._tache = None
+
+    @property
+    def actif(self):
+        return self._tache is not None and not self._tache.done()
+
+    def demarrer(self, loop):
+        """Lance l'extension périodique depuis n'importe quel thread (sans effet si déjà active)."""
+        if not self.actif:
+            self._tache = asyncio.run_coroutine_threadsafe(self._boucle(), loop)
+
+    def arreter(self):
+        if self._tache is not None:
+            self._tache.cancel()
+            self._tache = None
+
+    async def _boucle(self):
+        while True:
+            try:
+                await self.database.synchroniser_feries()
+                await etendre(self.database, self.fenetre, self.annees)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur extension des plannings: {e}", exc_info=True)
+            await asyncio.sleep(self.intervalle)
+
+
+async def _principal(fenetre, annees):
+    from setting_bd import DatabaseManager
+
+    database = DatabaseManager(asyncio.get_running_loop())
+    await database.connect()
+    try:
+        await database.synchroniser_feries()
+        ajouts = await etendre(database, fenetre, annees)
+        print(f"✅ {len(ajouts)} planning(s) prolongé(s), {sum(ajouts.values())} date(s) ajoutée(s)")
+    finally:
+        await database.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prolonge les plannings des contrats à durée indéterminée")
+    parser.add_argument('--fenetre', type=int, default=FENETRE_JOURS,
+                        help="Jours d'anticipation avant la dernière date d'un planning")
+    parser.add_argument('--annees', type=int, default=HORIZON_ANNEES,
+                        help="Horizon de planification en années à partir d'aujourd'hui")
+    arguments = parser.parse_args()
+    asyncio.run(_principal(arguments.fenetre, arguments.annees))
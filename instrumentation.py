@@ -0,0 +1,481 @@
+"""
+Mesures de performance de DatabaseManager.
+
+`instrumenter` enveloppe chaque méthode async de la classe : durée totale de
+l'appel et, pour les requêtes exécutées pendant l'appel, attente d'une
+connexion du pool, temps d'exécution, temps de lecture (fetch) et nombre de
+lignes. Les valeurs sont cumulées par appel puis versées dans des
+histogrammes en mémoire, par méthode (`mesures`).
+
+PoolInstrumente enveloppe le pool aiomysql : il chronomètre l'acquisition et
+distribue des connexions dont les curseurs sont chronométrés. Une requête plus
+lente que le seuil est écrite dans le journal `requetes_lentes` avec ses
+paramètres et son plan d'exécution (EXPLAIN FORMAT=JSON, obtenu en tâche de
+fond sur une autre connexion pour ne pas rallonger l'appel).
+
+Le pool suit aussi chaque connexion prêtée (site d'appel, tâche, durée) :
+avertissement quand une connexion est gardée plus de `seuil_detention_ms`,
+quand une tâche en demande une seconde alors qu'elle en tient déjà une
+(risque d'interblocage quand le pool est plein), et liste des détenteurs
+quand le pool est épuisé.
+
+Quand l'enregistreur est actif (enregistrement.py), chaque appel lancé par
+l'application est aussi écrit dans le fichier de session.
+
+Quand les traces sont actives (traces.py), chaque méthode, attente du pool et
+requête SQL est aussi un span de la trace courante.
+"""
+import asyncio
+import contextlib
+import functools
+import inspect
+import logging
+import os
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from enregistrement import enregistreur
+from traces import etape, span
+
+logger = logging.getLogger(__name__)
+journal_lent = logging.getLogger('requetes_lentes')
+
+# Bornes supérieures des classes : millisecondes pour les durées, nombre pour les lignes
+BORNES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float('inf'))
+BORNES_LIGNES = (0, 1, 10, 100, 1000, 10000, 100000, float('inf'))
+PHASES = ('total', 'attente_pool', 'execution', 'lecture')
+
+SEUIL_LENT_MS = 500
+SEUIL_DETENTION_MS = 1000
+# Intervalle minimal entre deux listes de détenteurs quand le pool est épuisé (secondes)
+INTERVALLE_EPUISEMENT = 30
+# Un même ordre SQL lent n'est expliqué qu'une fois par intervalle (secondes)
+INTERVALLE_EXPLAIN = 600
+EXPLICABLES = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+class Histogramme:
+    """Histogramme à classes fixes : compte, somme, max et quantiles approchés (borne de classe)."""
+
+    __slots__ = ('bornes', 'classes', 'compte', 'somme', 'max')
+
+    def __init__(self, bornes=BORNES_MS):
+        self.bornes = bornes
+        self.classes = [0] * len(bornes)
+        self.compte = 0
+        self.somme = 0.0
+        self.max = 0.0
+
+    def ajouter(self, valeur):
+        self.classes[bisect_left(self.bornes, valeur)] += 1
+        self.compte += 1
+        self.somme += valeur
+        if valeur > self.max:
+            self.max = valeur
+
+    def quantile(self, q):
+        if not self.compte:
+            return None
+        rang = q * self.compte
+        cumul = 0
+        for borne, nombre in zip(self.bornes, self.classes):
+            cumul += nombre
+            if cumul >= rang:
+                return min(borne, self.max)
+        return self.max
+
+    def resume(self):
+        return {
+            'compte': self.compte,
+            'moyenne': self.somme / self.compte if self.compte else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max,
+        }
+
+
+class _Appel:
+    """Cumul des mesures d'un appel de méthode en cours."""
+
+    __slots__ = ('methode', 'total', 'attente_pool', 'execution', 'lecture', 'lignes', 'requetes')
+
+    def __init__(self, methode):
+        self.methode = methode
+        self.total = self.attente_pool = self.execution = self.lecture = 0.0
+        self.lignes = 0
+        self.requetes = 0
+
+
+class Mesures:
+    """Histogrammes par méthode : {methode: {phase: Histogramme, 'lignes': Histogramme}}."""
+
+    def __init__(self):
+        self.methodes = {}
+
+    def enregistrer(self, appel):
+        histogrammes = self.methodes.get(appel.methode)
+        if histogrammes is None:
+            histogrammes = {phase: Histogramme() for phase in PHASES}
+            histogrammes['lignes'] = Histogramme(BORNES_LIGNES)
+            self.methodes[appel.methode] = histogrammes
+        histogrammes['total'].ajouter(appel.total)
+        if appel.requetes:
+            histogrammes['attente_pool'].ajouter(appel.attente_pool)
+            histogrammes['execution'].ajouter(appel.execution)
+            histogrammes['lecture'].ajouter(appel.lecture)
+            histogrammes['lignes'].ajouter(appel.lignes)
+
+    def resume(self):
+        return {methode: {phase: histogramme.resume() for phase, histogramme in histogrammes.items()}
+                for methode, histogrammes in list(self.methodes.items())}
+
+    def reinitialiser(self):
+        self.methodes = {}
+
+
+mesures = Mesures()
+
+# Appel de méthode DatabaseManager de la tâche courante (None hors méthode)
+_appel_courant = ContextVar('appel_courant', default=None)
+# Compteur des requêtes en échec ouvert par echecs_sql() (None hors bloc)
+_echecs_courants = ContextVar('echecs_courants', default=None)
+
+
+@contextlib.contextmanager
+def echecs_sql():
+    """
+    Compte par code d'erreur les requêtes en échec de la tâche courante pendant le bloc.
+
+    Les méthodes de DatabaseManager journalisent souvent leurs erreurs sans
+    les propager : les benchmarks s'en servent pour compter ces échecs. Les
+    tâches lancées dans le bloc (asyncio.gather) partagent le compteur.
+    """
+    compteur = Counter()
+    jeton = _echecs_courants.set(compteur)
+    try:
+        yield compteur
+    finally:
+        _echecs_courants.reset(jeton)
+
+
+def _mesurer(nom, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        appel = _Appel(nom)
+        # Appel lancé par l'application (et non par une autre méthode) : candidat à l'enregistrement
+        racine = _appel_courant.get() is None
+        jeton = _appel_courant.set(appel)
+        erreur = None
+        debut = time.perf_counter()
+        try:
+            with span(nom, 'bd'):
+                return await func(*args, **kwargs)
+        except BaseException as e:
+            erreur = type(e).__name__
+            raise
+        finally:
+            appel.total = (time.perf_counter() - debut) * 1000
+            _appel_courant.reset(jeton)
+            mesures.enregistrer(appel)
+            if racine and enregistreur.actif:
+                enregistreur.enregistrer(nom, args[1:], kwargs, debut, appel.total, erreur)
+    return wrapper
+
+
+def code_erreur(e):
+    """Code d'erreur MySQL d'une exception (ex: 1213), sinon le nom de son type."""
+    if e.args and isinstance(e.args[0], int):
+        return e.args[0]
+    return type(e).__name__
+
+
+def instrumenter(cls):
+    """Décorateur de classe : mesure chaque méthode coroutine définie dans `cls`."""
+    for nom, attribut in list(vars(cls).items()):
+        if inspect.iscoroutinefunction(attribut):
+            setattr(cls, nom, _mesurer(nom, attribut))
+    return cls
+
+
+class VerrouMesure(asyncio.Lock):
+    """asyncio.Lock dont chaque attente d'acquisition est versée dans l'histogramme `attente` (ms)."""
+
+    def __init__(self):
+        super().__init__()
+        self.attente = Histogramme()
+
+    async def acquire(self):
+        debut = time.perf_counter()
+        resultat = await super().acquire()
+        self.attente.ajouter((time.perf_counter() - debut) * 1000)
+        return resultat
+
+
+def _site_appelant():
+    """'fichier.py:ligne fonction' de l'appelant de PoolInstrumente.acquire (hors DatabaseManager.connexion)."""
+    cadre = sys._getframe(2)
+    while cadre.f_back is not None and (cadre.f_code.co_name == 'connexion'
+                                        or cadre.f_code.co_filename == contextlib.__file__):
+        cadre = cadre.f_back
+    return f"{os.path.basename(cadre.f_code.co_filename)}:{cadre.f_lineno} {cadre.f_code.co_name}"
+
+
+class _Detention:
+    """Connexion prêtée par le pool : qui la tient et depuis quand."""
+
+    __slots__ = ('site', 'methode', 'tache', 'debut')
+
+    def __init__(self, site, methode, tache):
+        self.site = site
+        self.methode = methode
+        self.tache = tache
+        self.debut = time.perf_counter()
+
+
+class PoolInstrumente:
+    """Pool aiomysql dont l'acquisition, les connexions et les curseurs sont chronométrés."""
+
+    def __init__(self, pool, seuil_lent_ms=SEUIL_LENT_MS, seuil_detention_ms=SEUIL_DETENTION_MS):
+        self._pool = pool
+        self.seuil_lent_ms = seuil_lent_ms
+        self.seuil_detention_ms = seuil_detention_ms
+        self.detention = Histogramme()
+        self._detentions = {}  # {id(connexion aiomysql): _Detention}
+        self._expliques = {}  # {requête: instant du dernier EXPLAIN}
+        self._dernier_epuisement = -INTERVALLE_EPUISEMENT
+
+    def __getattr__(self, nom):
+        return getattr(self._pool, nom)
+
+    def acquire(self):
+        return _Acquisition(self, _site_appelant())
+
+    def release(self, conn):
+        if isinstance(conn, ConnexionInstrumentee):
+            conn = conn._conn
+        detention = self._detentions.pop(id(conn), None)
+        if detention is not None:
+            duree = (time.perf_counter() - detention.debut) * 1000
+            self.detention.ajouter(duree)
+            if duree >= self.seuil_detention_ms:
+                logger.warning(f"⏳ Connexion gardée {duree:.0f} ms par {detention.methode} ({detention.site})")
+        return self._pool.release(conn)
+
+    def detenteurs(self):
+        """Connexions actuellement prêtées, les plus anciennes en premier."""
+        maintenant = time.perf_counter()
+        return [{'methode': d.methode, 'site': d.site, 'depuis_ms': (maintenant - d.debut) * 1000}
+                for d in sorted(self._detentions.values(), key=lambda d: d.debut)]
+
+    def _avant_acquisition(self, site, methode, tache):
+        for detention in self._detentions.values():
+            if tache is not None and detention.tache is tache:
+                logger.warning(f"🔁 Acquisition imbriquée : {methode} ({site}) demande une connexion alors que "
+                               f"la tâche tient déjà celle de {detention.methode} ({detention.site})")
+                break
+        if self._pool.freesize == 0 and self._pool.size >= self._pool.maxsize:
+            maintenant = time.monotonic()
+            if maintenant - self._dernier_epuisement >= INTERVALLE_EPUISEMENT:
+                self._dernier_epuisement = maintenant
+                logger.warning(f"🚱 Pool épuisé ({self._pool.size} connexions) - {methode} ({site}) attend. "
+                               "Détenteurs :\n" + '\n'.join(f"  {d['methode']} ({d['site']}) depuis {d['depuis_ms']:.0f} ms"
+                                                           for d in self.detenteurs()))
+
+    def _apres_acquisition(self, conn, site, methode, tache):
+        self._detentions[id(conn)] = _Detention(site, methode, tache)
+
+    def requete_executee(self, requete, parametres, debut, lignes, expliquer=True, erreur=None):
+        """
+        Verse la durée de la requête dans l'appel courant et journalise si elle est lente.
+
+        Une requête en échec est comptée aussi (avec son temps) ; `erreur` est
+        son code (MySQL) ou le nom de l'exception.
+        """
+        fin = time.perf_counter()
+        duree = (fin - debut) * 1000
+        if erreur is None:
+            etape('SQL', 'sql', debut, fin, requete=' '.join(requete.split())[:300], lignes=lignes)
+        else:
+            etape('SQL', 'sql', debut, fin, requete=' '.join(requete.split())[:300], erreur=erreur)
+        appel = _appel_courant.get()
+        if appel is not None:
+            appel.execution += duree
+            appel.lignes += max(lignes, 0)
+            appel.requetes += 1
+        if erreur is not None:
+            echecs = _echecs_courants.get()
+            if echecs is not None:
+                echecs[erreur] += 1
+            methode = appel.methode if appel is not None else '-'
+            logger.warning(f"⚠️ {methode} - requête en échec (erreur {erreur}) après {duree:.0f} ms: "
+                           f"{' '.join(requete.split())[:300]}")
+            return
+        if duree >= self.seuil_lent_ms:
+            methode = appel.methode if appel is not None else '-'
+            if 'password' in requete.lower():
+                parametres = '(masqués)'
+            journal_lent.warning(f"🐢 {methode} - {duree:.0f} ms, {lignes} ligne(s)\n"
+                                 f"{' '.join(requete.split())}\nparamètres: {parametres}")
+            if expliquer and parametres != '(masqués)':
+                self._expliquer_plus_tard(methode, requete, parametres)
+
+    def _expliquer_plus_tard(self, methode, requete, parametres):
+        if not requete.lstrip().upper().startswith(EXPLICABLES):
+            return
+        maintenant = time.monotonic()
+        if maintenant - self._expliques.get(requete, -INTERVALLE_EXPLAIN) < INTERVALLE_EXPLAIN:
+            return
+        self._expliques[requete] = maintenant
+        asyncio.ensure_future(self._expliquer(methode, requete, parametres))
+
+    async def _expliquer(self, methode, requete, parametres):
+        try:
+            async with self._pool.acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute("EXPLAIN FORMAT=JSON " + requete, parametres)
+                    (plan,) = await cur.fetchone()
+                await conn.commit()
+            journal_lent.warning(f"🔎 Plan de {methode}:\n{plan}")
+        except Exception as e:
+            logger.debug(f"EXPLAIN impossible pour {methode}: {e}")
+
+
+class _Acquisition:
+    """Résultat de PoolInstrumente.acquire : `await` ou `async with`, comme celui d'aiomysql."""
+
+    __slots__ = ('_pool', '_site', '_conn')
+
+    def __init__(self, pool, site):
+        self._pool = pool
+        self._site = site
+        self._conn = None
+
+    def __await__(self):
+        return self._acquerir().__await__()
+
+    async def _acquerir(self):
+        appel = _appel_courant.get()
+        methode = appel.methode if appel is not None else '-'
+        tache = asyncio.current_task()
+        self._pool._avant_acquisition(self._site, methode, tache)
+        debut = time.perf_counter()
+        conn = await self._pool._pool.acquire()
+        fin = time.perf_counter()
+        self._pool._apres_acquisition(conn, self._site, methode, tache)
+        etape('attente pool', 'bd', debut, fin)
+        if appel is not None:
+            appel.attente_pool += (fin - debut) * 1000
+        return ConnexionInstrumentee(conn, self._pool)
+
+    async def __aenter__(self):
+        self._conn = await self._acquerir()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._pool.release(self._conn)
+        self._conn = None
+
+
+class ConnexionInstrumentee:
+    """Connexion aiomysql dont `cursor()` renvoie des curseurs chronométrés."""
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, nom):
+        return getattr(self._conn, nom)
+
+    def cursor(self, *classes):
+        return _OuvertureCurseur(self._conn.cursor(*classes), self._pool)
+
+
+class _OuvertureCurseur:
+    """Résultat de ConnexionInstrumentee.cursor : `await` ou `async with`, comme celui d'aiomysql."""
+
+    __slots__ = ('_ouverture', '_pool', '_curseur')
+
+    def __init__(self, ouverture, pool):
+        self._ouverture = ouverture
+        self._pool = pool
+        self._curseur = None
+
+    def __await__(self):
+        return self._ouvrir().__await__()
+
+    async def _ouvrir(self):
+        return CurseurInstrumente(await self._ouverture, self._pool)
+
+    async def __aenter__(self):
+        self._curseur = await self._ouvrir()
+        return self._curseur
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._curseur.close()
+        self._curseur = None
+
+
+class CurseurInstrumente:
+    """Curseur aiomysql chronométré : execute/executemany/callproc (échecs compris) et fetch*."""
+
+    def __init__(self, cur, pool):
+        self._cur = cur
+        self._pool = pool
+
+    def __getattr__(self, nom):
+        return getattr(self._cur, nom)
+
+    async def execute(self, query, args=None):
+        debut = time.perf_counter()
+        erreur = None
+        try:
+            return await self._cur.execute(query, args)
+        except BaseException as e:
+            erreur = code_erreur(e)
+            raise
+        finally:
+            self._pool.requete_executee(query, args, debut, self._cur.rowcount, erreur=erreur)
+
+    async def executemany(self, query, args):
+        debut = time.perf_counter()
+        erreur = None
+        try:
+            return await self._cur.executemany(query, args)
+        except BaseException as e:
+            erreur = code_erreur(e)
+            raise
+        finally:
+            self._pool.requete_executee(query, f"{len(args)} jeu(x) de paramètres", debut, self._cur.rowcount,
+                                        expliquer=False, erreur=erreur)
+
+    async def callproc(self, procname, args=()):
+        debut = time.perf_counter()
+        erreur = None
+        try:
+            return await self._cur.callproc(procname, args)
+        except BaseException as e:
+            erreur = code_erreur(e)
+            raise
+        finally:
+            self._pool.requete_executee(f"CALL {procname}", args, debut, self._cur.rowcount, expliquer=False,
+                                        erreur=erreur)
+
+    async def _lire(self, lecture):
+        debut = time.perf_counter()
+        lignes = await lecture
+        appel = _appel_courant.get()
+        if appel is not None:
+            appel.lecture += (time.perf_counter() - debut) * 1000
+        return lignes
+
+    async def fetchone(self):
+        return await self._lire(self._cur.fetchone())
+
+    async def fetchmany(self, size=None):
+        return await self._lire(self._cur.fetchmany(size))
+
+    async def fetchall(self):
+        return await self._lire(self._cur.fetchall())
@@ -0,0 +1,212 @@
+"""
+Journalisation asynchrone de l'application.
+
+Les threads de l'application (Kivy, boucle asyncio) ne font que déposer les
+enregistrements dans une file (QueueHandler) ; un thread d'écoute
+(QueueListener) les formate et les écrit. Le message est figé (arguments,
+trace d'exception) au moment du dépôt, pas plus tard.
+
+Sorties :
+  - fichier principal en JSON, une ligne par enregistrement, avec rotation par
+    taille et compression gzip des fichiers archivés ;
+  - journal `requetes_lentes` dans son propre fichier (voir instrumentation.py) ;
+  - console en texte.
+
+Les niveaux se règlent par module et les messages fréquents sous WARNING sont
+échantillonnés par site d'appel : au-delà de `limite` messages en `fenetre`
+secondes depuis la même ligne, les suivants sont supprimés et comptés ; le
+compte est joint au premier message de la fenêtre suivante.
+
+Configuration (config.json, toutes les clés sont facultatives) :
+
+    "journalisation": {
+        "niveau": "INFO",
+        "niveaux": {"setting_bd": "WARNING", "aiomysql": "WARNING"},
+        "console": "INFO",
+        "taille_max_mo": 10,
+        "archives": 5,
+        "compression": true,
+        "echantillonnage": {"limite": 20, "fenetre": 10}
+    }
+"""
+import atexit
+import copy
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+
+JOURNAL_LENT = 'requetes_lentes'
+FORMAT_TEXTE = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_ecoute = None
+
+
+class FormatJSON(logging.Formatter):
+    """Une ligne JSON par enregistrement."""
+
+    def format(self, record):
+        entree = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'module': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+            'site': f"{record.module}:{record.lineno} {record.funcName}",
+        }
+        if record.exc_text:
+            entree['exception'] = record.exc_text
+        supprimes = getattr(record, 'supprimes', 0)
+        if supprimes:
+            entree['supprimes'] = supprimes
+        return json.dumps(entree, ensure_ascii=False, default=str)
+
+
+class FichierRotatif(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler dont les archives (.1, .2, ...) sont compressées en gzip."""
+
+    def __init__(self, chemin, taille_max, archives, compression=True):
+        super().__init__(chemin, maxBytes=taille_max, backupCount=archives, encoding='utf-8', delay=True)
+        if compression:
+            self.namer = lambda nom: nom + '.gz'
+            self.rotator = self._compresser
+
+    @staticmethod
+    def _compresser(source, destination):
+        with open(source, 'rb') as entree, gzip.open(destination, 'wb') as sortie:
+            shutil.copyfileobj(entree, sortie)
+        os.remove(source)
+
+
+class Echantillonnage(logging.Filter):
+    """Limite les messages sous WARNING à `limite` par `fenetre` secondes et par site d'appel."""
+
+    def __init__(self, limite=20, fenetre=10.0):
+        super().__init__()
+        self.limite = limite
+        self.fenetre = fenetre
+        self._sites = {}  # {(fichier, ligne): [début de fenêtre, émis, supprimés]}
+        self._verrou = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        maintenant = time.monotonic()
+        with self._verrou:
+            site = self._sites.get((record.pathname, record.lineno))
+            if site is None or maintenant - site[0] >= self.fenetre:
+                supprimes = site[2] if site is not None else 0
+                self._sites[(record.pathname, record.lineno)] = [maintenant, 1, 0]
+                if supprimes:
+                    record.supprimes = supprimes
+                return True
+            if site[1] < self.limite:
+                site[1] += 1
+                return True
+            site[2] += 1
+            return False
+
+
+class FileJournal(logging.handlers.QueueHandler):
+    """QueueHandler qui fige le message et la trace d'exception sans les formater."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class _Nom(logging.Filter):
+    """Laisse passer (ou écarte, `inverse`) les enregistrements d'un logger donné."""
+
+    def __init__(self, nom, inverse=False):
+        super().__init__()
+        self.nom = nom
+        self.inverse = inverse
+
+    def filter(self, record):
+        return (record.name == self.nom) != self.inverse
+
+
+def _niveau(valeur, defaut=logging.INFO):
+    if isinstance(valeur, int):
+        return valeur
+    return logging.getLevelName(str(valeur).upper()) if valeur else defaut
+
+
+def configurer(log_file, options=None):
+    """
+    Installe la file de journalisation sur le logger racine et démarre le thread d'écoute.
+
+    `log_file` : fichier principal ; `requetes_lentes.log` est créé à côté.
+    `options` : section "journalisation" de config.json.
+    """
+    global _ecoute
+    if _ecoute is not None:
+        return _ecoute
+    options = options or {}
+    taille_max = int(options.get('taille_max_mo', 10) * 1024 * 1024)
+    archives = options.get('archives', 5)
+    compression = options.get('compression', True)
+
+    principal = FichierRotatif(log_file, taille_max, archives, compression)
+    principal.setFormatter(FormatJSON())
+    principal.addFilter(_Nom(JOURNAL_LENT, inverse=True))
+
+    lent = FichierRotatif(os.path.join(os.path.dirname(log_file), 'requetes_lentes.log'),
+                          taille_max, archives, compression)
+    lent.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+    lent.addFilter(_Nom(JOURNAL_LENT))
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(FORMAT_TEXTE))
+    console.setLevel(_niveau(options.get('console'), logging.INFO))
+    console.addFilter(_Nom(JOURNAL_LENT, inverse=True))
+
+    file_journal = FileJournal(queue.SimpleQueue())
+    echantillonnage = options.get('echantillonnage', {})
+    if echantillonnage is not False:
+        file_journal.addFilter(Echantillonnage(echantillonnage.get('limite', 20),
+                                               echantillonnage.get('fenetre', 10.0)))
+
+    racine = logging.getLogger()
+    for ancien in racine.handlers[:]:
+        racine.removeHandler(ancien)
+    racine.addHandler(file_journal)
+    racine.setLevel(_niveau(options.get('niveau')))
+    for nom, niveau in options.get('niveaux', {'aiomysql': 'WARNING'}).items():
+        logging.getLogger(nom).setLevel(_niveau(niveau))
+
+    journal_lent = logging.getLogger(JOURNAL_LENT)
+    journal_lent.addHandler(file_journal)
+    journal_lent.setLevel(logging.INFO)
+    journal_lent.propagate = False
+
+    _ecoute = logging.handlers.QueueListener(file_journal.queue, principal, lent, console,
+                                             respect_handler_level=True)
+    _ecoute.start()
+    atexit.register(arreter)
+    return _ecoute
+
+
+def arreter():
+    """Écrit les enregistrements en attente et arrête le thread d'écoute."""
+    global _ecoute
+    if _ecoute is None:
+        return
+    _ecoute.stop()
+    for handler in _ecoute.handlers:
+        handler.close()
+    _ecoute = None
@@ -17,10 +17,12 @@ import asyncio
 import threading
 import locale
 import logging
+import os
 locale.setlocale(locale.LC_TIME, "fr_FR.utf8")  # Pour linux/MAC - Windows: French_France.1252
 
 from datetime import datetime
 from functools import partial
+from operator import attrgetter
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +33,20 @@ from kivymd.uix.dropdownitem import MDDropDownItem
 from kivymd.uix.spinner import MDSpinner
 from kivymd.toast import toast
 
+from evenements import (ClientCree, ClientSupprime, CompteCree, CompteModifie, CompteSupprime, ContratCree,
+                        ContratResilie, DatePlanifieeModifiee, DetailPlanningCree, FactureCreee, FacturePayee,
+                        MontantFactureModifie, PlanningCree, PlanningDecale, PlanningsEtendus, TraitementCree,
+                        TraitementEffectue)
+from chien_de_garde import ChienDeGarde
+from diagnostics import Diagnostics, exporter, textes
 from gestion_ecran import gestion_ecran, popup
+from horizon import ExtensionHorizon
+from recurrence import Regle, developper, horizon
+from synchronisation import SurveillantVersions
+from enregistrement import enregistreur
+from traces import rappel, trace, traceur
+from vue_tableaux import (COULEURS_ETAT, TableSynchronisee, VueTableau, inverser_date, ligne_client,
+                          ligne_coloree, ligne_contrat, ligne_planning, ligne_prevision)
 from excel import generate_comprehensive_facture_excel, generer_facture_excel, generate_traitements_excel
 
 
@@ -50,19 +65,39 @@ class Screen(MDApp):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        from setting_bd import DatabaseManager
+        from setting_bd import DatabaseManager, config, log_file
         # Parametre de la base de données
-        self.color_map = {
-            "Effectué": '008000',
-            "À venir": 'ff0000',
-            "Classé sans suite": 'FFA500'
-        }
+        self.color_map = COULEURS_ETAT
+
+        # ✅ Vues des tableaux: lignes formatées une seule fois et mises en cache
+        cle_home = lambda i: (i['date'], i['traitement'], i['etat'], i['axe'])
+        id_home = lambda i: i['id']
+        self.vue_en_cours = VueTableau(partial(ligne_coloree, self.color_map), cle=cle_home, cle_primaire=id_home)
+        self.vue_prevision = VueTableau(ligne_prevision, cle=cle_home, cle_primaire=id_home)
+        self.vue_contrat = VueTableau(ligne_contrat, minimum=9, cle_primaire=attrgetter('client_id'))
+        self.vue_client = VueTableau(ligne_client, minimum=5, cle_primaire=attrgetter('client_id'))
+        self.vue_planning = VueTableau(ligne_planning, minimum=4, cle_primaire=attrgetter('planning_id'))
         self.client_id_map = {}  # ✅ Mapping client_index -> client_id
+        # ✅ Traces de bout en bout (UI -> BD -> SQL), au format Chrome trace
+        if config.get('traces', False):
+            traceur.activer(os.path.join(os.path.dirname(log_file), f"traces_{datetime.now():%Y%m%d_%H%M%S}.json"))
+        if config.get('enregistrement', False):
+            # Session rejouable avec benchmarks/rejeu.py
+            enregistreur.activer(os.path.join(os.path.dirname(log_file),
+                                              f"session_{datetime.now():%Y%m%d_%H%M%S}.jsonl.gz"))
         self.loop = asyncio.new_event_loop()
         self.database = DatabaseManager(self.loop)
         threading.Thread(target=self.loop.run_forever, daemon=True).start()
         self.calendar = None
         asyncio.run_coroutine_threadsafe(self.database.connect(), self.loop)
+        self.surveillant = SurveillantVersions(self.database)
+        self.extension = ExtensionHorizon(self.database)
+        self.chien_de_garde = ChienDeGarde()
+        self.diagnostics = Diagnostics(self.database, self.chien_de_garde)
+        self._diagnostic = None  # Dernier instantané affiché (exporté tel quel)
+        self._rafraichissement_diagnostic = None
+        self._vues_a_rafraichir = set()
+        self._abonner_vues()
         self._screens_initialized = False  # Flag pour éviter d'initialiser 2x
 
     def _display_table_with_delay(self, place, table, delay=0.5):
@@ -84,7 +119,9 @@ class Screen(MDApp):
 
     def on_start(self):
         # Ne rien appeler ici - attendre la connexion réussie
-        pass
+        # (seule la détection des gels de l'interface démarre, elle ne touche pas à la BD)
+        Clock.schedule_interval(self.chien_de_garde.battement, 0)
+        self.chien_de_garde.demarrer()
 
     def build(self):
         #Configuration de la fenêtre
@@ -266,6 +303,13 @@ class Screen(MDApp):
             ]
         )
         
+        # ✅ Tableaux montés une fois, mis à jour ligne à ligne (TableSynchronisee)
+        self.sync_en_cours = TableSynchronisee(self.table_en_cours)
+        self.sync_prevision = TableSynchronisee(self.table_prevision)
+        self.sync_contrat = TableSynchronisee(self.liste_contrat)
+        self.sync_client = TableSynchronisee(self.liste_client)
+        self.sync_planning = TableSynchronisee(self.liste_planning)
+
         self._tables_initialized = True
         logger.info("✅ Tableaux initialisés avec succès")
 
@@ -351,11 +395,11 @@ class Screen(MDApp):
                 error_message = error.args[1] if len(error.args) >= 2 else str(error)
                 Clock.schedule_once(
                     lambda dt: self.show_dialog('Erreur', f"Erreur de base de données: {error_message}"))
-            print(f"OperationalError: {error}")  # Pour le débogage
+            logger.error(f"❌ OperationalError: {error}", exc_info=True)
 
         except Exception as e:
             Clock.schedule_once(lambda dt: self.show_dialog('Erreur', 'Une erreur inattendue est survenue.'))
-            print(f"Erreur inattendue: {e}")
+            logger.error(f"❌ Erreur inattendue: {e}", exc_info=True)
 
     def creer_contrat(self):
         from dateutil.relativedelta import relativedelta
@@ -397,52 +441,32 @@ class Screen(MDApp):
             self.popup.get_screen('ajout_planning').ids.axe_client.text = axe
             self.popup.get_screen('ajout_planning').ids.type_traitement.text = self.traitement[0]
 
-        async def create():
-            self.id_traitement = []
+        def preparer():
+            # ✅ Rien n'est écrit ici: client, contrat et traitements partent avec les plannings
+            # en un seul appel (create_full_contract) à la fin de l'assistant (save_planning)
             try:
-                # Afficher un spinner pendant la création
-                Clock.schedule_once(lambda dt: self.loading_spinner('Sidebar', 'contrat', show=True), 0)
-                
                 self.traitement, self.categorie_trait = self.get_trait_from_form()
+                self.traitements_contrat = list(zip(self.categorie_trait, self.traitement))
+                self.contrat_en_attente = {
+                    'client': {'nom': nom, 'prenom': prenom, 'email': email, 'telephone': telephone,
+                               'adresse': adresse, 'date_ajout': self.reverse_date(date_ajout),
+                               'categorie': categorie_client, 'axe': axe, 'nif': nif, 'stat': stat},
+                    'contrat': {'reference': numero_contrat, 'date_contrat': self.reverse_date(date_contrat),
+                                'date_debut': self.reverse_date(date_debut), 'date_fin': fin_contrat,
+                                'duree_contrat': duree, 'duree': duree_contrat, 'categorie': categorie_contrat},
+                    'traitements': [],
+                }
 
-                client = await self.database.create_client(
-                    nom, prenom, email, telephone, adresse,
-                    self.reverse_date(date_ajout), categorie_client, axe, nif, stat
-                )
-
-                self.contrat = await self.database.create_contrat(
-                    client,
-                    numero_contrat,
-                    self.reverse_date(date_contrat),
-                    self.reverse_date(date_debut),
-                    fin_contrat,
-                    duree,
-                    duree_contrat,
-                    categorie_contrat
-                )
-
-                for i in range(len(self.traitement)):
-                    type_traitement = await self.database.typetraitement(
-                        self.categorie_trait[i], self.traitement[i]
-                    )
-                    traitement_id = await self.database.creation_traitement(self.contrat, type_traitement)
-                    self.id_traitement.append(traitement_id)
-
-                Clock.schedule_once(lambda dt: self.loading_spinner('Sidebar', 'contrat', show=False), 0)
                 Clock.schedule_once(lambda dt: self.dismiss_popup(), 0)
                 Clock.schedule_once(lambda dt: self.fermer_ecran(), 0)
                 Clock.schedule_once(lambda dt, m=maj: m(), 0)
                 Clock.schedule_once(lambda dt: self.fenetre_contrat('Ajout du planning', 'ajout_planning'), 0)
-                Clock.schedule_once(lambda dt: self.show_dialog('Succès', 'Client et contrat créés avec succès'), 0)
 
             except Exception as e:
-                Clock.schedule_once(lambda dt: self.loading_spinner('Sidebar', 'contrat', show=False), 0)
-                print(f"❌ Erreur création contrat : {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error(f"❌ Erreur création contrat : {e}", exc_info=True)
                 Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Erreur création contrat: {str(e)}'), 0)
 
-        asyncio.run_coroutine_threadsafe(create(), self.loop)
+        preparer()
 
     async def get_client(self):
         try:
@@ -452,7 +476,7 @@ class Screen(MDApp):
                 self.update_contract_table(place, result)
 
         except Exception as e:
-            print(f"Erreur lors de la récupération des clients: {e}")
+            logger.error(f"❌ Erreur lors de la récupération des clients: {e}", exc_info=True)
             self.show_dialog("Erreur", "Une erreur est survenue lors du chargement des clients.")
 
     def gestion_planning(self):
@@ -483,11 +507,9 @@ class Screen(MDApp):
         elif not self.traitement:
             self.dismiss_popup()
             self.fermer_ecran()
-            Clock.schedule_once(lambda dt: asyncio.run_coroutine_threadsafe(self.populate_tables(), self.loop), 0.5)
 
             self.clear_fields('new_contrat')
-            Clock.schedule_once(lambda dt: self.show_dialog('Enregistrement réussie', 'Le contrat a été bien enregistré'), 0)
-            self.remove_tables('contrat')
+            # Le résultat (succès ou erreur) est affiché par save_planning après create_full_contract
 
         else:
 
@@ -500,17 +522,15 @@ class Screen(MDApp):
             self.fenetre_contrat('Ajout du planning','ajout_planning')
 
     def save_planning(self):
-        from dateutil.relativedelta import relativedelta
-
         mois_debut = self.popup.get_screen('ajout_planning').ids.mois_date.text
         mois_fin = self.popup.get_screen('ajout_planning').ids.mois_fin.text
         date_prevu = self.popup.get_screen('ajout_planning').ids.date_prevu.text
         fréquence = self.popup.get_screen('ajout_planning').ids.red_trait.text
         duree_contrat = self.popup.get_screen('new_contrat').ids.duree_new_contrat.text
         date_debut = self.popup.get_screen('new_contrat').ids.debut_new_contrat.text
-        temp = date_debut.split('-')
-        date = datetime.strptime(f'{temp[0]}-{temp[1]}-{temp[2]}', "%d-%m-%Y")
-        date_fin = date + relativedelta(month=+11)
+        fin_new_contrat = self.popup.get_screen('new_contrat').ids.fin_new_contrat.text
+        fin_contrat = (datetime.strptime(fin_new_contrat, "%d-%m-%Y").date()
+                       if duree_contrat == 'Déterminée' and fin_new_contrat else None)
 
         montant = self.popup.get_screen('ajout_facture').ids.montant.text
         axe_client = self.popup.get_screen('ajout_facture').ids.axe_client.text
@@ -521,7 +541,7 @@ class Screen(MDApp):
         # - "1 mois" → int_red = 1 (1 traitement CHAQUE mois pendant 12 mois)
         # - "2 mois" → int_red = 2 (1 traitement TOUS LES 2 MOIS pendant 12 mois)
         # - "3 mois" → int_red = 3 (1 traitement TOUS LES 3 MOIS pendant 12 mois)
-        # - duree='Indéterminée' → la fréquence s'applique sur 12 mois
+        # - duree='Indéterminée' → la fréquence s'applique sur HORIZON_ANNEES (recurrence)
         if fréquence == 'une seule fois':
             int_red = 0  # Cas spécial: une SEULE date
         else:
@@ -529,141 +549,106 @@ class Screen(MDApp):
             int_red = int(fréquence.split(" ")[0])
         
         # duree_contrat ne change pas le calcul de int_red
-        # Si duree='Déterminée', on utilise mois_debut et mois_fin
-        # Si duree='Indéterminée', on génère sur 12 mois avec la fréquence int_red
+        # Si duree='Déterminée', les dates s'arrêtent à la fin du contrat
+        # Si duree='Indéterminée', on génère sur HORIZON_ANNEES avec la fréquence int_red
+
+        contrat = self.contrat_en_attente
+        categorie, type_traitement = self.traitements_contrat[len(self.traitements_contrat) - len(self.traitement) - 1]
+        dernier = not self.traitement  # Dernier traitement: tout le contrat part en un seul appel
+
+        def preparer():
+            # ✅ CORRECTION: Vérifier que verifier_mois ne retourne pas 'Erreur'
+            mois_debut_verif = self.verifier_mois(mois_debut)
+            if mois_debut_verif == 'Erreur':
+                raise ValueError('Mois de début invalide')
+
+            debut = datetime.strptime(mois_debut_verif, "%B").month
+
+            # ✅ CORRECTION: Vérifier mois_fin aussi
+            # Si mois_fin est 'Indéterminée', fin = 0 (valeur spéciale pour indiquer pas de fin)
+            fin = 0
+            if mois_fin != 'Indéterminée':
+                mois_fin_verif = self.verifier_mois(mois_fin)
+                if mois_fin_verif == 'Erreur':
+                    raise ValueError('Mois de fin invalide')
+                fin = datetime.strptime(mois_fin_verif, "%B").month
+            else:
+                # ✅ CORRECTION: Si duree est Déterminée mais mois_fin est Indéterminée = incohérence
+                if duree_contrat == 'Déterminée':
+                    raise ValueError('Si durée est déterminée, mois de fin est obligatoire')
+
+            # ✅ CORRECTION: Vérifier que montant n'est pas vide
+            if not montant:
+                raise ValueError('Le montant est obligatoire')
+
+            premiere = datetime.strptime(self.reverse_date(date_prevu), "%Y-%m-%d").date()
+            traitement = {
+                'categorie': categorie,
+                'type': type_traitement,
+                'montant': int(montant.replace(' ', '')),
+                'axe': axe_client,
+                'planning': {'date_debut': self.reverse_date(date_debut), 'mois_debut': debut, 'mois_fin': fin,
+                             'redondance': int_red, 'date_fin': fin_contrat or horizon(premiere)},
+            }
+            if self.database.stockage_regles and int_red > 0:
+                # ✅ Mode règle: seule la règle est enregistrée, les occurrences sont calculées à la lecture
+                traitement['regle'] = {'premiere': premiere, 'fin': fin_contrat}
+            else:
+                traitement['dates'] = self.planning_per_year(date_prevu, int_red, fin_contrat)
+            if int_red == 12:
+                contrat['contrat']['duree_contrat'] = 1
+            return traitement
+
+        try:
+            contrat['traitements'].append(preparer())
+        except Exception as e:
+            # Un traitement invalide annule tout le contrat : pas d'enregistrement partiel
+            message = f"{e}\nLe contrat n'a pas été enregistré."
+            logger.warning(f"⚠️ save_planning annulé ({type_traitement}): {e}")
+            self.contrat_en_attente = None
+            self.traitement = []
+            self.dismiss_popup()
+            self.fermer_ecran()
+            Clock.schedule_once(lambda dt: self.show_dialog('Erreur', message), 0)
+            return
 
         async def save():
             try:
-                # ✅ CORRECTION: Vérifier que verifier_mois ne retourne pas 'Erreur'
-                mois_debut_verif = self.verifier_mois(mois_debut)
-                if mois_debut_verif == 'Erreur':
-                    Clock.schedule_once(lambda dt: self.show_dialog('Erreur', 'Mois de début invalide'), 0)
-                    return
-                
-                debut = datetime.strptime(mois_debut_verif, "%B").month
-                
-                # ✅ CORRECTION: Vérifier mois_fin aussi
-                # Si mois_fin est 'Indéterminée', fin = 0 (valeur spéciale pour indiquer pas de fin)
-                fin = 0
-                if mois_fin != 'Indéterminée':
-                    mois_fin_verif = self.verifier_mois(mois_fin)
-                    if mois_fin_verif == 'Erreur':
-                        Clock.schedule_once(lambda dt: self.show_dialog('Erreur', 'Mois de fin invalide'), 0)
-                        return
-                    fin = datetime.strptime(mois_fin_verif, "%B").month
-                else:
-                    # ✅ CORRECTION: Si duree est Déterminée mais mois_fin est Indéterminée = incohérence
-                    if duree_contrat == 'Déterminée':
-                        Clock.schedule_once(lambda dt: self.show_dialog('Erreur', 'Si durée est déterminée, mois de fin est obligatoire'), 0)
-                        return
-                
-                # ✅ CORRECTION: Vérifier que montant n'est pas vide
-                if not montant:
-                    Clock.schedule_once(lambda dt: self.show_dialog('Erreur', 'Le montant est obligatoire'), 0)
-                    return
-                
-                # ✅ CORRECTION: Afficher spinner pendant la création
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'ajout_planning', show=True), 0)
-                
-                # ✅ CORRECTION: Vérifier que self.contrat n'est pas None avant utilisation
-                if int_red == 12 and self.contrat:
-                    await self.database.un_jour(self.contrat)
-                    self.contrat = None
-                
-                planning = await self.database.create_planning(self.id_traitement[0],
-                                                               self.reverse_date(date_debut),
-                                                               debut,
-                                                               fin,
-                                                               int_red,
-                                                               date_fin)
-
-                dates_planifiees = self.planning_per_year(date_prevu, int_red)
-                
-                # ✅ CORRECTION: Créer tous les détails de planning et factures
-                factures_creees = 0
-                for idx, date in enumerate(dates_planifiees):
-                    try:
-                        planning_detail = await self.database.create_planning_details(planning, date)
-                        await self.database.create_facture(planning_detail,
-                                                           int(montant) if ' ' not in montant else int(montant.replace(' ', '')),
-                                                           date,
-                                                           axe_client)
-                        factures_creees += 1
-                        print(f"✅ Facture {factures_creees}/{len(dates_planifiees)} créée pour {date}")
-
-                    except Exception as e:
-                        print(f"❌ Erreur création facture {idx+1}: {e}")
-                        import traceback
-                        traceback.print_exc()
-
-                self.id_traitement.pop(0)
+
+                # ✅ Client, contrat, traitements, dates et factures: un seul appel, une seule transaction
+                resultat = await self.database.create_full_contract(contrat)
+
+                factures = sum(len(t.get('dates', ())) for t in contrat['traitements'])
+                message = f"Contrat enregistré : {len(resultat['traitements'])} planning(s), {factures} facture(s)"
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'ajout_planning', show=False), 0.2)
-                Clock.schedule_once(lambda dt: self.show_dialog('Succès', f'{factures_creees} facture(s) créée(s)'), 0.3)
+                Clock.schedule_once(lambda dt: self.show_dialog('Succès', message), 0.3)
 
             except Exception as e:
+                message = f'Erreur planning: {e}'
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'ajout_planning', show=False), 0)
-                print(f"❌ Erreur save_planning: {e}")
-                import traceback
-                traceback.print_exc()
-                Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Erreur planning: {str(e)}'), 0)
+                logger.error(f"❌ Erreur save_planning: {e}", exc_info=True)
+                Clock.schedule_once(lambda dt: self.show_dialog('Erreur', message), 0)
 
-        asyncio.run_coroutine_threadsafe(save(), self.loop)
+        if dernier:
+            asyncio.run_coroutine_threadsafe(save(), self.loop)
         self.gestion_planning()
 
-    def planning_per_year(self, debut, fréquence):
-        """Génère les dates de planning selon la fréquence
-        
+    def planning_per_year(self, debut, fréquence, fin=None):
+        """Génère les dates de planning selon la fréquence (voir recurrence)
+
         fréquence = 0: Une seule fois → 1 date
-        fréquence = 1: Chaque mois → 12 dates (0, 1, 2, ..., 11 mois)
-        fréquence = 2: Tous les 2 mois → 6 dates (0, 2, 4, 6, 8, 10 mois)
-        fréquence = 3: Tous les 3 mois → 4 dates (0, 3, 6, 9 mois)
+        fréquence = N: Tous les N mois, jusqu'à `fin` (contrat déterminé)
+                       ou sur HORIZON_ANNEES années (contrat indéterminé)
         """
-        from datetime import timedelta
-        from tester_date import ajuster_si_weekend, jours_feries
-
-        pas = int(fréquence)
         date = datetime.strptime(self.reverse_date(debut), "%Y-%m-%d").date()
-
-        def ajouter_mois(date_depart, nombre_mois):
-            import calendar
-            """Ajoute un nombre de mois à une date."""
-            mois = date_depart.month - 1 + nombre_mois
-            annee = date_depart.year + mois // 12
-            mois = mois % 12 + 1
-            jour = min(date_depart.day, calendar.monthrange(annee, mois)[1])
-            return datetime(annee, mois, jour).date()
-
-        dates = []
-        
-        # ✅ CORRECTION: Cas spécial "une seule fois" (pas=0)
-        if pas == 0:
-            # Une seule date
-            date_unique = ajuster_si_weekend(date)
-            feries = jours_feries(date_unique.year)
-            while date_unique in feries.values():
-                date_unique += timedelta(days=1)
-            dates.append(date_unique)
-        else:
-            # Cas normal: générer une date tous les pas mois pendant 12 mois
-            # Pour pas=1 (chaque mois): génère 12 dates
-            # Pour pas=2 (tous les 2 mois): génère 6 dates
-            # Pour pas=3 (tous les 3 mois): génère 4 dates
-            # Etc.
-            for i in range(12 // pas):
-                date_suivante = ajouter_mois(date, i * pas)
-                date_suivante = ajuster_si_weekend(date_suivante)
-                feries = jours_feries(date_suivante.year)
-                while date_suivante in feries.values():
-                    date_suivante += timedelta(days=1)
-                dates.append(date_suivante)
-
-        return dates
+        return developper(Regle(date, int(fréquence), fin))
 
     async def get_all_planning(self):
         try:
             return await self.database.get_all_planning()
         except Exception as e:
-            print('func get_all_planning', e)
+            logger.error(f"❌ Erreur get_all_planning: {e}", exc_info=True)
             return []
 
     def update_account(self, nom, prenom, email, username, password, confirm):
@@ -701,9 +686,7 @@ class Screen(MDApp):
 
                 _post_update_ui_actions()
             except Exception as error:
-                print(f'❌ Erreur update_account: {error}')
-                import traceback
-                traceback.print_exc()
+                logger.error(f'❌ Erreur update_account: {error}', exc_info=True)
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'compte', show=False), 0)
                 Clock.schedule_once(lambda dt: self.show_dialog("Erreur", f'Modification echouee: {str(error)}'), 0)
 
@@ -728,25 +711,14 @@ class Screen(MDApp):
             # ✅ Afficher spinner pendant suppression
             Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'planning', show=True), 0)
             
-            await self.database.delete_client(self.current_client[0])
-            
-            # ✅ CORRECTION: Attendre que la BD traite la suppression
-            await asyncio.sleep(0.5)
-            
-            # ✅ CORRECTION: Lancer les rafraîchissements en PARALLÈLE et ATTENDRE
-            await asyncio.gather(
-                self.populate_tables(),
-                self.all_clients()
-            )
-            
-            Clock.schedule_once(lambda dt: self.remove_tables('contrat'), 0)
+            # ✅ Les vues concernées se rafraîchissent via l'événement ClientSupprime
+            await self.database.delete_client(self.current_client.client_id)
+
             Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'planning', show=False), 0)
             Clock.schedule_once(lambda dt: self.show_dialog('Suppression reussi', 'Le client a bien ete supprime'), 0)
 
         except Exception as e:
-            print(f'❌ Erreur suppression client: {e}')
-            import traceback
-            traceback.print_exc()
+            logger.error(f'❌ Erreur suppression client: {e}', exc_info=True)
             Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'planning', show=False), 0)
             Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Suppression echouee: {str(e)}'), 0)
 
@@ -759,7 +731,7 @@ class Screen(MDApp):
             place = self.root.get_screen('Sidebar').ids['gestion_ecran'].get_screen('planning').ids.tableau_planning
             place.clear_widgets()
         except Exception as e:
-            print(f"⚠️ Screen 'planning' non trouvé: {e}")
+            logger.warning(f"⚠️ Screen 'planning' non trouvé: {e}")
             return
         
         # ✅ Afficher spinner immediatement (avec gestion d'erreur)
@@ -784,12 +756,9 @@ class Screen(MDApp):
                     Clock.schedule_once(lambda dt: self.dismiss_popup(), 0.1)
                     Clock.schedule_once(lambda dt: self.fermer_ecran(), 0.1)
                     Clock.schedule_once(lambda dt: self.show_dialog('', 'Suppression du compte reussie'), 0.2)
-                    Clock.schedule_once(lambda dt: self.remove_tables('compte'), 0.5)
 
                 except Exception as error:
-                    print(f'❌ Erreur delete_account: {error}')
-                    import traceback
-                    traceback.print_exc()
+                    logger.error(f'❌ Erreur delete_account: {error}', exc_info=True)
                     Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'compte', show=False), 0)
                     Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Suppression echouee: {str(error)}'), 0)
 
@@ -976,33 +945,28 @@ class Screen(MDApp):
         self.root.current = 'before login'
         self.admin = False
         self.compte = None
+        self.surveillant.arreter()
+        self.extension.arreter()
+        self.fermer_diagnostics()
 
     def close_dialog(self, *args):
         """Ferme le dialogue courant"""
         if hasattr(self, 'dialogue') and self.dialogue:
             self.dialogue.dismiss()
             self.dialogue = None
-        print("✅ Dialogue fermé")
+        logger.info("✅ Dialogue fermé")
 
     def reverse_date(self, ex_date):
-        if not ex_date:
-            return 'N/A'
-        date_str = str(ex_date).strip()
-        parts = date_str.split('-')
-        if len(parts) != 3:
-            return date_str  # Return as-is if format is unexpected
-        y, m, d = parts
-        date = f'{d}-{m}-{y}'
-        return date
+        return inverser_date(ex_date)
 
     def calendrier(self, ecran, champ):
         from kivymd.uix.pickers import MDDatePicker
 
         if not self.calendar:
             if ecran == 'ecran_decalage' or ecran == 'modif_date':
-                self.calendar = MDDatePicker(year=self.planning_detail[9].year,
-                                             month=self.planning_detail[9].month,
-                                             day=self.planning_detail[9].day,
+                self.calendar = MDDatePicker(year=self.planning_detail.date_planification.year,
+                                             month=self.planning_detail.date_planification.month,
+                                             day=self.planning_detail.date_planification.day,
                                              primary_color='#A5D8FD')
             else:
                 self.calendar = MDDatePicker(primary_color='#A5D8FD')
@@ -1075,16 +1039,13 @@ class Screen(MDApp):
 
         async def modifier(date_val):
             try:
-                await self.database.modifier_date(self.planning_detail[8], self.reverse_date(date_val))
+                await self.database.modifier_date(self.planning_detail.planning_detail_id, self.reverse_date(date_val))
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'modif_date', show=False), 0)
                 Clock.schedule_once(lambda dt: self.show_dialog('Succès', 'Date modifiée avec succès'), 0)
                 Clock.schedule_once(lambda dt: self.dismiss_popup(), 0.5)
                 Clock.schedule_once(lambda dt: self.fermer_ecran(), 0.5)
-                Clock.schedule_once(lambda dt: self.remove_tables('planning'), 0.6)
             except Exception as e:
-                print(f'❌ Erreur changer_date: {e}')
-                import traceback
-                traceback.print_exc()
+                logger.error(f'❌ Erreur changer_date: {e}', exc_info=True)
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'modif_date', show=False), 0)
                 Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Modification échouée: {str(e)}'), 0)
 
@@ -1118,7 +1079,7 @@ class Screen(MDApp):
                 except ValueError as e:
                     raise ValueError(f"Prix invalide: {e}")
                 
-                facture_id = await self.database.get_facture_id(self.current_client[0], self.date)
+                facture_id = await self.database.get_facture_id(self.current_client.client_id, self.date)
                 
                 if not facture_id:
                     raise ValueError("Facture non trouvée")
@@ -1127,11 +1088,8 @@ class Screen(MDApp):
                 Clock.schedule_once(lambda dt: self.show_dialog('Succès', 'Changement de prix réussi'), 0)
                 Clock.schedule_once(lambda dt: self.dismiss_popup(), 0.5)
                 Clock.schedule_once(lambda dt: self.fermer_ecran(), 0.5)
-                Clock.schedule_once(lambda dt: self.remove_tables('facture'), 0.6)
             except Exception as e:
-                print(f'❌ Erreur changer_prix: {e}')
-                import traceback
-                traceback.print_exc()
+                logger.error(f'❌ Erreur changer_prix: {e}', exc_info=True)
                 Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Modification de prix échouée: {str(e)}'), 0)
 
         # ✅ CORRECTION: Nettoyer les prix de manière cohérente
@@ -1173,8 +1131,8 @@ class Screen(MDApp):
             etat = row_value[2] if len(row_value) > 2 else 'N/A'
             
             # ✅ Récupérer les infos client et traitement
-            client_nom = f"{self.current_client[1]} {self.current_client[2]}" if self.current_client else "N/A"
-            traitement = self.current_client[5] if self.current_client else "N/A"
+            client_nom = f"{self.current_client.nom} {self.current_client.prenom}" if self.current_client else "N/A"
+            traitement = self.current_client.type_traitement if self.current_client else "N/A"
             
             logger.info(f"✅ Modification prix pour: {row_value[0]} (Prix: {prix_initial}) - {client_nom} - {traitement}")
             
@@ -1271,12 +1229,12 @@ class Screen(MDApp):
         
         # ✅ CORRECTION: Vérifier que current_client n'est pas None
         if self.current_client is None:
-            print(f"❌ Erreur afficher_facture: current_client est None")
+            logger.error(f"❌ Erreur afficher_facture: current_client est None")
             self.show_dialog('Erreur', 'Erreur: Client non sélectionné')
             acceuil.dismiss()
             return
         
-        self.popup.get_screen('facture').ids.titre.text = f'Les factures de {self.current_client[1]} pour {self.current_client[5]}'
+        self.popup.get_screen('facture').ids.titre.text = f'Les factures de {self.current_client.nom} pour {self.current_client.type_traitement}'
 
         # ✅ Afficher spinner immediatement
         Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'facture', show=True), 0)
@@ -1284,20 +1242,20 @@ class Screen(MDApp):
         def recup():
             asyncio.run_coroutine_threadsafe(self.recuperer_donnee(place), self.loop)
 
-        Clock.schedule_once(lambda dt, r=recup: r(), 0.2)
+        Clock.schedule_once(rappel(lambda dt, r=recup: r(), 'recup'), 0.2)
 
         self.dialog.open()
 
+    @trace()
     async def recuperer_donnee(self, place):
         try:
-            facture, paye, non_paye = await self.database.get_facture(self.current_client[0], self.current_client[5])
-            Clock.schedule_once(lambda dt: self.afficher_tableau_facture(place, facture, paye, non_paye), 0.2)
+            facture, paye, non_paye = await self.database.get_facture(self.current_client.client_id, self.current_client.type_traitement)
+            Clock.schedule_once(rappel(lambda dt: self.afficher_tableau_facture(place, facture, paye, non_paye),
+                                       'afficher_tableau_facture'), 0.2)
             Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'facture', show=False), 0.3)
 
         except Exception as e:
-            print(f'❌ Erreur recuperation factures: {e}')
-            import traceback
-            traceback.print_exc()
+            logger.error(f'❌ Erreur recuperation factures: {e}', exc_info=True)
             Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'facture', show=False), 0)
             Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Erreur chargement factures: {str(e)}'), 0)
 
@@ -1328,13 +1286,13 @@ class Screen(MDApp):
             btn_next = pagination.ids.button_forward
 
             def on_press_page(direction, instance=None):
-                print(f"📄 Pagination facture: {direction} | page avant: {self.page_facture}")
+                logger.debug(f"📄 Pagination facture: {direction} | page avant: {self.page_facture}")
                 max_page = (len(row_data) - 1) // 5 + 1
                 if direction == 'moins' and self.page_facture > 1:
                     self.page_facture -= 1
                 elif direction == 'plus' and self.page_facture < max_page:
                     self.page_facture += 1
-                print(f"   page après: {self.page_facture}")
+                logger.debug(f"page après: {self.page_facture}")
 
             btn_prev.bind(on_press=partial(on_press_page, 'moins'))
             btn_next.bind(on_press=partial(on_press_page, 'plus'))
@@ -1381,6 +1339,7 @@ class Screen(MDApp):
 
         self.dialog.open()
 
+    @trace()
     def fenetre_client(self, titre, ecran):
         from kivymd.uix.dialog import MDDialog
 
@@ -1677,9 +1636,7 @@ class Screen(MDApp):
                 Clock.schedule_once(lambda dt: self.show_dialog('Information', 'Aucun client trouvé.'), 0)
 
         except Exception as e:
-            print(f"Erreur lors de la récupération des clients: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"❌ Erreur lors de la récupération des clients: {e}", exc_info=True)
             Clock.schedule_once(lambda dt: self.show_dialog('Erreur', 'Une erreur est survenue lors du chargement des clients.'), 0)
 
     def signaler(self):
@@ -1712,62 +1669,51 @@ class Screen(MDApp):
                 # ✅ CORRECTION: Logique correcte des deux options
                 # Option 1: CHANGER redondance = calculer intervalle et modifier TOUTES les dates futures
                 # Option 2: GARDER redondance = modifier JUSTE la date sélectionnée
-                
+                changements = []
+
                 if decaler.active:  # Changer la redondance
                     try:
                         date = datetime.strptime(self.reverse_date(date_decalage), '%Y-%m-%d')
-                        newdate = abs(relativedelta(self.planning_detail[9], date))
-                        print(f"📅 CHANGER redondance - intervalle: {newdate.months} mois pour TOUTES les dates futures")
-                        await self.database.modifier_date_signalement(self.planning_detail[7], self.planning_detail[8], self.option.lower(), newdate.months)
+                        newdate = abs(relativedelta(self.planning_detail.date_planification, date))
+                        logger.info(f"📅 CHANGER redondance - intervalle: {newdate.months} mois pour TOUTES les dates futures")
+                        changements = await self.database.modifier_date_signalement(self.planning_detail.planning_id, self.planning_detail.planning_detail_id, self.option.lower(), newdate.months)
                     except ValueError as e:
-                        print(f'❌ Erreur parsing date: {e}')
+                        logger.error(f'❌ Erreur parsing date: {e}', exc_info=True)
                         raise
                 elif garder.active:  # Garder la redondance
-                    print(f"🔄 GARDER redondance - modifier JUSTE cette date")
-                    await self.database.modifier_date(self.planning_detail[8], self.reverse_date(date_decalage))
+                    logger.info(f"🔄 GARDER redondance - modifier JUSTE cette date")
+                    await self.database.modifier_date(self.planning_detail.planning_detail_id, self.reverse_date(date_decalage))
 
                 # Enregistrer le signalement
-                await self.database.creer_signalment(self.planning_detail[8], motif, self.option.capitalize())
+                await self.database.creer_signalment(self.planning_detail.planning_detail_id, motif, self.option.capitalize())
                 
                 # ✅ CORRECTION: Recharger planning_detail pour voir les changements
-                self.planning_detail = await self.database.get_info_planning(self.planning_detail[7], self.reverse_date(self.planning_detail[9]))
-                
-                # ✅ CORRECTION: Refraîchir les tableaux AVANT de masquer le spinner
-                # Attendre que les modifications soient écrites en BD
-                await asyncio.sleep(0.5)
-                
-                # ✅ CORRECTION: Recharger TOUS les tableaux (Home + Planning)
-                await self.populate_tables()
-                
-                # ✅ Recharger aussi le tableau Planning si on est actuellement sur Planning
-                try:
-                    if self.root.get_screen('Sidebar').ids['gestion_ecran'].current == 'planning':
-                        planning_place = self.root.get_screen('Sidebar').ids['gestion_ecran'].get_screen('planning').ids.tableau_planning
-                        all_planning = await self.get_all_planning()
-                        self.tableau_planning(planning_place, all_planning)
-                except Exception as e:
-                    logger.warning(f"⚠️ Impossible de recharger planning directement: {e}")
-                
-                # ✅ CORRECTION: Masquer spinner et afficher succès
+                self.planning_detail = await self.database.get_info_planning(self.planning_detail.planning_id, self.reverse_date(self.planning_detail.date_planification))
+
+                # ✅ Home se rafraîchit via PlanningDecale / DatePlanifieeModifiee
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'ecran_decalage', show=False), 0)
-                Clock.schedule_once(lambda dt: self.show_dialog('Succès', f"Signalement d'un {self.option.lower()} effectué"), 0)
+                message = f"Signalement d'un {self.option.lower()} effectué"
+                if changements:
+                    _, avant, apres = changements[0]
+                    message += (f"\n{len(changements)} date(s) modifiée(s) : "
+                                f"{self.reverse_date(avant)} → {self.reverse_date(apres)}"
+                                + (f" ... {self.reverse_date(changements[-1][2])}" if len(changements) > 1 else ""))
+                Clock.schedule_once(lambda dt: self.show_dialog('Succès', message), 0)
                 Clock.schedule_once(lambda dt: self.clear_fields('signalement'), 0.5)
-                Clock.schedule_once(lambda dt: self.remove_tables('planning'), 0.6)
 
             except Exception as e:
-                print(f'❌ Erreur enregistrement signalement: {e}')
-                import traceback
-                traceback.print_exc()
-                # ✅ CORRECTION: Masquer spinner et afficher erreur
+                # Décalage non appliqué : le signalement n'est pas enregistré non plus
+                message = f'Enregistrement échoué: {e}'
+                logger.error(f"❌ Erreur enregistrement signalement: {e}", exc_info=True)
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'ecran_decalage', show=False), 0)
-                Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Enregistrement échoué: {str(e)}'), 0)
+                Clock.schedule_once(lambda dt: self.show_dialog('Erreur', message), 0)
 
         asyncio.run_coroutine_threadsafe(enregistrer_signalment(), self.loop)
 
     def option_decalage(self, titre):
-        self.popup.get_screen('ecran_decalage').ids.titre.text= f'Signalement d\'un {titre} pour {self.planning_detail[0]}'
+        self.popup.get_screen('ecran_decalage').ids.titre.text= f'Signalement d\'un {titre} pour {self.planning_detail.nom}'
         label = "l'avancement" if titre == 'avancement' else 'le décalage'
-        self.popup.get_screen('ecran_decalage').ids.date_prevu.text = self.reverse_date(self.planning_detail[9])
+        self.popup.get_screen('ecran_decalage').ids.date_prevu.text = self.reverse_date(self.planning_detail.date_planification)
         self.popup.get_screen('ecran_decalage').ids.label_decalage.text = f'Date pour {label}'
         self.option = titre
         self.fenetre_planning('', 'ecran_decalage')
@@ -1813,13 +1759,57 @@ class Screen(MDApp):
                 result = future.result()
                 Clock.schedule_once(lambda dt: self.tableau_planning(place, result), 0.5)
             except Exception as e:
-                print("Erreur de chargement planning :", e)
+                logger.error(f"❌ Erreur de chargement planning: {e}", exc_info=True)
 
         threading.Thread(target=lambda: handle_result(future)).start()
 
     def switch_to_about(self):
         self.root.get_screen('Sidebar').ids['gestion_ecran'].current =  'about'
 
+    def switch_to_diagnostics(self):
+        if self.admin:
+            self.root.get_screen('Sidebar').ids['gestion_ecran'].current = 'diagnostics'
+
+    def ouvrir_diagnostics(self):
+        """Entrée sur l'écran Diagnostics : mesure des images et rafraîchissement toutes les 2 s."""
+        self.diagnostics.reinitialiser_images()
+        Clock.schedule_interval(self.diagnostics.image, 0)
+        Clock.schedule_interval(self.rafraichir_diagnostics, 2)
+        self.rafraichir_diagnostics()
+
+    def fermer_diagnostics(self):
+        Clock.unschedule(self.diagnostics.image)
+        Clock.unschedule(self.rafraichir_diagnostics)
+
+    def rafraichir_diagnostics(self, *args):
+        if self._rafraichissement_diagnostic is not None and not self._rafraichissement_diagnostic.done():
+            return  # Instantané précédent encore en cours (BD lente)
+
+        async def lire():
+            instantane = await self.diagnostics.instantane()
+            Clock.schedule_once(lambda dt: self.afficher_diagnostics(instantane), 0)
+
+        self._rafraichissement_diagnostic = asyncio.run_coroutine_threadsafe(lire(), self.loop)
+
+    def afficher_diagnostics(self, instantane):
+        self._diagnostic = instantane
+        ecran = self.root.get_screen('Sidebar').ids['gestion_ecran'].get_screen('diagnostics')
+        for cle, texte in textes(instantane).items():
+            ecran.ids[cle].text = texte
+
+    def exporter_diagnostics(self):
+        from setting_bd import log_file
+
+        if self._diagnostic is None:
+            toast('Aucun diagnostic à exporter')
+            return
+        try:
+            chemin = exporter(self._diagnostic, os.path.dirname(log_file))
+            toast(f'Diagnostic exporté : {chemin}')
+        except Exception as e:
+            logger.error(f"❌ Export diagnostic échoué: {e}", exc_info=True)
+            self.show_dialog('Erreur', f'Export échoué : {e}')
+
     def switch_to_main(self):
         logger.info("🔹 switch_to_main() appelée")
         # ✅ ÉTAPE 1 - Charger Sidebar.kv + gestion_ecran si pas encore chargé (essentiel)
@@ -1837,6 +1827,11 @@ class Screen(MDApp):
             self._screens_initialized = True
             logger.info("  ➜ Appel populate_tables()...")
             asyncio.run_coroutine_threadsafe(self.populate_tables(), self.loop)
+
+        # ✅ Synchronisation des changements faits depuis les autres postes
+        self.surveillant.demarrer(self.loop, self.synchroniser_vues)
+        # ✅ Prolongation quotidienne des plannings à durée indéterminée
+        self.extension.demarrer(self.loop)
         
         # ✅ ÉTAPE 4 - Charger les écrans popup additionnels après login
         logger.info(f"  ➜ _popup_full_loaded={self._popup_full_loaded}")
@@ -1854,6 +1849,9 @@ class Screen(MDApp):
     def _show_home_after_login(self):
         """Affiche Home après que les données soient chargées"""
         self.root.current = 'Sidebar'
+        # Diagnostics réservé aux administrateurs
+        self.root.get_screen('Sidebar').ids.diagnostics.opacity = 1 if self.admin else 0
+        self.root.get_screen('Sidebar').ids.diagnostics.disabled = not self.admin
         self.root.get_screen('Sidebar').ids['gestion_ecran'].current = 'Home'
 
     def _load_additional_popup_screens(self):
@@ -1949,13 +1947,14 @@ class Screen(MDApp):
             logger.warning(f"⚠️ Spinner '{ecran}' non trouvé: {e}")
             pass
 
+    @trace()
     def traitement_par_client(self, source):
         if not self.current_client:
             self.show_dialog('Erreur', 'Aucun client sélectionné ou contrat trouvé')
             return
         
         self.fermer_ecran()
-        self.popup.get_screen('all_treatment').ids.titre.text = f'Tous les traitements de {self.current_client[1]}'
+        self.popup.get_screen('all_treatment').ids.titre.text = f'Tous les traitements de {self.current_client.nom}'
         place = self.popup.get_screen('all_treatment').ids.tableau_treat
         place.clear_widgets()
 
@@ -1965,10 +1964,10 @@ class Screen(MDApp):
         Clock.schedule_once(lambda dt: self.fenetre_contrat('', 'all_treatment'), 0.5)
 
         def maj_ecran():
-            asyncio.run_coroutine_threadsafe(self.liste_traitement_par_client(place, self.current_client[0]), self.loop)
+            asyncio.run_coroutine_threadsafe(self.liste_traitement_par_client(place, self.current_client.client_id), self.loop)
 
         Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'all_treatment'), 0)
-        Clock.schedule_once(lambda dt, me=maj_ecran: me(), 0.8)
+        Clock.schedule_once(rappel(lambda dt, me=maj_ecran: me(), 'maj_ecran'), 0.8)
 
     def voir_planning_par_traitement(self):
         if not self.current_client:
@@ -1981,7 +1980,7 @@ class Screen(MDApp):
         self.choose_screen(btn_planning)
         self.fenetre_planning('', 'selection_planning')
         Clock.schedule_once(lambda dt: self.switch_to_planning(), 0)
-        Clock.schedule_once(lambda dt: self.get_and_update(self.current_client[5], self.current_client[1],self.current_client[13]), 0)
+        Clock.schedule_once(lambda dt: self.get_and_update(self.current_client.type_traitement, self.current_client.nom,self.current_client.planning_id), 0)
 
     def voir_info_client(self,source, option):
         if not self.current_client:
@@ -1991,7 +1990,7 @@ class Screen(MDApp):
         self.fermer_ecran()
         self.dismiss_popup()
 
-        Clock.schedule_once(lambda dt: self.modification_client(self.current_client[1], option), 0.5)
+        Clock.schedule_once(lambda dt: self.modification_client(self.current_client.nom, option), 0.5)
         Clock.schedule_once(lambda dt: self.switch_to_client(),0)
 
     def dropdown_compte(self, button, name):
@@ -2083,7 +2082,7 @@ class Screen(MDApp):
                         self.all_client.append(row)
 
         except Exception as e:
-            print(f"Une erreur est survenue lors de la récupération des clients: {e}")
+            logger.error(f"❌ Une erreur est survenue lors de la récupération des clients: {e}", exc_info=True)
 
     def dropdown_rendu_excel(self,button,  champ):
         mois = ['Tous', 'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin', 'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', "Décembre"]
@@ -2188,12 +2187,8 @@ class Screen(MDApp):
             self.all_users(place)
 
         elif screen == 'contrat':
-            place1 = self.root.get_screen('Sidebar').ids['gestion_ecran'].get_screen('contrat').ids.tableau_contrat
-            place1.remove_widget(self.liste_contrat)
+            # ✅ Les tableaux restent montés: get_client/all_clients appliquent un diff ligne à ligne
             asyncio.run_coroutine_threadsafe(self.get_client(), self.loop)
-            place2 = self.root.get_screen('Sidebar').ids['gestion_ecran'].get_screen(
-                 'client').ids.tableau_client
-            place2.remove_widget(self.liste_client)
             asyncio.run_coroutine_threadsafe(self.all_clients(), self.loop)
 
     @mainthread
@@ -2208,25 +2203,16 @@ class Screen(MDApp):
             place.add_widget(label)
             return
 
-        row_data = []
-        client_id = []
-        for item in contract_data:
-            try:
-                if len(item) >= 4:
-                    client = item[0] if item[0] is not None else "N/A"
-                    date = self.reverse_date(item[1]) if item[1] is not None else "N/A"
-                    traitement = item[7] if item[7] is not None else "N/A"
-                    # ✅ Format redondance: 0='1 jour', 1='1 mois', 2='2 mois', etc.
-                    fréquence = ', '.join('1 jour' if int(val) == 0 else f'{val} mois' for val in item[3].split(',')) if item[3] is not None else '0 mois'
-
-                    client_id.append(item[8])
-
-                    row_data.append((client, date, traitement, fréquence ))
-                else:
-                    print(f"Warning: Planning item doesn't have enough elements: {item}")
+        # ✅ Lignes formatées via la vue (redondance parsée une seule fois par ligne source)
+        row_data = self.vue_contrat.actualiser(contract_data)
+        client_id = [item.client_id for item in self.vue_contrat.sources]
 
-            except Exception as e:
-                print(f"Error processing planning item: {e}")
+        # ✅ Tableau déjà affiché: diff par client_id (lignes changées seulement)
+        if self.sync_contrat.est_place(place):
+            self.ids_contrat[:] = client_id  # liste liée à on_row_press, mise à jour en place
+            self.sync_contrat.appliquer(self.vue_contrat.cles, row_data)
+            return
+        self.ids_contrat = client_id
 
         try:
 
@@ -2236,26 +2222,28 @@ class Screen(MDApp):
             btn_next = pagination.ids.button_forward
 
             def on_press_page(direction, instance=None):
-                print(f"📄 Pagination contrat: {direction} | page avant: {self.main_page_contract}")
-                max_page = (len(row_data) - 1) // 8 + 1
+                logger.debug(f"📄 Pagination contrat: {direction} | page avant: {self.main_page_contract}")
+                # Lignes lues à l'appui: le tableau a pu être rafraîchi depuis sa création
+                max_page = (len(self.liste_contrat.row_data) - 1) // 8 + 1
                 if direction == 'moins' and self.main_page_contract > 1:
                     self.main_page_contract -= 1
                 elif direction == 'plus' and self.main_page_contract < max_page:
                     self.main_page_contract += 1
-                print(f"   page après: {self.main_page_contract}")
+                logger.debug(f"page après: {self.main_page_contract}")
 
             btn_prev.bind(on_press=partial(on_press_page, 'moins'))
             btn_next.bind(on_press=partial(on_press_page, 'plus'))
 
-            self.liste_contrat.row_data = row_data
+            self.sync_contrat.appliquer(self.vue_contrat.cles, row_data)
             self.liste_contrat.bind(on_row_press=partial(self.get_traitement_par_client, client_id))
             
             # ✅ Afficher avec délai
             self._display_table_with_delay(place, self.liste_contrat, delay=0.4)
 
         except Exception as e:
-            print(f"Error creating contract table: {e}")
+            logger.error(f"❌ Error creating contract table: {e}", exc_info=True)
 
+    @trace()
     def get_traitement_par_client(self, client_id, table, row):
         # ✅ RESTAURÉ: Calcul simple de l'index global
         row_num = int(row.index / len(table.column_data))
@@ -2271,7 +2259,7 @@ class Screen(MDApp):
 
         if 0 <= index_global < len(table.row_data):
             row_value = table.row_data[index_global]
-            print(row_value)
+            logger.debug(f"Ligne traitement sélectionnée: {row_value}")
 
         self.fenetre_contrat('', 'all_treatment')
 
@@ -2284,15 +2272,16 @@ class Screen(MDApp):
 
         # ✅ Loading spinner AVANT le chargement (délai 0), puis chargement après (délai 0.75s)
         Clock.schedule_once(lambda dt: self.loading_spinner(self.popup,'all_treatment'), 0)
-        Clock.schedule_once(lambda dt, me=maj_ecran: me(), 0.75)
+        Clock.schedule_once(rappel(lambda dt, me=maj_ecran: me(), 'maj_ecran'), 0.75)
 
+    @trace()
     async def liste_traitement_par_client(self, place, nom_client):
         try:
             # ⏱️ Petite attente pour laisser le loading spinner s'afficher
             await asyncio.sleep(0.3)
             result = await self.database.traitement_par_client(nom_client)
             if result:
-                Clock.schedule_once(lambda dt : self.show_about_treatment(place, result), 0.1)
+                Clock.schedule_once(rappel(lambda dt: self.show_about_treatment(place, result), 'show_about_treatment'), 0.1)
             else:
                 # ✅ Si pas de résultat, arrêter le loading et afficher message
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'all_treatment'), 0)
@@ -2304,7 +2293,7 @@ class Screen(MDApp):
                 Clock.schedule_once(lambda dt: place.add_widget(label) if place.parent else None, 0.1)
 
         except Exception as e:
-            print('erreur get traitement'+ str(e))
+            logger.error(f"❌ Erreur get traitement: {e}", exc_info=True)
             Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'all_treatment'), 0)
 
     def show_about_treatment(self, place, data):
@@ -2335,12 +2324,12 @@ class Screen(MDApp):
                     else:
                         display_freq = f'{redondance} mois'
                     
-                    print(f"📋 Traitement: {date} - {traitement} ({display_freq})")
+                    logger.debug(f"📋 Traitement: {date} - {traitement} ({display_freq})")
                     row_data.append((date, traitement, display_freq))
                 else:
-                    print(f"⚠️ Item insuffisant: {item}")
+                    logger.warning(f"⚠️ Item insuffisant: {item}")
             except Exception as e:
-                print(f"❌ Erreur traitement: {e}")
+                logger.error(f"❌ Erreur traitement: {e}", exc_info=True)
 
         # ✅ Configurez la table APRÈS la boucle
         try:
@@ -2354,13 +2343,13 @@ class Screen(MDApp):
             self.page = 1
 
             def on_press_page(direction, instance=None):
-                print(f"📄 Pagination traitement: {direction} | page avant: {self.page}")
+                logger.debug(f"📄 Pagination traitement: {direction} | page avant: {self.page}")
                 max_page = (len(row_data) - 1) // 4 + 1
                 if direction == 'moins' and self.page > 1:
                     self.page -= 1
                 elif direction == 'plus' and self.page < max_page:
                     self.page += 1
-                print(f"   page après: {self.page}")
+                logger.debug(f"page après: {self.page}")
 
             btn_prev.bind(on_press=partial(on_press_page, 'moins'))
             btn_next.bind(on_press=partial(on_press_page, 'plus'))
@@ -2371,7 +2360,7 @@ class Screen(MDApp):
             self._display_table_with_delay(place, self.all_treat, delay=0.4)
 
         except Exception as e:
-            print(f'Error creating traitement table: {e}')
+            logger.error(f'❌ Error creating traitement table: {e}', exc_info=True)
 
 
     def row_pressed_contrat(self, table, row):
@@ -2422,40 +2411,46 @@ class Screen(MDApp):
             self.fenetre_client('', 'option_contrat')
             
             # Mettre à jour les données
-            if self.current_client[3] == 'Particulier':
-                nom = self.current_client[1] + ' ' + self.current_client[2]
+            if self.current_client.categorie == 'Particulier':
+                nom = self.current_client.nom + ' ' + self.current_client.prenom
             else:
-                nom = self.current_client[1]
+                nom = self.current_client.nom
 
-            if self.current_client[6] == 'Indeterminée':
-                fin = self.current_client[8]
+            if self.current_client.duree == 'Indeterminée':
+                fin = self.current_client.date_fin
             else:
-                fin = self.reverse_date(self.current_client[8])
+                fin = self.reverse_date(self.current_client.date_fin)
 
             self.popup.get_screen('option_contrat').ids.titre.text = f'A propos de {nom}'
-            self.popup.get_screen('option_contrat').ids.date_contrat.text = f'Contrat du : {self.reverse_date(self.current_client[4])}'
-            self.popup.get_screen('option_contrat').ids.debut_contrat.text = f'Début du contrat : {self.reverse_date(self.current_client[7])}'
+            self.popup.get_screen('option_contrat').ids.date_contrat.text = f'Contrat du : {self.reverse_date(self.current_client.date_contrat)}'
+            self.popup.get_screen('option_contrat').ids.debut_contrat.text = f'Début du contrat : {self.reverse_date(self.current_client.date_debut)}'
             self.popup.get_screen('option_contrat').ids.fin_contrat.text = f'Fin du contrat : {fin}'
-            self.popup.get_screen('option_contrat').ids.type_traitement.text = f'Type de traitement : {self.current_client[5]}'
-            self.popup.get_screen('option_contrat').ids.duree.text = f'Durée du contrat : {self.current_client[6]}'
-            self.popup.get_screen('option_contrat').ids.axe.text = f'Axe du client: {self.current_client[11]}'
+            self.popup.get_screen('option_contrat').ids.type_traitement.text = f'Type de traitement : {self.current_client.type_traitement}'
+            self.popup.get_screen('option_contrat').ids.duree.text = f'Durée du contrat : {self.current_client.duree}'
+            self.popup.get_screen('option_contrat').ids.axe.text = f'Axe du client: {self.current_client.axe}'
         except Exception as e:
             logger.error(f'Erreur affichage info contrat: {e}', exc_info=True)
 
     @mainthread
     def update_client_table_and_switch(self, place, client_data):
+        # ✅ Tableau déjà affiché: diff par client_id (lignes changées seulement)
+        if client_data and self.sync_client.est_place(place):
+            row_data = self.vue_client.actualiser(client_data)
+            self.client_id_map = dict(enumerate(self.vue_client.cles))
+            self.sync_client.appliquer(self.vue_client.cles, row_data)
+            return
 
         if self.liste_client.parent:
             self.liste_client.parent.remove_widget(self.liste_client)
         if client_data:
             # ✅ Créer un tuple pour affichage (4 colonnes) ET un mapping index_global -> client_id
-            row_data = [(i[1], i[2], i[3], self.reverse_date(i[4])) for i in client_data]
+            row_data = self.vue_client.actualiser(client_data)
             # ✅ Stocker les IDs avec index global (non index local)
             # Index global = position dans la liste COMPLÈTE (pas juste la page courante)
-            self.client_id_map = {idx: client_data[idx][0] for idx in range(len(client_data))}
+            self.client_id_map = dict(enumerate(self.vue_client.cles))
             
-            print(f"📊 client_id_map créé: {len(self.client_id_map)} clients")
-            print(f"   Premiers IDs: {dict(list(self.client_id_map.items())[:3])}")
+            logger.debug(f"📊 client_id_map créé: {len(self.client_id_map)} clients")
+            logger.debug(f"Premiers IDs: {dict(list(self.client_id_map.items())[:3])}")
 
             pagination = self.liste_client.pagination
 
@@ -2463,18 +2458,19 @@ class Screen(MDApp):
             btn_next = pagination.ids.button_forward
 
             def on_press_page(direction, instance=None):
-                print(f"📄 Pagination client: {direction} | page avant: {self.main_page_client}")
-                max_page = (len(row_data) - 1) // 8 + 1
+                logger.debug(f"📄 Pagination client: {direction} | page avant: {self.main_page_client}")
+                # Lignes lues à l'appui: le tableau a pu être rafraîchi depuis sa création
+                max_page = (len(self.liste_client.row_data) - 1) // 8 + 1
                 if direction == 'moins' and self.main_page_client > 1:
                     self.main_page_client -= 1
                 elif direction == 'plus' and self.main_page_client < max_page:
                     self.main_page_client += 1
-                print(f"   page après: {self.main_page_client}")
+                logger.debug(f"page après: {self.main_page_client}")
 
             btn_prev.bind(on_press=partial(on_press_page, 'moins'))
             btn_next.bind(on_press=partial(on_press_page, 'plus'))
 
-            self.liste_client.row_data = row_data
+            self.sync_client.appliquer(self.vue_client.cles, row_data)
             self.liste_client.bind(on_row_press=self.row_pressed_client)
             
             # ✅ Afficher avec délai pour que le contenu se charge bien
@@ -2494,8 +2490,8 @@ class Screen(MDApp):
         async def get_histo():
             try:
                 # ✅ Utiliser client_id (index 0) au lieu du nom (index 1)
-                client_id = self.current_client[0]
-                print(f"📜 Historique: cherche pour client_id={client_id}")
+                client_id = self.current_client.client_id
+                logger.info(f"📜 Historique: cherche pour client_id={client_id}")
                 result = await self.database.get_historic_par_client(client_id)
                 data = []
                 id_planning = []
@@ -2504,17 +2500,15 @@ class Screen(MDApp):
                     for i in result:
                         data.append(i)
                         id_planning.append(i[4])
-                    print(f"✅ Historique: {len(data)} éléments trouvés")
+                    logger.info(f"✅ Historique: {len(data)} éléments trouvés")
                 else:
-                    print(f"⚠️ Historique: aucun élément trouvé pour client_id={client_id}")
+                    logger.warning(f"⚠️ Historique: aucun élément trouvé pour client_id={client_id}")
                     data.append(('Aucun', 'Aucun', 'Aucun', 'Aucun'))
 
                 Clock.schedule_once(lambda dt: self.tableau_historic(place, data, id_planning), 0)
 
             except Exception as e:
-                print(f'❌ Erreur historique par client: {e}')
-                import traceback
-                traceback.print_exc()
+                logger.error(f'❌ Erreur historique par client: {e}', exc_info=True)
 
         def maj_ecran():
             asyncio.run_coroutine_threadsafe(get_histo(), self.loop)
@@ -2527,8 +2521,9 @@ class Screen(MDApp):
             self.current_client = await self.database.get_current_client(nom_client,
                                                                         self.reverse_date(date))
         except Exception as e:
-            print(e)
+            logger.error(f"❌ Erreur current_client_info: {e}", exc_info=True)
 
+    @trace()
     def row_pressed_client(self, table, row):
         # ✅ PATTERN ANCIEN: Calcul simple + délais courts (0.15s fenêtre, 1.5s infos)
         row_num = int(row.index / len(table.column_data))
@@ -2554,22 +2549,22 @@ class Screen(MDApp):
                     logger.warning('current_client n\'est pas chargé')
                     return
                 
-                if self.current_client[3] == 'Particulier':
-                    nom = self.current_client[1] + ' ' + self.current_client[2]
+                if self.current_client.categorie == 'Particulier':
+                    nom = self.current_client.nom + ' ' + self.current_client.prenom
                 else:
-                    nom = self.current_client[1]
+                    nom = self.current_client.nom
 
-                if self.current_client[6] == 'Indéterminée':
-                    fin = self.reverse_date(self.current_client[8])
+                if self.current_client.duree == 'Indéterminée':
+                    fin = self.reverse_date(self.current_client.date_fin)
                 else:
-                    fin = self.current_client[8]
+                    fin = self.current_client.date_fin
 
                 self.popup.get_screen('option_client').ids.titre.text = f'A propos de {nom}'
-                self.popup.get_screen('option_client').ids.date_contrat.text = f'Contrat du : {self.reverse_date(self.current_client[4])}'
-                self.popup.get_screen('option_client').ids.debut_contrat.text = f'Début du contrat : {self.reverse_date(self.current_client[7])}'
+                self.popup.get_screen('option_client').ids.date_contrat.text = f'Contrat du : {self.reverse_date(self.current_client.date_contrat)}'
+                self.popup.get_screen('option_client').ids.debut_contrat.text = f'Début du contrat : {self.reverse_date(self.current_client.date_debut)}'
                 self.popup.get_screen('option_client').ids.fin_contrat.text = f'Fin du contrat : {fin}'
-                self.popup.get_screen('option_client').ids.type_traitement.text = f'Type de traitement : {self.current_client[5]}'
-                self.popup.get_screen('option_client').ids.duree.text = f'Durée du contrat : {self.current_client[6]}'
+                self.popup.get_screen('option_client').ids.type_traitement.text = f'Type de traitement : {self.current_client.type_traitement}'
+                self.popup.get_screen('option_client').ids.duree.text = f'Durée du contrat : {self.current_client.duree}'
                 logger.info(f"✅ Infos client affichées pour {nom}")
             except Exception as e:
                 logger.error(f'Erreur affichage info client: {e}', exc_info=True)
@@ -2584,18 +2579,26 @@ class Screen(MDApp):
                 logger.info(f"✅ current_client chargé: {self.current_client is not None}")
                 
                 # ✅ CORRECTION: Appeler maj_ecran() directement après chargement au lieu d'attendre 1.5s
-                Clock.schedule_once(lambda dt, mf=maj_ecran: mf(), 0)
+                Clock.schedule_once(rappel(lambda dt, mf=maj_ecran: mf(), 'maj_ecran'), 0)
             except Exception as e:
                 logger.error(f"Erreur row_pressed_client: {e}", exc_info=True)
 
         asyncio.run_coroutine_threadsafe(current_client_info_async(), self.loop)
 
         # ✅ PATTERN ANCIEN: Délai court pour ouvrir la fenêtre (0.15s)
-        Clock.schedule_once(lambda x: self.fenetre_client('', 'option_client'), 0.15)
+        Clock.schedule_once(rappel(lambda x: self.fenetre_client('', 'option_client'), 'fenetre_client'), 0.15)
 
     @mainthread
     def tableau_planning(self, place, result, dt=None):
         from kivymd.uix.label import MDLabel
+
+        # ✅ Tableau déjà affiché: diff par planning_id (lignes changées seulement)
+        if result and self.sync_planning.est_place(place):
+            row_data = self.vue_planning.actualiser(result)
+            self.ids_planning[:] = [item.planning_id or 0 for item in self.vue_planning.sources]
+            self.sync_planning.appliquer(self.vue_planning.cles, row_data)
+            return
+
         place.clear_widgets()
 
         if not result:
@@ -2606,25 +2609,9 @@ class Screen(MDApp):
             place.add_widget(label)
             return
 
-        row_data = []
-        liste_id = []
-
-        for item in result:
-            try:
-                if len(item) >= 4:
-                    client = item[0] if item[0] is not None else "N/A"
-                    traitement = item[1] if item[1] is not None else "N/A"
-                    red = item[2] if item[2] is not None else "N/A"
-                    id_planning = item[3] if item[3] is not None else 0
-
-                    # ✅ Format redondance: 0='1 jour', 1='1 mois', 2='2 mois', etc.
-                    display_red = '1 jour' if int(red) == 0 else f'{red} mois'
-                    row_data.append((client, traitement, display_red, 'Aucun decalage'))
-                    liste_id.append(id_planning)
-                else:
-                    print(f"Warning: Planning item doesn't have enough elements: {item}")
-            except Exception as e:
-                print(f"Error processing planning item: {e}")
+        row_data = self.vue_planning.actualiser(result)
+        liste_id = [item.planning_id or 0 for item in self.vue_planning.sources]
+        self.ids_planning = liste_id
 
         if not row_data:
             label = MDLabel(
@@ -2644,17 +2631,18 @@ class Screen(MDApp):
             btn_next = pagination.ids.button_forward
 
             def on_press_page(direction, instance=None):
-                print(f"📄 Pagination planning: {direction} | page avant: {self.main_page_planning}")
-                max_page = (len(row_data) - 1) // 8 + 1
+                logger.debug(f"📄 Pagination planning: {direction} | page avant: {self.main_page_planning}")
+                # Lignes lues à l'appui: le tableau a pu être rafraîchi depuis sa création
+                max_page = (len(self.liste_planning.row_data) - 1) // 8 + 1
                 if direction == 'moins' and self.main_page_planning > 1:
                     self.main_page_planning -= 1
                 elif direction == 'plus' and self.main_page_planning < max_page:
                     self.main_page_planning += 1
-                print(f"   page après: {self.main_page_planning}")
+                logger.debug(f"page après: {self.main_page_planning}")
 
             btn_prev.bind(on_press=partial(on_press_page, 'moins'))
             btn_next.bind(on_press=partial(on_press_page, 'plus'))
-            self.liste_planning.row_data = row_data
+            self.sync_planning.appliquer(self.vue_planning.cles, row_data)
 
             self.liste_planning.bind(on_row_press=partial(self.row_pressed_planning, liste_id))
 
@@ -2662,7 +2650,7 @@ class Screen(MDApp):
             self._display_table_with_delay(place, self.liste_planning, delay=0.4)
             #del self.liste_planning
         except Exception as e:
-            print(f"Error creating planning table: {e}")
+            logger.error(f"❌ Error creating planning table: {e}", exc_info=True)
 
     @mainthread
     def tableau_selection_planning(self, place, data, traitement):
@@ -2693,9 +2681,9 @@ class Screen(MDApp):
                     mois_display = f'{mois + 1}er mois' if mois == 0 else f'{mois + 1}e mois'
                     row_data.append((date, mois_display , etat))
                 else:
-                    print(f"Warning: Planning item doesn't have enough elements: {item}")
+                    logger.warning(f"⚠️ Planning item doesn't have enough elements: {item}")
             except Exception as e:
-                print(f"Error processing planning item: {e}")
+                logger.error(f"❌ Error processing planning item: {e}", exc_info=True)
 
         try:
             self.liste_select_planning = MyDatatable(
@@ -2719,13 +2707,13 @@ class Screen(MDApp):
             self.page_select_planning = 1
 
             def on_press_page(direction, instance=None):
-                print(f"📄 Select Planning: {direction} | page avant: {self.page_select_planning}")
+                logger.debug(f"📄 Select Planning: {direction} | page avant: {self.page_select_planning}")
                 max_page = (len(row_data) - 1) // 5 + 1
                 if direction == 'moins' and self.page_select_planning > 1:
                     self.page_select_planning -= 1
                 elif direction == 'plus' and self.page_select_planning < max_page:
                     self.page_select_planning += 1
-                print(f"   page après: {self.page_select_planning}")
+                logger.debug(f"page après: {self.page_select_planning}")
 
             btn_prev.bind(on_press=partial(on_press_page, 'moins'))
             btn_next.bind(on_press=partial(on_press_page, 'plus'))
@@ -2743,7 +2731,7 @@ class Screen(MDApp):
 
 
         except Exception as e:
-            print(f'Error creating planning_detail table: {e}')
+            logger.error(f'❌ Error creating planning_detail table: {e}', exc_info=True)
 
     def row_pressed_planning(self, list_id, table, row):
         row_num = int(row.index / len(table.column_data))
@@ -2824,12 +2812,12 @@ class Screen(MDApp):
         def maj_ui():
             try:
                 logger.info(f'Maj ui: {self.planning_detail}')
-                titre = self.planning_detail[1].split(' ')
-                self.popup.get_screen('selection_element_tableau').ids['titre'].text = f'{titre[0]} pour {self.planning_detail[0]}'
-                self.popup.get_screen('ajout_remarque').ids['titre'].text = f'{titre[0]} pour {self.planning_detail[0]}'
-                self.popup.get_screen('option_decalage').ids.client.text = f'Client: {self.planning_detail[0]}'
+                titre = self.planning_detail.type_traitement.split(' ')
+                self.popup.get_screen('selection_element_tableau').ids['titre'].text = f'{titre[0]} pour {self.planning_detail.nom}'
+                self.popup.get_screen('ajout_remarque').ids['titre'].text = f'{titre[0]} pour {self.planning_detail.nom}'
+                self.popup.get_screen('option_decalage').ids.client.text = f'Client: {self.planning_detail.nom}'
 
-                self.popup.get_screen('selection_element_tableau').ids['contrat'].text = f'Contrat du {self.reverse_date(self.planning_detail[3])} au {self.planning_detail[4]}'
+                self.popup.get_screen('selection_element_tableau').ids['contrat'].text = f'Contrat du {self.reverse_date(self.planning_detail.date_debut)} au {self.planning_detail.date_fin}'
 
                 self.popup.get_screen('selection_element_tableau').ids['mois'].text = f'Date du traitement : {row_value[0]}'
                 self.popup.get_screen('ajout_remarque').ids['date'].text = f'Date du traitement : {row_value[0]}'
@@ -2837,7 +2825,7 @@ class Screen(MDApp):
                 self.popup.get_screen('selection_element_tableau').ids['mois_trait'].text = f'Mois du traitement: {row_value[1]}'
                 self.popup.get_screen('ajout_remarque').ids['mois_trait'].text = f'Mois du traitement: {row_value[1]}'
 
-                self.popup.get_screen('ajout_remarque').ids['duree'].text = f'Durée total du traitement : {self.planning_detail[2]}'
+                self.popup.get_screen('ajout_remarque').ids['duree'].text = f'Durée total du traitement : {self.planning_detail.duree_traitement}'
 
             except Exception as e:
                 logger.error(f'affichage detail: {e}', exc_info=True)
@@ -2902,17 +2890,17 @@ class Screen(MDApp):
             async def remarque_async(etat_paye):
                 try:
                     # ✅ Créer la remarque
-                    await self.database.create_remarque(self.planning_detail[5],
-                                                        self.planning_detail[8],
-                                                        self.planning_detail[6],
+                    await self.database.create_remarque(self.planning_detail.client_id,
+                                                        self.planning_detail.planning_detail_id,
+                                                        self.planning_detail.facture_id,
                                                         remarque_db,
                                                         probleme_db,
                                                         action_db)
                     
                     # ✅ CORRECTION: Marquer comme effectué et vérifier le résultat
-                    update_success = await self.database.update_etat_planning(self.planning_detail[8])
+                    update_success = await self.database.update_etat_planning(self.planning_detail.planning_detail_id)
                     if not update_success:
-                        print(f"⚠️ Impossible de marquer planning {self.planning_detail[8]} comme effectué")
+                        logger.warning(f"⚠️ Impossible de marquer planning {self.planning_detail.planning_detail_id} comme effectué")
                     
                     bnk = None
                     numero_cheque_val = None
@@ -2928,28 +2916,22 @@ class Screen(MDApp):
                         if mobile:
                             payement = 'Mobile Money'
 
-                        await self.database.update_etat_facture(self.planning_detail[6], numero, payement, bnk, self.reverse_date(descri), numero_cheque_val)
+                        await self.database.update_etat_facture(self.planning_detail.facture_id, numero, payement, bnk, self.reverse_date(descri), numero_cheque_val)
 
                     Clock.schedule_once(lambda dt: self.show_dialog('', 'Enregistrement réussi'), 0)
                     Clock.schedule_once(lambda dt: self.fermer_ecran(), 0.5)
                     Clock.schedule_once(lambda dt: self.dismiss_popup(), 0.5)
                     Clock.schedule_once(lambda dt: self.clear_remarque_fields(screen), 0.5)
-                    # ✅ CORRECTION: Augmenter le délai à 0.8s pour laisser le temps à la BD de committer
-                    Clock.schedule_once(lambda dt: asyncio.run_coroutine_threadsafe(self.populate_tables(), self.loop), 0.8)
 
                 except Exception as e:
-                    print(f'❌ Erreur creation remarque: {e}')
-                    import traceback
-                    traceback.print_exc()
+                    logger.error(f'❌ Erreur creation remarque: {e}', exc_info=True)
                     Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'ajout_remarque', show=False), 0)
                     Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Enregistrement échoué: {str(e)}'), 0)
 
             asyncio.run_coroutine_threadsafe(remarque_async(paye), self.loop)
 
         except Exception as e:
-            print(f'❌ Erreur create_remarque: {e}')
-            import traceback
-            traceback.print_exc()
+            logger.error(f'❌ Erreur create_remarque: {e}', exc_info=True)
             Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Erreur validation: {str(e)}'), 0)
 
     def clear_remarque_fields(self, screen):
@@ -2982,7 +2964,7 @@ class Screen(MDApp):
                 Clock.schedule_once(lambda dt: self.tableau_historic(place, datas, id_planning))
 
             except Exception as e:
-                print('histo par categ', e)
+                logger.error(f"❌ Erreur historique par catégorie: {e}", exc_info=True)
 
         def maj_ecran():
             asyncio.run_coroutine_threadsafe(get_histo(), self.loop)
@@ -3001,13 +2983,13 @@ class Screen(MDApp):
         btn_next = pagination.ids.button_forward
 
         def on_press_page(direction, instance=None):
-            print(f"📄 Pagination historique: {direction} | page avant: {self.main_page_historic}")
+            logger.debug(f"📄 Pagination historique: {direction} | page avant: {self.main_page_historic}")
             max_page = (len(row_data) - 1) // 8 + 1
             if direction == 'moins' and self.main_page_historic > 1:
                 self.main_page_historic -= 1
             elif direction == 'plus' and self.main_page_historic < max_page:
                 self.main_page_historic += 1
-            print(f"   page après: {self.main_page_historic}")
+            logger.debug(f"page après: {self.main_page_historic}")
 
         btn_prev.bind(on_press=partial(on_press_page, 'moins'))
         btn_next.bind(on_press=partial(on_press_page, 'plus'))
@@ -3027,25 +3009,25 @@ class Screen(MDApp):
 
         if 0 <= index_global < len(table.row_data):
             row_value = table.row_data[index_global]
-        print(f"🔹 row_pressed_histo - page={self.main_page_historic}, row_num={row_num}")
-        print(f"   index_global={index_global}, row_value={row_value}")
+        logger.debug(f"🔹 row_pressed_histo - page={self.main_page_historic}, row_num={row_num}")
+        logger.debug(f"index_global={index_global}, row_value={row_value}")
 
         if row_value and row_value[0] == 'Aucun':
             return
 
         # ✅ Vérifier que planning_id est valide et index_global est dans les limites
         if not isinstance(planning_id, list):
-            print(f"❌ Erreur: planning_id n'est pas une liste: {type(planning_id)}")
+            logger.error(f"❌ Erreur: planning_id n'est pas une liste: {type(planning_id)}")
             toast('Erreur: Historique non disponible')
             return
         
         if index_global >= len(planning_id):
-            print(f"❌ Erreur: index_global={index_global} hors limites de planning_id (len={len(planning_id)})")
+            logger.error(f"❌ Erreur: index_global={index_global} hors limites de planning_id (len={len(planning_id)})")
             toast('Erreur: Historique non disponible')
             return
         
         if planning_id[index_global] is None:
-            print(f"❌ Erreur: planning_id[{index_global}] est None")
+            logger.error(f"❌ Erreur: planning_id[{index_global}] est None")
             toast('Erreur: Cet historique n\'a pas de planning associé')
             return
 
@@ -3073,7 +3055,7 @@ class Screen(MDApp):
             resultat = await self.database.get_historique_remarque(planning_id)
             Clock.schedule_once(lambda dt: self.tableau_rem_histo(place, resultat if resultat else []), 0.5)
         except Exception as e:
-            print('Erreur lors de la récupération des remarques :', e)
+            logger.error(f"❌ Erreur lors de la récupération des remarques: {e}", exc_info=True)
             if place:
                 place.clear_widgets()
                 error_label = MDLabel(
@@ -3082,7 +3064,7 @@ class Screen(MDApp):
                 )
                 place.add_widget(error_label)
             else:
-                print("Erreur: 'place' est None, impossible d'afficher le message d'erreur.")
+                logger.error("❌ 'place' est None, impossible d'afficher le message d'erreur")
 
     def tableau_rem_histo(self, place, data):
         from kivy.metrics import dp
@@ -3100,12 +3082,12 @@ class Screen(MDApp):
                     decale = item[3] if item[3] is not None else 'Aucun'
                     probleme = item[4] if item[4] is not None else 'Aucun'
                     action = item[5] if item[5] is not None else 'Aucun'
-                    print(remarque, probleme, action)
+                    logger.debug(f"Remarque historique: {remarque}, {probleme}, {action}")
                     row_data.append((date, remarque, avance, decale,probleme, action))
                 else:
-                    print(f"Warning: L'élément de remarque historique n'a pas assez d'éléments (attendu 2+): {item}")
+                    logger.warning(f"⚠️ L'élément de remarque historique n'a pas assez d'éléments (attendu 2+): {item}")
             except Exception as e:
-                print(f"Erreur lors du traitement de l'élément de remarque historique : {e}")
+                logger.error(f"❌ Erreur lors du traitement de l'élément de remarque historique : {e}", exc_info=True)
 
         if not row_data:
             label = MDLabel(
@@ -3139,7 +3121,7 @@ class Screen(MDApp):
             Clock.schedule_once(lambda dt, sad=set_and_display: sad(), 0.1)
 
         except Exception as e:
-            print(f'Erreur lors de la création du tableau des remarques historiques : {e}')
+            logger.error(f'❌ Erreur lors de la création du tableau des remarques historiques : {e}', exc_info=True)
 
     def all_users(self, place):
         async def data_account():
@@ -3148,7 +3130,7 @@ class Screen(MDApp):
                 if users:
                     Clock.schedule_once(lambda dt: self.tableau_compte(place, users))
             except Exception as e:
-                print(e)
+                logger.error(f"❌ Erreur data_account: {e}", exc_info=True)
                 self.show_dialog('erreur', 'Erreur !')
 
         asyncio.run_coroutine_threadsafe(data_account(), self.loop)
@@ -3191,18 +3173,14 @@ class Screen(MDApp):
                     Clock.schedule_once(lambda dt: self.maj_compte(self.not_admin), 0)
                     Clock.schedule_once(lambda dt: self.fenetre_account('', 'compte_abt'), 0)
                 except Exception as e:
-                    print(f'❌ Erreur chargement compte: {e}')
-                    import traceback
-                    traceback.print_exc()
+                    logger.error(f'❌ Erreur chargement compte: {e}', exc_info=True)
                     Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'compte', show=False), 0)
                     Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Erreur chargement: {str(e)}'), 0)
 
             asyncio.run_coroutine_threadsafe(about(), self.loop)
         
         except Exception as e:
-            print(f'❌ Erreur row_pressed_compte: {e}')
-            import traceback
-            traceback.print_exc()
+            logger.error(f'❌ Erreur row_pressed_compte: {e}', exc_info=True)
             Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Erreur: {str(e)}'), 0)
 
     def suppression_compte(self, username):
@@ -3237,16 +3215,16 @@ class Screen(MDApp):
             btn_annuler.text = 'Annuler'
             btn_enregistrer.opacity = 1
 
-        if self.current_client[3] == 'Particulier':
+        if self.current_client.categorie == 'Particulier':
             self.popup.get_screen('modif_client').ids.label_resp.text = 'Prenom'
-            nom = self.current_client[1] + ' ' + self.current_client[2]
+            nom = self.current_client.nom + ' ' + self.current_client.prenom
         else:
             self.popup.get_screen('modif_client').ids.label_resp.text = 'Responsable'
-            nom = self.current_client[1]
+            nom = self.current_client.nom
 
-        if self.current_client[3] == 'Société':
-            self.popup.get_screen('modif_client').ids.nif.text = self.current_client[15]
-            self.popup.get_screen('modif_client').ids.stat.text = self.current_client[16]
+        if self.current_client.categorie == 'Société':
+            self.popup.get_screen('modif_client').ids.nif.text = self.current_client.nif
+            self.popup.get_screen('modif_client').ids.stat.text = self.current_client.stat
             self.popup.get_screen('modif_client').ids.stat_label.pos_hint = {'center_x': 1.005, 'center_y': .23}
             self.popup.get_screen('modif_client').ids.stat.pos_hint = {"center_x":.73,"center_y":.14}
             self.popup.get_screen('modif_client').ids.nif_label.pos_hint = {'center_x': .5, 'center_y': .23}
@@ -3260,14 +3238,14 @@ class Screen(MDApp):
             self.popup.get_screen('modif_client').ids.nif.pos_hint = {"center_x":-1,"center_y":-1}
 
 
-        self.popup.get_screen('modif_client').ids.date_contrat_client.text = self.reverse_date(self.current_client[4])
-        self.popup.get_screen('modif_client').ids.cat_client.text = self.current_client[3]
-        self.popup.get_screen('modif_client').ids.nom_client.text = self.current_client[1]
-        self.popup.get_screen('modif_client').ids.email_client.text = self.current_client[9]
-        self.popup.get_screen('modif_client').ids.adresse_client.text = self.current_client[10]
-        self.popup.get_screen('modif_client').ids.axe_client.text = self.current_client[11]
-        self.popup.get_screen('modif_client').ids.resp_client.text = self.current_client[2]
-        self.popup.get_screen('modif_client').ids.telephone.text = self.current_client[12]
+        self.popup.get_screen('modif_client').ids.date_contrat_client.text = self.reverse_date(self.current_client.date_contrat)
+        self.popup.get_screen('modif_client').ids.cat_client.text = self.current_client.categorie
+        self.popup.get_screen('modif_client').ids.nom_client.text = self.current_client.nom
+        self.popup.get_screen('modif_client').ids.email_client.text = self.current_client.email
+        self.popup.get_screen('modif_client').ids.adresse_client.text = self.current_client.adresse
+        self.popup.get_screen('modif_client').ids.axe_client.text = self.current_client.axe
+        self.popup.get_screen('modif_client').ids.resp_client.text = self.current_client.prenom
+        self.popup.get_screen('modif_client').ids.telephone.text = self.current_client.telephone
         self.fenetre_client(f'Modifications des informartion sur {nom}', 'modif_client')
 
     def enregistrer_modif_client(self,btn, nom, prenom, email, telephone, adresse, categorie, axe, nif, stat):
@@ -3280,7 +3258,7 @@ class Screen(MDApp):
             
             async def save():
                 try:
-                    await self.database.update_client(self.current_client[0], nom, prenom, email, telephone, adresse, nif, stat, categorie, axe)
+                    await self.database.update_client(self.current_client.client_id, nom, prenom, email, telephone, adresse, nif, stat, categorie, axe)
                     Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'modif_client', show=False), 0)
                     Clock.schedule_once(lambda dt: self.show_dialog('Enregistrements reussie', 'Les modifications sont enregistrees'), 0)
                     Clock.schedule_once(lambda dt: self.dismiss_popup(), 0.5)
@@ -3288,9 +3266,7 @@ class Screen(MDApp):
                     Clock.schedule_once(lambda dt: self.remove_tables('contrat'), 0.6)
                     self.current_client = None
                 except Exception as e:
-                    print(f'❌ Erreur enregistrer_modif_client: {e}')
-                    import traceback
-                    traceback.print_exc()
+                    logger.error(f'❌ Erreur enregistrer_modif_client: {e}', exc_info=True)
                     Clock.schedule_once(lambda dt: self.loading_spinner(self.popup, 'modif_client', show=False), 0)
                     Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Modification echouee: {str(e)}'), 0)
 
@@ -3298,16 +3274,63 @@ class Screen(MDApp):
 
     def suppression_contrat(self):
 
-        fin = self.reverse_date(self.current_client[8]) if self.current_client[8] != 'Indéterminée' else 'Indéterminée'
-        self.popup.get_screen('suppression_contrat').ids.titre.text = f'Suppression du contrat de {self.current_client[1]}'
-        self.popup.get_screen('suppression_contrat').ids.date_contrat.text = f'Date du contrat: {self.reverse_date(self.current_client[4])}'
-        self.popup.get_screen('suppression_contrat').ids.debut_contrat.text = f'Début du contrat: {self.reverse_date(self.current_client[7])}'
+        fin = self.reverse_date(self.current_client.date_fin) if self.current_client.date_fin != 'Indéterminée' else 'Indéterminée'
+        self.popup.get_screen('suppression_contrat').ids.titre.text = f'Suppression du contrat de {self.current_client.nom}'
+        self.popup.get_screen('suppression_contrat').ids.date_contrat.text = f'Date du contrat: {self.reverse_date(self.current_client.date_contrat)}'
+        self.popup.get_screen('suppression_contrat').ids.debut_contrat.text = f'Début du contrat: {self.reverse_date(self.current_client.date_debut)}'
         self.popup.get_screen('suppression_contrat').ids.fin_contrat.text = f'Fin du contrat: {fin}'
 
         self.dismiss_popup()
         self.fermer_ecran()
         self.fenetre_contrat('', 'suppression_contrat')
 
+    def _abonner_vues(self):
+        """Chaque vue ne s'abonne qu'aux événements qui modifient ses lignes"""
+        vues = {
+            'home': (DetailPlanningCree, PlanningDecale, DatePlanifieeModifiee, TraitementEffectue,
+                     PlanningsEtendus, ContratResilie, ClientSupprime),
+            'contrat': (ContratCree, TraitementCree, PlanningCree, ContratResilie, ClientSupprime),
+            'client': (ClientCree, ContratCree, ClientSupprime),
+            'planning': (PlanningCree, ClientSupprime),
+            'facture': (FactureCreee, FacturePayee, MontantFactureModifie, PlanningsEtendus),
+            'compte': (CompteCree, CompteModifie, CompteSupprime),
+        }
+        for vue, types in vues.items():
+            self.database.evenements.abonner(types, partial(self._vue_affectee, vue))
+
+    def _vue_affectee(self, vue, evenement):
+        """Appelé sur la boucle asyncio: regroupe les événements d'une même opération (une actualisation par vue)"""
+        if not self._vues_a_rafraichir:
+            self.loop.call_later(0.3, self._lancer_rafraichissements)
+        self._vues_a_rafraichir.add(vue)
+
+    def _lancer_rafraichissements(self):
+        vues, self._vues_a_rafraichir = self._vues_a_rafraichir, set()
+        self.loop.create_task(self.rafraichir_vues(vues))
+
+    async def rafraichir_vues(self, vues):
+        """Recharge uniquement les vues affectées (et seulement si elles sont affichées)"""
+        if not self._tables_initialized:
+            return
+        logger.info(f'🔄 Vues à rafraîchir: {sorted(vues)}')
+        gestion = self.root.get_screen('Sidebar').ids['gestion_ecran']
+
+        if 'home' in vues:
+            await self.populate_tables()
+        if 'contrat' in vues and self.sync_contrat.est_place(gestion.get_screen('contrat').ids.tableau_contrat):
+            await self.get_client()
+        if 'client' in vues and self.sync_client.est_place(gestion.get_screen('client').ids.tableau_client):
+            await self.all_clients()
+        if 'planning' in vues:
+            place = gestion.get_screen('planning').ids.tableau_planning
+            if self.sync_planning.est_place(place):
+                planning = await self.get_all_planning()
+                Clock.schedule_once(partial(self.tableau_planning, place, planning))
+        if 'facture' in vues and self.facture is not None and self.facture.parent and self.current_client:
+            await self.recuperer_donnee(self.popup.get_screen('facture').ids.tableau_facture)
+        if 'compte' in vues and self.admin:
+            Clock.schedule_once(lambda dt: self.remove_tables('compte'))
+
     async def populate_tables(self):
         """Charge les tableaux Home depuis la BD avec gestion d'erreur complète"""
         try:
@@ -3339,45 +3362,86 @@ class Screen(MDApp):
                 )
                 return
             
-            # Traite les données
-            data_current = []
-            check = []
-            for i in data_en_cours:
-                try:
-                    color = self.color_map.get(i['etat'], "000000")
-                    check.append((self.reverse_date(i['date']), i['traitement'], i['etat'], i['axe']))
-                    data_current.append((
-                        f"[color={color}]{self.reverse_date(i['date'])}[/color]",
-                        f"[color={color}]{i['traitement']}[/color]",
-                        f"[color={color}]{i['etat']}[/color]",
-                        f"[color={color}]{i['axe']}[/color]"
-                    ))
-                except Exception as e:
-                    logger.warning(f'⚠️ ERREUR traitement en_cours: {e}')
-                    continue
-            
-            for i in data_prevision:
-                try:
-                    traitement_a_verifier = i['traitement']
-                    traitement_existe = any(item[1] == traitement_a_verifier for item in check)
-                    
-                    if not traitement_existe:
-                        row = (self.reverse_date(i["date"]), i["traitement"], i['etat'], i['axe'])
-                        data_next.append(row)
-                except Exception as e:
-                    logger.warning(f'⚠️ ERREUR traitement prévision: {e}')
-                    continue
-            
-            logger.info(f'✅ populate_tables: {len(data_current)} en cours, {len(data_next)} à venir')
-            
-            # Appelle home_tables avec gestion d'erreur
-            Clock.schedule_once(lambda dt: self._safe_home_tables(data_current, data_next, home))
+            self._afficher_home(home, data_en_cours, data_prevision)
             
         except Exception as e:
             logger.error(f'❌ ERREUR CRITIQUE populate_tables: {e}', exc_info=True)
+
+    def _afficher_home(self, home, data_en_cours, data_prevision):
+        """Formate les lignes Home et planifie leur application sur le thread principal"""
+        # Traite les données (seules les lignes nouvelles/modifiées sont reformatées)
+        data_current = self.vue_en_cours.actualiser(data_en_cours)
+
+        # ✅ Dédoublonnage par ensemble: O(n + m) au lieu de O(n·m)
+        en_cours = {i['traitement'] for i in self.vue_en_cours.sources}
+        data_next = self.vue_prevision.actualiser(
+            i for i in data_prevision if i['traitement'] not in en_cours
+        )
+
+        logger.info(f'✅ Home: {len(data_current)} en cours, {len(data_next)} à venir')
+
+        # Appelle home_tables avec gestion d'erreur
+        current = (self.vue_en_cours.cles, data_current)
+        next = (self.vue_prevision.cles, data_next)
+        Clock.schedule_once(lambda dt: self._safe_home_tables(current, next, home))
+
+    async def synchroniser_home(self, details):
+        """Fusionne les lignes PlanningDetails modifiées dans le tableau 'en cours' sans tout recharger"""
+        home = self.root.get_screen('Sidebar').ids['gestion_ecran'].get_screen('Home')
+        now = datetime.now()
+
+        lignes = {i['id']: i for i in self.vue_en_cours.sources}
+        for detail in details:
+            date = detail['date']
+            if (date.year, date.month) == (now.year, now.month) and detail['etat'] != 'Classé sans suite':
+                lignes[detail['id']] = detail
+            else:
+                lignes.pop(detail['id'], None)  # Sortie du mois courant ou classée sans suite
+        data_en_cours = sorted(lignes.values(), key=lambda i: i['date'])
+
+        # La prévision est un agrégat (MIN par planning): requête légère relancée telle quelle
+        data_prevision = await self.database.traitement_prevision(now.year, now.month)
+        self._afficher_home(home, data_en_cours, data_prevision)
+
+    async def synchroniser_vues(self, tables, suppression, details):
+        """Rafraîchit en place les vues touchées par les écritures des autres postes"""
+        if not self._tables_initialized:
+            return
+        structure = suppression or bool(tables & {'Client', 'Contrat', 'Planning'})
+
+        if structure:
+            await self.populate_tables()
+        elif 'PlanningDetails' in tables:
+            await self.synchroniser_home(details)
+
+        # Factures du client affiché: rechargées si un autre poste en a créé, payé ou modifié une
+        if (suppression or 'Facture' in tables) and self.facture is not None and self.facture.parent and self.current_client:
+            await self.recuperer_donnee(self.popup.get_screen('facture').ids.tableau_facture)
+
+        if not structure:
+            return
+
+        # Tableaux Contrat / Client / Planning: rechargés uniquement s'ils sont affichés
+        gestion = self.root.get_screen('Sidebar').ids['gestion_ecran']
+        place_contrat = gestion.get_screen('contrat').ids.tableau_contrat
+        place_client = gestion.get_screen('client').ids.tableau_client
+        place_planning = gestion.get_screen('planning').ids.tableau_planning
+
+        if self.sync_contrat.est_place(place_contrat):
+            result = await self.database.get_client()
+            if result:
+                Clock.schedule_once(lambda dt: self.update_contract_table(place_contrat, result))
+        if self.sync_client.est_place(place_client):
+            client_data = await self.database.get_all_client()
+            if client_data:
+                Clock.schedule_once(lambda dt: self.update_client_table_and_switch(place_client, client_data))
+        if self.sync_planning.est_place(place_planning):
+            planning = await self.database.get_all_planning()
+            if planning:
+                Clock.schedule_once(partial(self.tableau_planning, place_planning, planning))
     
     def _safe_home_tables(self, current, next, home):
-        """Affiche les tableaux avec gestion d'erreur complète"""
+        """Affiche les tableaux avec gestion d'erreur complète (current/next: (clés, lignes))"""
         try:
             if not home:
                 logger.error('❌ home est None')
@@ -3387,36 +3451,21 @@ class Screen(MDApp):
                 logger.error('❌ box_current ou box_next introuvable')
                 return
             
-            def update_data():
-                try:
-                    self.table_en_cours.row_data = current
-                    self.table_prevision.row_data = next
-                    logger.info('✅ Tableaux mis à jour avec succès')
-                except Exception as e:
-                    logger.error(f'❌ ERREUR mise à jour row_data: {e}')
-            
-            # Nettoie les anciens tableaux
+            # Place les tableaux une seule fois (plus de retrait/réajout à chaque écriture)
             try:
-                if self.table_en_cours.parent:
-                    self.table_en_cours.parent.remove_widget(self.table_en_cours)
-                if self.table_prevision.parent:
-                    self.table_prevision.parent.remove_widget(self.table_prevision)
-                logger.info('✅ Anciens tableaux supprimés')
+                self.sync_en_cours.placer(home.ids.box_current)
+                self.sync_prevision.placer(home.ids.box_next)
             except Exception as e:
-                logger.warning(f'⚠️ ERREUR suppression anciens tableaux: {e}')
-            
-            # Ajoute les nouveaux tableaux
+                logger.error(f'❌ ERREUR ajout tableaux: {e}')
+                return
+
+            # Applique seulement les lignes supprimées/modifiées/ajoutées
             try:
-                home.ids.box_current.add_widget(self.table_en_cours)
-                home.ids.box_next.add_widget(self.table_prevision)
-                logger.info('✅ Nouveaux tableaux ajoutés')
+                changements = self.sync_en_cours.appliquer(*current) + self.sync_prevision.appliquer(*next)
+                logger.info(f'✅ Tableaux mis à jour ({changements} changement(s))')
             except Exception as e:
-                logger.error(f'❌ ERREUR ajout nouveaux tableaux: {e}')
-                return
-            
-            # Met à jour les données
-            Clock.schedule_once(lambda dt, ud=update_data: ud(), 0)
-            
+                logger.error(f'❌ ERREUR mise à jour row_data: {e}')
+
         except Exception as e:
             logger.error(f'❌ ERREUR CRITIQUE _safe_home_tables: {e}', exc_info=True)
 
@@ -3427,7 +3476,7 @@ class Screen(MDApp):
         mois = screen.ids.mois_planning.text
         client = screen.ids.client.text
         data = None
-        print(categorie, traitement, mois, client)
+        logger.debug(f"Excel demandé - catégorie={categorie}, traitement={traitement}, mois={mois}, client={client}")
         if "mme" in client.lower():
             nom = client.split('mme')[0]
         if "mr" in client.lower():
@@ -3465,10 +3514,10 @@ class Screen(MDApp):
         self.dismiss_popup()
         self.fermer_ecran()
         self.show_dialog('', 'Le fichier a été generé avec succes')
-        print(data)
+        logger.debug(f"Excel généré: {data}")
 
     def excel_database(self, option, client=None, mois=None):
-        print(client)
+        logger.debug(f"excel_database - option={option}, client={client}, mois={mois}")
 
         async def get_data():
             if option == 'facture par client':
@@ -3493,29 +3542,18 @@ class Screen(MDApp):
         
         async def get_data():
             try:
-                id, datee = await self.database.get_planningdetails_id(self.current_client[13])
-                print(id, datee)
+                id, datee = await self.database.get_planningdetails_id(self.current_client.planning_id)
+                logger.debug(f"Résiliation - dernier planning_detail_id={id}, date={datee}")
+                # ✅ Home et Contrat se rafraîchissent via l'événement ContratResilie
                 await self.database.abrogate_contract(id)
-                
-                # ✅ CORRECTION: Attendre 0.5s pour que la BD traite la suppression
-                await asyncio.sleep(0.5)
-                
-                # ✅ CORRECTION: Lancer les 3 rafraîchissements en PARALLÈLE et ATTENDRE
-                await asyncio.gather(
-                    self.populate_tables(),
-                    self.get_client(),
-                    self.all_clients()
-                )
-                
+
                 # ✅ Fermer l'UI et afficher message success
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'contrat', show=False), 0)
                 Clock.schedule_once(lambda dt: self.dismiss_popup(), 0.1)
                 Clock.schedule_once(lambda dt: self.fermer_ecran(), 0.1)
                 Clock.schedule_once(lambda dt: self.show_dialog('Operation effectue', 'Le contrat a ete resilie'), 0.2)
             except Exception as e:
-                print(f'❌ Erreur resilier_contrat: {e}')
-                import traceback
-                traceback.print_exc()
+                logger.error(f'❌ Erreur resilier_contrat: {e}', exc_info=True)
                 Clock.schedule_once(lambda dt: self.loading_spinner(self.root.get_screen('Sidebar'), 'contrat', show=False), 0)
                 Clock.schedule_once(lambda dt: self.show_dialog('Erreur', f'Resiliation echouee: {str(e)}'), 0)
 
@@ -3530,9 +3568,14 @@ class Screen(MDApp):
 
     def on_stop(self):
         """Arrête proprement la boucle asyncio et le gestionnaire de base de données."""
+        self.chien_de_garde.arreter()
+        self.surveillant.arreter()
+        self.extension.arreter()
         if not self.loop.is_closed():
             future = asyncio.run_coroutine_threadsafe(self.database.close(), self.loop)
             future.result()
+        traceur.arreter()
+        enregistreur.arreter()
 
         self.loop.call_soon_threadsafe(self.loop.stop)
 
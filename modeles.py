@@ -0,0 +1,206 @@
+"""
+Modèles de lignes pour les requêtes les plus utilisées.
+
+Chaque modèle est un NamedTuple : pas de dictionnaire par ligne (contrairement
+à DictCursor), accès par attribut aussi rapide qu'un index, et la forme du
+résultat est vérifiable (`Modele._fields`). `curseur(Modele)` fournit une
+classe de curseur aiomysql qui construit directement les modèles à partir des
+lignes brutes du résultat, sans liste intermédiaire.
+
+L'ordre des champs suit l'ordre des colonnes du SELECT correspondant.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import aiomysql
+
+
+class ClientCourant(NamedTuple):
+    """get_current_client / get_current_contrat"""
+    client_id: int
+    nom: str
+    prenom: Optional[str]
+    categorie: str
+    date_contrat: date
+    type_traitement: str
+    duree: str
+    date_debut: date
+    date_fin: str
+    email: str
+    adresse: str
+    axe: str
+    telephone: str
+    planning_id: Optional[int]
+    facture_id: Optional[int]
+    nif: Optional[str]
+    stat: Optional[str]
+
+
+class DetailPlanning(NamedTuple):
+    """get_info_planning"""
+    nom: str
+    type_traitement: str
+    duree_traitement: int
+    date_debut: date
+    date_fin: str
+    client_id: int
+    facture_id: int
+    planning_id: int
+    planning_detail_id: int
+    date_planification: date
+
+
+class InfoDetailPlanning(NamedTuple):
+    """get_planning_detail_info"""
+    planning_detail_id: int
+    planning_id: int
+    date_planification: date
+    statut: str
+    traitement_id: int
+    contrat_id: int
+
+
+class LigneContrat(NamedTuple):
+    """get_client (tableau des contrats)"""
+    nom: str
+    date_contrat: date
+    type_traitement: str
+    redondances: Optional[str]
+    date_debut: date
+    date_fin: str
+    categorie: str
+    nb_traitements: int
+    client_id: int
+
+
+class LignePlanning(NamedTuple):
+    """get_all_planning (tableau des plannings)"""
+    nom: str
+    type_traitement: str
+    redondance: int
+    planning_id: int
+
+
+class LigneClient(NamedTuple):
+    """get_all_client (tableau des clients)"""
+    client_id: int
+    nom_complet: str
+    email: str
+    adresse: str
+    date_contrat: object
+
+
+class PlanningAEtendre(NamedTuple):
+    """get_plannings_a_etendre (extension glissante des contrats indéterminés)"""
+    planning_id: int
+    redondance: int
+    debut: Optional[date]
+    premiere: date
+    derniere: date
+    montant: int
+    axe: str
+
+
+class SegmentRegle(NamedTuple):
+    """Segments de PlanningRegle (plannings en mode règle, voir scripts/Migration_regles.sql)"""
+    planning_id: int
+    debut: date
+    pas: int
+    fin: Optional[date]
+    nom: str
+    type_traitement: str
+    axe: str
+
+
+# ---- Exports Excel ----
+# LIBELLES: intitulés des colonnes du classeur (alias SQL historiques), dans l'ordre des champs.
+
+class LigneFactureClient(NamedTuple):
+    """get_factures_data_for_client_comprehensive"""
+    client_nom: str
+    client_prenom: str
+    client_adresse: str
+    client_telephone: str
+    client_categorie: str
+    client_axe: str
+    contrat_id: int
+    reference_contrat: Optional[str]
+    date_contrat: date
+    contrat_date_debut: date
+    contrat_date_fin: str
+    statut_contrat: str
+    contrat_duree_type: str
+    numero_facture: Optional[str]
+    type_traitement: str
+    date_planification: date
+    etat_planning: str
+    redondance: int
+    date_facturation: date
+    etat_paiement: str
+    mode_paiement: Optional[str]
+    date_paiement: Optional[date]
+    numero_cheque: Optional[str]
+    etablissement_payeur: Optional[str]
+    montant_facture: int
+
+    LIBELLES = ('client_nom', 'client_prenom', 'client_adresse', 'client_telephone', 'client_categorie',
+                'client_axe', 'contrat_id', 'Référence Contrat', 'date_contrat', 'contrat_date_debut',
+                'contrat_date_fin', 'statut_contrat', 'contrat_duree_type', 'Numéro Facture', 'Type de Traitement',
+                'Date de Planification', 'Etat du Planning', 'Redondance (Mois)', 'Date de Facturation',
+                'Etat de Paiement', 'Mode de Paiement', 'Date de Paiement', 'Numéro du Chèque',
+                'Établissement Payeur', 'Montant Facturé')
+
+
+class LigneFactureMois(NamedTuple):
+    """obtenirDataFactureClient"""
+    client_nom: str
+    client_prenom: str
+    client_adresse: str
+    client_telephone: str
+    client_categorie: str
+    client_axe: str
+    reference_contrat: Optional[str]
+    numero_facture: Optional[str]
+    date_traitement: date
+    type_traitement: str
+    etat_traitement: str
+    etat_paiement: str
+    mode_paiement: Optional[str]
+    date_paiement: Optional[date]
+    numero_cheque: Optional[str]
+    etablissement_payeur: Optional[str]
+    montant_facture: int
+
+    LIBELLES = ('client_nom', 'client_prenom', 'client_adresse', 'client_telephone', 'client_categorie',
+                'client_axe', 'Référence Contrat', 'Numéro Facture', 'Date de traitement', 'Traitement (Type)',
+                'Etat traitement', 'Etat paiement (Payée ou non)', 'Mode de Paiement', 'Date de Paiement',
+                'Numéro du Chèque', 'Établissement Payeur', 'montant_facture')
+
+
+class LigneTraitementMois(NamedTuple):
+    """get_traitements_for_month"""
+    date_traitement: date
+    traitement: str
+    categorie_traitement: str
+    client: str
+    categorie_client: str
+    axe_client: str
+    etat_traitement: str
+
+    LIBELLES = ('Date du traitement', 'Traitement concerné', 'Catégorie du traitement', 'Client concerné',
+                'Catégorie du client', 'Axe du client', 'Etat traitement')
+
+
+@lru_cache(maxsize=None)
+def curseur(modele):
+    """Classe de curseur aiomysql dont les lignes sont des `modele` (à passer à conn.cursor())."""
+
+    class CurseurModele(aiomysql.Cursor):
+        async def _do_get_result(self):
+            await super()._do_get_result()
+            if self._rows:
+                self._rows = list(map(modele._make, self._rows))
+
+    CurseurModele.__name__ = f'Curseur{modele.__name__}'
+    return CurseurModele
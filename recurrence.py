@@ -0,0 +1,122 @@
+"""
+Moteur de récurrence des plannings.
+
+Une règle (date de départ, pas en mois, date de fin ou indéterminée) est
+développée paresseusement sur n'importe quel horizon. Les dates sont toujours
+calculées depuis la date de départ (départ + i * pas mois) pour éviter la
+dérive des fins de mois, puis décalées au prochain jour ouvré (dimanches et
+jours fériés, voir tester_date).
+"""
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import count, takewhile
+from typing import NamedTuple, Optional
+
+from tester_date import ajuster_dates, jour_ouvre_suivant
+
+# Horizon de planification par défaut des contrats à durée indéterminée
+HORIZON_ANNEES = 3
+
+# Décalage maximal d'une date par l'ajustement (dimanche suivi de jours fériés)
+MARGE_AJUSTEMENT = timedelta(days=7)
+
+
+class Regle(NamedTuple):
+    debut: date
+    pas: int                    # Mois entre deux traitements, 0 = une seule fois
+    fin: Optional[date] = None  # None = contrat à durée indéterminée
+    decalage: int = 0           # Mois ajoutés à `debut` avant la première date (reprise, décalages)
+
+
+def ajouter_mois(date_depart, nombre_mois):
+    """Ajoute un nombre de mois à une date (jour ramené au dernier jour du mois si besoin)."""
+    mois = date_depart.month - 1 + nombre_mois
+    annee = date_depart.year + mois // 12
+    mois = mois % 12 + 1
+    jour = min(date_depart.day, calendar.monthrange(annee, mois)[1])
+    return date(annee, mois, jour)
+
+
+def rang(origine, jour):
+    """
+    Mois entre `origine` et la date brute dont l'ajustement a donné `jour`.
+
+    L'ajustement ne fait qu'avancer une date de quelques jours : la date brute
+    est la dernière date `origine + n mois` qui ne dépasse pas `jour`. Les
+    décalages en mois (signalements) sont donc compris dans le rang.
+    """
+    mois = (jour.year - origine.year) * 12 + jour.month - origine.month
+    return mois - 1 if ajouter_mois(origine, mois) > jour else mois
+
+
+def depart_brut(debut, premiere):
+    """Date brute de départ d'un planning : `debut` si son ajustement donne `premiere`, sinon `premiere`."""
+    return debut if debut is not None and jour_ouvre_suivant(debut) == premiere else premiere
+
+
+def horizon(depart, annees=HORIZON_ANNEES):
+    """Dernier jour couvert par un horizon de `annees` années à partir de `depart`."""
+    return ajouter_mois(depart, 12 * annees) - timedelta(days=1)
+
+
+def _brutes(regle, jusqua=None):
+    """Dates non ajustées de la règle, bornées par sa fin et par `jusqua` (paresseux)."""
+    if regle.pas <= 0:
+        dates = iter((ajouter_mois(regle.debut, regle.decalage),))
+    else:
+        dates = (ajouter_mois(regle.debut, regle.decalage + i * regle.pas) for i in count())
+    limites = [borne for borne in (regle.fin, jusqua) if borne is not None]
+    if limites:
+        limite = min(limites)
+        dates = takewhile(lambda jour: jour <= limite, dates)
+    return dates
+
+
+def occurrences(regle, jusqua=None):
+    """Générateur des dates ajustées. Infini si la règle est indéterminée et `jusqua` est None."""
+    return map(jour_ouvre_suivant, _brutes(regle, jusqua))
+
+
+def developper(regle, jusqua=None):
+    """Liste des dates ajustées jusqu'à la fin de la règle, ou jusqu'à l'horizon par défaut."""
+    if regle.fin is None and jusqua is None and regle.pas > 0:
+        jusqua = horizon(regle.debut)
+    return ajuster_dates(list(_brutes(regle, jusqua)))
+
+
+@lru_cache(maxsize=4096)
+def fenetre(regle, debut, fin):
+    """
+    Occurrences (origine, date ajustée) dont la date ajustée tombe entre `debut` et `fin`.
+
+    `origine` est la date brute de la règle : elle identifie l'occurrence même
+    après un ajustement ou un déplacement. Mis en cache (règles immuables).
+    """
+    brutes = [jour for jour in _brutes(regle, fin) if jour >= debut - MARGE_AJUSTEMENT]
+    return tuple((origine, jour) for origine, jour in zip(brutes, ajuster_dates(brutes)) if debut <= jour <= fin)
+
+
+def developper_lot(regles, jusqua):
+    """
+    Développe plusieurs règles en une passe : {cle: [dates]} pour {cle: Regle}.
+
+    Les dates de toutes les règles sont ajustées en un seul appel à
+    ajuster_dates (fériés chargés une fois par année pour tout le lot).
+    """
+    cles = []
+    tailles = []
+    brutes = []
+    for cle, regle in regles.items():
+        dates = list(_brutes(regle, jusqua))
+        cles.append(cle)
+        tailles.append(len(dates))
+        brutes.extend(dates)
+
+    ajustees = ajuster_dates(brutes)
+    resultat = {}
+    position = 0
+    for cle, taille in zip(cles, tailles):
+        resultat[cle] = ajustees[position:position + taille]
+        position += taille
+    return resultat
@@ -0,0 +1,783 @@
+"""
+Registre des requêtes SQL de DatabaseManager.
+
+Chaque requête est nommée (le plus souvent comme la méthode qui l'exécute) et
+porte des paramètres d'exemple : des valeurs qui existent dans une base
+remplie par benchmarks/donnees.py, pour que benchmarks/plans.py puisse
+obtenir le plan d'exécution de chaque requête (EXPLAIN) sans lancer
+l'application.
+
+Quelques requêtes ont une partie choisie à l'exécution ({regle}, {filtre},
+{ordre}, {periode}) : le texte est complété par `str.format` dans
+setting_bd.py, `champs` donne les valeurs utilisées pour EXPLAIN.
+
+Restent dans setting_bd.py : les INSERT (plan trivial), les requêtes dont
+le texte dépend des données (colonnes de create_contrat, create_planning_details
+et create_facture, table de _deja_insere, CASE de _decaler_dates), les verrous
+nommés, `SELECT 1` et l'appel de la procédure creer_contrat_complet.
+"""
+from datetime import date
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+
+class Requete(NamedTuple):
+    """Texte SQL, paramètres d'exemple et valeurs des parties {…} pour EXPLAIN"""
+    sql: str
+    exemple: tuple = ()
+    champs: Mapping = MappingProxyType({})  # Lecture seule : valeur par défaut partagée
+
+
+# Valeurs d'exemple présentes dans une base remplie par benchmarks/donnees.py
+CLIENT = 'Client 000001'
+TRAITEMENT = 'Dératisation (PC)'
+JOUR = date(2025, 6, 10)
+ANNEE, MOIS = JOUR.year, JOUR.month
+
+REQUETES = {
+    # Comptes
+    'update_user': Requete(
+        "UPDATE Account SET nom = %s, prenom= %s, email=%s, username=%s, password=%s WHERE id_compte = %s",
+        ('Rakoto', 'Jean', 'jean@exemple.mg', 'jean', 'x', 1)),
+    'delete_user': Requete(
+        "DELETE FROM Account WHERE email = %s", ('jean@exemple.mg',)),
+    'verify_user': Requete(
+        "SELECT id_compte, nom, prenom, email, username, password, type_compte FROM Account WHERE username = %s",
+        ('jean',)),
+    'get_user': Requete(
+        "SELECT id_compte, nom, prenom, email, username, password, type_compte FROM Account WHERE username = %s",
+        ('jean',)),
+    'get_all_user': Requete(
+        "SELECT id_compte, username, email, type_compte FROM Account "
+        "WHERE type_compte != 'Administrateur' ORDER BY username ASC"),
+    'get_current_user': Requete(
+        "SELECT id_compte, nom, prenom, email, username, type_compte FROM Account WHERE id_compte = %s",
+        (1,)),
+
+    # Clients et contrats
+    'get_all_client': Requete(
+        """SELECT c.client_id,
+                  CONCAT(c.nom, ' ', c.prenom) AS nom_complet,
+                  c.email,
+                  c.adresse,
+                  COALESCE(MAX(co.date_contrat), '') AS date_contrat
+           FROM Client c
+           LEFT JOIN Contrat co ON c.client_id = co.client_id
+           GROUP BY c.client_id, c.nom, c.prenom, c.email, c.adresse
+           ORDER BY c.nom ASC
+           LIMIT %s""",
+        (5000,)),
+    'get_all_client_name': Requete(
+        "SELECT DISTINCT CONCAT(nom , ' ', prenom) as full_name From Client LIMIT %s", (5000,)),
+    'get_client': Requete(
+        """SELECT DISTINCT c.nom ,
+                  co.date_contrat,
+                  tt.typeTraitement,
+                  GROUP_CONCAT(DISTINCT p.redondance),
+                  co.date_debut ,
+                  co.date_fin ,
+                  c.categorie ,
+                  count(t.traitement_id),
+                  c.client_id
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           GROUP BY
+              c.client_id
+           ORDER BY
+              c.nom ASC;"""),
+    'get_current_client': Requete(
+        """SELECT
+                  c.client_id AS id,
+                  c.nom AS nom_client,
+                  c.prenom AS prenom_client,
+                  c.categorie AS categorie,
+                  co.date_contrat,
+                  COALESCE(tt.typeTraitement, 'Non défini') AS type_traitement,
+                  co.duree AS duree_contrat,
+                  co.date_debut AS debut_contrat,
+                  co.date_fin AS fin_contrat,
+                  c.email,
+                  c.adresse,
+                  c.axe,
+                  c.telephone,
+                  NULL AS planning_id,
+                  NULL AS facture_id,
+                  c.nif,
+                  c.stat
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           LEFT JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           LEFT JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           WHERE
+              c.nom = %s AND co.date_contrat = %s
+           LIMIT 1;""",
+        (CLIENT, JOUR)),
+    'get_current_contrat': Requete(
+        """SELECT c.client_id AS id,
+                  c.nom AS nom_client,
+                  c.prenom AS prenom_client,
+                  c.categorie AS categorie,
+                  co.date_contrat,
+                  tt.typeTraitement AS type_traitement,
+                  co.duree AS duree_contrat,
+                  co.date_debut AS debut_contrat,
+                  co.date_fin AS fin_contrat,
+                  c.email,
+                  c.adresse,
+                  c.axe,
+                  c.telephone,
+                  p.planning_id,
+                  f.facture_id,
+                  c.nif,
+                  c.stat
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+               Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+               PlanningDetails pld ON p.planning_id = pld.planning_id
+           JOIN
+               Facture f ON pld.planning_detail_id = f.planning_detail_id
+           WHERE
+              c.nom = %s AND co.date_contrat = %s AND tt.typeTraitement = %s;""",
+        (CLIENT, JOUR, TRAITEMENT)),
+    'get_latest_contract_date_for_client': Requete(
+        """SELECT co.date_contrat
+           FROM Contrat co
+           WHERE co.client_id = %s
+           ORDER BY co.date_contrat DESC
+           LIMIT 1""",
+        (1,)),
+    'traitement_par_client_nom': Requete(
+        """SELECT c.nom AS nom_client,
+                  co.date_contrat,
+                  tt.typeTraitement AS type_traitement,
+                  co.duree_contrat AS duree_contrat,
+                  co.date_debut AS debut_contrat,
+                  co.date_fin AS fin_contrat,
+                  c.categorie AS categorie,
+                  p.redondance
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           WHERE
+              c.nom = %s;""",
+        (CLIENT,)),
+    'traitement_par_client_id': Requete(
+        """SELECT c.nom AS nom_client,
+                  co.date_contrat,
+                  tt.typeTraitement AS type_traitement,
+                  co.duree_contrat AS duree_contrat,
+                  co.date_debut AS debut_contrat,
+                  co.date_fin AS fin_contrat,
+                  c.categorie AS categorie,
+                  p.redondance
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           WHERE
+              c.client_id = %s;""",
+        (1,)),
+    'delete_client': Requete(
+        "DELETE FROM Client where client_id = %s", (1,)),
+    'un_jour': Requete(
+        "UPDATE Contrat SET duree_contrat = 1 WHERE contrat_id = %s", (1,)),
+    'abrogate_contract': Requete(
+        """UPDATE Contrat
+           SET statut_contrat = 'Terminé',
+               date_fin       = %s,
+               duree          = 'Déterminée'
+           WHERE contrat_id = %s;""",
+        (JOUR, 1)),
+    'abrogate_contract_details': Requete(
+        """UPDATE PlanningDetails
+           SET statut = 'Classé sans suite'
+           WHERE planning_id = %s;""",
+        (1,)),
+
+    # Plannings
+    'traitement_en_cours': Requete(
+        """SELECT c.nom AS nom_client,
+              tt.typeTraitement AS type_traitement,
+              pdl.statut,
+              pdl.date_planification,
+              pdl.planning_detail_id,
+              c.axe
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+              PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           WHERE
+              MONTH(pdl.date_planification) = %s
+           AND
+              YEAR(pdl.date_planification) = %s
+           AND
+              pdl.statut != 'Classé sans suite'
+           ORDER BY
+              pdl.date_planification;""",
+        (MOIS, ANNEE)),
+    'traitement_prevision': Requete(
+        """SELECT c.nom AS nom_client,
+              tt.typeTraitement AS type_traitement,
+              pdl.statut,
+              MIN(pdl.date_planification) AS min_date,
+              p.planning_id,
+              c.axe
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+              PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           WHERE p.planning_id NOT IN (
+                SELECT DISTINCT p.planning_id
+                FROM Planning p
+                JOIN PlanningDetails pdl ON p.planning_id = pdl.planning_id
+                WHERE MONTH(pdl.date_planification) = %s
+                AND YEAR(pdl.date_planification) = %s
+           )
+           AND pdl.date_planification >= CURDATE()
+           AND p.redondance != 1
+           AND pdl.statut != 'Classé sans suite'
+           {regle}
+           GROUP BY p.planning_id
+           ORDER BY min_date""",
+        (MOIS, ANNEE), {'regle': ''}),
+    'get_all_planning': Requete(
+        """SELECT c.nom AS nom_client,
+                  tt.typeTraitement AS type_traitement,
+                  p.redondance ,
+                  p.planning_id
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           ORDER BY
+              c.nom ASC
+           LIMIT %s""",
+        (5000,)),
+    'get_details': Requete(
+        """SELECT
+               date_planification, statut
+           FROM
+               PlanningDetails
+           WHERE
+               planning_id = %s""",
+        (1,)),
+    'get_planningdetails_id': Requete(
+        """SELECT pdl.planning_detail_id,pdl.date_planification
+           FROM PlanningDetails pdl
+           JOIN Planning p ON pdl.planning_id = p.planning_id
+           WHERE p.planning_id = %s
+           AND pdl.date_planification >= %s;""",
+        (1, JOUR)),
+    'get_planning_detail_info': Requete(
+        """SELECT pd.planning_detail_id,
+                  pd.planning_id,
+                  pd.date_planification,
+                  pd.statut,
+                  p.traitement_id,
+                  t.contrat_id
+           FROM PlanningDetails pd
+           JOIN Planning p ON pd.planning_id = p.planning_id
+           JOIN Traitement t ON p.traitement_id = t.traitement_id
+           WHERE pd.planning_detail_id = %s;""",
+        (1,)),
+    'info_planning': Requete(
+        """SELECT c.nom AS nom_client,
+                 tt.typeTraitement AS type_traitement,
+                 p.duree_traitement,
+                 co.date_debut,
+                 co.date_fin,
+                 c.client_id,
+                 f.facture_id,
+                 p.planning_id,
+                 pdl.planning_detail_id,
+                 pdl.date_planification
+
+           FROM
+               Client c
+           JOIN
+               Contrat co ON c.client_id = co.client_id
+           JOIN
+               Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+               Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+               TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+               PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           JOIN
+               Facture f ON pdl.planning_detail_id = f.planning_detail_id
+           WHERE
+               p.planning_id = %s AND pdl.date_planification = %s""",
+        (1, JOUR)),
+    'info_planning_detail': Requete(
+        """SELECT c.nom AS nom_client,
+                 tt.typeTraitement AS type_traitement,
+                 p.duree_traitement,
+                 co.date_debut,
+                 co.date_fin,
+                 c.client_id,
+                 f.facture_id,
+                 p.planning_id,
+                 pdl.planning_detail_id,
+                 pdl.date_planification
+
+           FROM
+               Client c
+           JOIN
+               Contrat co ON c.client_id = co.client_id
+           JOIN
+               Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+               Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+               TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+               PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           JOIN
+               Facture f ON pdl.planning_detail_id = f.planning_detail_id
+           WHERE
+               pdl.planning_detail_id = %s""",
+        (1,)),
+    'get_planning_details_modifies': Requete(
+        """SELECT c.nom,
+                  tt.typeTraitement,
+                  pdl.statut,
+                  pdl.date_planification,
+                  pdl.planning_detail_id,
+                  c.axe,
+                  j.modification_id
+           FROM
+              JournalModifications j
+           JOIN
+              PlanningDetails pdl ON pdl.planning_detail_id = j.ligne_id
+           JOIN
+              Planning p ON pdl.planning_id = p.planning_id
+           JOIN
+              Traitement t ON p.traitement_id = t.traitement_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Contrat co ON t.contrat_id = co.contrat_id
+           JOIN
+              Client c ON co.client_id = c.client_id
+           WHERE
+              j.modification_id > %s AND j.nom_table = 'PlanningDetails' AND NOT j.suppression
+           ORDER BY
+              j.modification_id""",
+        (0,)),
+    'get_modifications': Requete(
+        """SELECT modification_id, nom_table, ligne_id, suppression FROM JournalModifications
+           WHERE modification_id > %s ORDER BY modification_id""",
+        (0,)),
+    'get_derniere_modification': Requete(
+        "SELECT COALESCE(MAX(modification_id), 0) FROM JournalModifications"),
+    'verify_planning_status': Requete(
+        "SELECT statut FROM PlanningDetails WHERE planning_detail_id = %s", (1,)),
+    'update_etat_planning': Requete(
+        "UPDATE PlanningDetails SET statut = %s WHERE planning_detail_id = %s", ('Effectué', 1)),
+    'modifier_date': Requete(
+        """UPDATE PlanningDetails
+           SET
+              date_planification = %s
+           WHERE
+              planning_detail_id = %s""",
+        (JOUR, 1)),
+    'date_origine': Requete(
+        "SELECT date_origine FROM PlanningDetails WHERE planning_detail_id = %s", (1,)),
+    'date_planification': Requete(
+        "SELECT date_planification FROM PlanningDetails WHERE planning_detail_id = %s", (1,)),
+    'depart_planning': Requete(
+        """SELECT p.date_debut_planification, MIN(pdl.date_planification)
+           FROM Planning p
+           JOIN PlanningDetails pdl ON pdl.planning_id = p.planning_id
+           WHERE p.planning_id = %s
+           GROUP BY p.planning_id, p.date_debut_planification""",
+        (1,)),
+    'decaler_dates': Requete(
+        """SELECT planning_detail_id, date_planification FROM PlanningDetails
+           WHERE planning_id = %s AND date_planification >= %s
+           ORDER BY date_planification
+           FOR UPDATE""",
+        (1, JOUR)),
+    'plannings_a_etendre': Requete(
+        """SELECT e.planning_id, e.redondance, e.debut, e.premiere, e.derniere, f.montant, f.axe
+           FROM (SELECT p.planning_id,
+                        p.redondance,
+                        p.date_debut_planification AS debut,
+                        MIN(pdl.date_planification) AS premiere,
+                        MAX(pdl.date_planification) AS derniere
+                 FROM Planning p
+                 JOIN Traitement t ON p.traitement_id = t.traitement_id
+                 JOIN Contrat co ON t.contrat_id = co.contrat_id
+                 JOIN PlanningDetails pdl ON pdl.planning_id = p.planning_id
+                 WHERE co.duree <> 'Déterminée'
+                   AND co.statut_contrat = 'Actif'
+                   AND p.redondance > 0
+                   {regle}
+                 GROUP BY p.planning_id, p.redondance, p.date_debut_planification
+                 HAVING derniere < %s) e
+           JOIN PlanningDetails d ON d.planning_id = e.planning_id
+                                 AND d.date_planification = e.derniere
+           JOIN Facture f ON f.planning_detail_id = d.planning_detail_id""",
+        (JOUR,), {'regle': ''}),
+    'etendre_fin_planification': Requete(
+        "UPDATE Planning SET date_fin_planification = %s WHERE planning_id = %s", (JOUR, 1)),
+    'supprimer_feries': Requete(
+        "DELETE FROM JoursFeries WHERE annee BETWEEN %s AND %s AND date_ferie NOT IN %s",
+        (ANNEE, ANNEE + 1, (JOUR,))),
+
+    # Plannings en mode règle (PlanningRegle)
+    'occurrences_regles': Requete(
+        """SELECT r.planning_id, r.debut, r.pas, r.fin, c.nom, tt.typeTraitement, c.axe
+           FROM PlanningRegle r
+           JOIN Planning p ON r.planning_id = p.planning_id
+           JOIN Traitement t ON p.traitement_id = t.traitement_id
+           JOIN TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN Contrat co ON t.contrat_id = co.contrat_id
+           JOIN Client c ON co.client_id = c.client_id
+           WHERE co.statut_contrat = 'Actif'
+             AND r.debut <= %s
+             AND (r.fin IS NULL OR r.fin >= %s)
+             {filtre}""",
+        (JOUR, JOUR), {'filtre': ''}),
+    'occurrences_materialisees': Requete(
+        """SELECT planning_id, date_origine FROM PlanningDetails
+           WHERE planning_id IN %s AND date_origine BETWEEN %s AND %s""",
+        ((1, 2, 3), JOUR, JOUR)),
+    'materialiser_occurrence_regle': Requete(
+        "SELECT debut, pas, fin, montant, axe FROM PlanningRegle "
+        "WHERE planning_id = %s AND debut <= %s FOR UPDATE",
+        (1, JOUR)),
+    'materialiser_occurrence_existante': Requete(
+        "SELECT planning_detail_id FROM PlanningDetails WHERE planning_id = %s AND date_origine = %s",
+        (1, JOUR)),
+    'decaler_regle_fin': Requete(
+        "SELECT fin FROM PlanningRegle WHERE planning_id = %s ORDER BY debut DESC LIMIT 1", (1,)),
+    'decaler_regle_segments': Requete(
+        """UPDATE PlanningRegle
+           SET debut = DATE_ADD(debut, INTERVAL %s MONTH),
+               fin = IF(fin <=> %s, fin, DATE_ADD(fin, INTERVAL %s MONTH))
+           WHERE planning_id = %s AND debut >= %s""",
+        (1, JOUR, 1, 1, JOUR)),
+    'decaler_regle_en_cours': Requete(
+        """SELECT regle_id, pas, fin, montant, axe FROM PlanningRegle
+           WHERE planning_id = %s AND debut < %s AND (fin IS NULL OR fin >= %s)""",
+        (1, JOUR, JOUR)),
+    'decaler_regle_couper': Requete(
+        "UPDATE PlanningRegle SET fin = DATE_SUB(%s, INTERVAL 1 DAY) WHERE regle_id = %s", (JOUR, 1)),
+    'decaler_regle_details': Requete(
+        """UPDATE PlanningDetails
+           SET date_planification = DATE_ADD(date_planification, INTERVAL %s MONTH),
+               date_origine = DATE_ADD(date_origine, INTERVAL %s MONTH)
+           WHERE planning_id = %s AND date_origine >= %s
+           ORDER BY date_origine {ordre}""",
+        (1, 1, 1, JOUR), {'ordre': 'DESC'}),
+
+    # Historique et remarques
+    'get_historique_remarque': Requete(
+        """SELECT
+               pdl.date_planification AS Date,
+               COALESCE(NULLIF(r.contenu, ''), 'Aucune remarque') AS Remarque,
+               COALESCE(sa.motif, 'Aucun') AS Avancement,
+               COALESCE(sd.motif, 'Aucun') AS Décalage,
+               COALESCE(NULLIF(r.issue, ''), 'Aucun problème') AS probleme,
+               COALESCE(NULLIF(r.action, ''), 'Aucune action') AS action
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+              PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           LEFT JOIN
+              Remarque r ON pdl.planning_detail_id = r.planning_detail_id
+           LEFT JOIN
+               Signalement sa ON r.planning_detail_id = sa.planning_detail_id AND sa.type = 'Avancement'
+           LEFT JOIN
+               Signalement sd ON r.planning_detail_id = sd.planning_detail_id AND sd.type = 'Décalage'
+           WHERE
+               p.planning_id = %s
+           LIMIT %s;""",
+        (1, 1000)),
+    'get_historic_par_client': Requete(
+        """SELECT c.nom,
+              co.duree,
+              tt.typeTraitement,
+              count(r.remarque_id) as nb_remarques,
+              p.planning_id
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+              PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           LEFT JOIN
+              Remarque r ON pdl.planning_detail_id = r.planning_detail_id
+           WHERE
+              c.nom = %s
+           GROUP BY
+              c.client_id, c.nom, co.duree, tt.typeTraitement, p.planning_id
+           LIMIT %s""",
+        (CLIENT, 1000)),
+    'get_historic': Requete(
+        """SELECT c.nom,
+              co.duree,
+              tt.typeTraitement,
+              count(r.remarque_id) as nb_remarques,
+              p.planning_id
+           FROM
+              Client c
+           JOIN
+              Contrat co ON c.client_id = co.client_id
+           JOIN
+              Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+              Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+              PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           LEFT JOIN
+              Remarque r ON pdl.planning_detail_id = r.planning_detail_id
+           WHERE
+              tt.categorieTraitement = %s
+           GROUP BY
+              c.client_id, c.nom, co.duree, tt.typeTraitement, p.planning_id
+           LIMIT %s""",
+        ('PC', 1000)),
+
+    # Factures
+    'get_facture': Requete(
+        """SELECT  pdl.date_planification,
+                   f.montant,
+                   f.etat
+           FROM
+               Client c
+           JOIN
+               Contrat co ON c.client_id = co.client_id
+           JOIN
+               Traitement t ON co.contrat_id = t.contrat_id
+           JOIN
+               Planning p ON t.traitement_id = p.traitement_id
+           JOIN
+               TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+           JOIN
+               PlanningDetails pdl ON p.planning_id = pdl.planning_id
+           JOIN
+               Facture f ON pdl.planning_detail_id = f.planning_detail_id
+           WHERE
+               c.client_id = %s
+           AND
+               tt.typeTraitement = %s
+           ORDER BY
+               pdl.date_planification""",
+        (1, TRAITEMENT)),
+    'get_facture_id': Requete(
+        """SELECT f.facture_id
+           FROM Facture f
+           JOIN PlanningDetails pd ON f.planning_detail_id = pd.planning_detail_id
+           JOIN Planning p ON pd.planning_id = p.planning_id
+           JOIN Traitement t ON p.traitement_id = t.traitement_id
+           JOIN Contrat c ON t.contrat_id = c.contrat_id
+           WHERE c.client_id = %s
+           AND pd.date_planification = %s;""",
+        (1, JOUR)),
+    'update_etat_facture': Requete(
+        """UPDATE Facture
+           SET reference_facture = %s,
+               etablissement_payeur = %s,
+               date_cheque = %s,
+               numero_cheque = %s,
+               etat = %s,
+               mode = %s
+           WHERE facture_id = %s ;""",
+        ('F1', None, None, None, 'Payé', 'Espèce', 1)),
+    'maj_montant_facture': Requete(
+        """SELECT f.facture_id, pdl.date_planification, pdl.planning_detail_id, p.planning_id
+           FROM Facture f
+           JOIN PlanningDetails pdl ON f.planning_detail_id = pdl.planning_detail_id
+           JOIN Planning p ON pdl.planning_id = p.planning_id
+           WHERE f.facture_id = %s""",
+        (1,)),
+    'maj_montant': Requete(
+        "UPDATE Facture SET montant = %s WHERE facture_id = %s;", (100000, 1)),
+    'maj_montant_suivantes': Requete(
+        """SELECT f.facture_id, f.montant
+           FROM Facture f
+           JOIN PlanningDetails pdl ON f.planning_detail_id = pdl.planning_detail_id
+           WHERE pdl.planning_id = %s
+           AND pdl.date_planification > %s""",
+        (1, JOUR)),
+
+    # Exports Excel
+    'get_factures_data_for_client_comprehensive': Requete(
+        """SELECT cl.nom                  AS client_nom,
+                  COALESCE(cl.prenom, '') AS client_prenom,
+                  cl.adresse              AS client_adresse,
+                  cl.telephone            AS client_telephone,
+                  cl.categorie            AS client_categorie,
+                  cl.axe                  AS client_axe,
+                  co.contrat_id,
+                  co.reference_contrat    AS `Référence Contrat`,
+                  co.date_contrat,
+                  co.date_debut           AS contrat_date_debut,
+                  co.date_fin             AS contrat_date_fin,
+                  co.statut_contrat,
+                  co.duree                AS contrat_duree_type,
+                  f.reference_facture     AS `Numéro Facture`,
+                  tt.typeTraitement       AS `Type de Traitement`,
+                  pd.date_planification   AS `Date de Planification`,
+                  pd.statut               AS `Etat du Planning`,
+                  p.redondance            AS `Redondance (Mois)`,
+                  f.date_traitement       AS `Date de Facturation`,
+                  f.etat                  AS `Etat de Paiement`,
+                  f.mode                  AS `Mode de Paiement`,
+                  f.date_cheque         AS `Date de Paiement`,
+                  f.numero_cheque         AS `Numéro du Chèque`,
+                  f.etablissement_payeur   AS `Établissement Payeur`,
+                  COALESCE(
+                          (SELECT hp.new_amount
+                           FROM Historique_prix hp
+                           WHERE hp.facture_id = f.facture_id
+                           ORDER BY hp.change_date DESC, hp.history_id DESC
+                           LIMIT 1),
+                          f.montant
+                  )                       AS `Montant Facturé`
+           FROM Client cl
+                    JOIN Contrat co ON cl.client_id = co.client_id
+                    JOIN Traitement tr ON co.contrat_id = tr.contrat_id
+                    JOIN TypeTraitement tt ON tr.id_type_traitement = tt.id_type_traitement
+                    JOIN Planning p ON tr.traitement_id = p.traitement_id
+                    INNER JOIN PlanningDetails pd ON p.planning_id = pd.planning_id
+                    INNER JOIN Facture f ON pd.planning_detail_id = f.planning_detail_id
+           WHERE cl.nom = %s
+             {periode}
+           ORDER BY `Date de Planification` ASC, `Date de Facturation` ASC;""",
+        (CLIENT,), {'periode': ''}),
+    'obtenirDataFactureClient': Requete(
+        """SELECT cl.nom                  AS client_nom,
+                  COALESCE(cl.prenom, '') AS client_prenom,
+                  cl.adresse              AS client_adresse,
+                  cl.telephone            AS client_telephone,
+                  cl.categorie            AS client_categorie,
+                  cl.axe                  AS client_axe,
+                  co.reference_contrat    AS `Référence Contrat`,
+                  f.reference_facture     AS `Numéro Facture`,
+                  f.date_traitement       AS `Date de traitement`,
+                  tt.typeTraitement       AS `Traitement (Type)`,
+                  pd.statut               AS `Etat traitement`,
+                  f.etat                  AS `Etat paiement (Payée ou non)`,
+                  f.mode                  AS `Mode de Paiement`,
+                  f.date_cheque         AS `Date de Paiement`,
+                  f.numero_cheque         AS `Numéro du Chèque`,
+                  f.etablissement_payeur   AS `Établissement Payeur`,
+                  COALESCE(
+                          (SELECT hp.new_amount
+                           FROM Historique_prix hp
+                           WHERE hp.facture_id = f.facture_id
+                           ORDER BY hp.change_date DESC, hp.history_id DESC
+                           LIMIT 1),
+                          f.montant
+                  )                       AS montant_facture
+           FROM Facture f
+                    JOIN PlanningDetails pd ON f.planning_detail_id = pd.planning_detail_id
+                    JOIN Planning p ON pd.planning_id = p.planning_id
+                    JOIN Traitement tr ON p.traitement_id = tr.traitement_id
+                    JOIN TypeTraitement tt ON tr.id_type_traitement = tt.id_type_traitement
+                    JOIN Contrat co ON tr.contrat_id = co.contrat_id
+                    JOIN Client cl ON co.client_id = cl.client_id
+           WHERE cl.nom = %s
+             AND YEAR(f.date_traitement) = %s
+             AND MONTH(f.date_traitement) = %s
+           ORDER BY f.date_traitement;""",
+        (CLIENT, ANNEE, MOIS)),
+    'get_traitements_for_month': Requete(
+        """SELECT pd.date_planification        AS `Date du traitement`,
+                  tt.typeTraitement            AS `Traitement concerné`,
+                  tt.categorieTraitement       AS `Catégorie du traitement`,
+                  CONCAT(c.nom, ' ', c.prenom) AS `Client concerné`,
+                  c.categorie                  AS `Catégorie du client`,
+                  c.axe                        AS `Axe du client`,
+                  pd.statut                    AS `Etat traitement` -- AJOUT DE CETTE COLONNE
+           FROM PlanningDetails pd
+                    JOIN
+                Planning p ON pd.planning_id = p.planning_id
+                    JOIN
+                Traitement t ON p.traitement_id = t.traitement_id
+                    JOIN
+                TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
+                    JOIN
+                Contrat co ON t.contrat_id = co.contrat_id
+                    JOIN
+                Client c ON co.client_id = c.client_id
+           WHERE YEAR(pd.date_planification) = %s
+             AND MONTH(pd.date_planification) = %s
+           ORDER BY pd.date_planification;""",
+        (ANNEE, MOIS)),
+}
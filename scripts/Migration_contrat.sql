@@ -0,0 +1,130 @@
+/*
+    =====================================================
+    PHASE 6: CRÉATION D'UN CONTRAT COMPLET EN UN APPEL
+    =====================================================
+    Status: PRÊT POUR EXÉCUTION (MySQL 8.0.21+ : JSON_VALUE, JSON_TABLE)
+
+    L'assistant "nouveau contrat" envoyait au moins 5 + 2×N requêtes (client,
+    contrat, type, traitement, planning puis une date et une facture par
+    occurrence). creer_contrat_complet reçoit tout en JSON et crée l'ensemble
+    dans une seule transaction côté serveur : un aller-retour réseau.
+
+    Appelée par DatabaseManager.create_full_contract ; si la procédure est
+    absente, l'application fait les mêmes insertions dans une unité de travail.
+
+    Format de `donnees` :
+    {
+      "client":  {"nom", "prenom", "email", "telephone", "adresse", "date_ajout",
+                  "categorie", "axe", "nif", "stat"},
+      "contrat": {"reference", "date_contrat", "date_debut", "date_fin",
+                  "duree_contrat", "duree", "categorie"},
+      "traitements": [
+        {"categorie", "type", "montant", "axe",
+         "planning": {"date_debut", "mois_debut", "mois_fin", "redondance", "date_fin"},
+         "dates": ["AAAA-MM-JJ", ...]}       -- dates déjà ajustées (jours ouvrés)
+      ]
+    }
+
+    Résultat : une ligne (client_id, contrat_id, traitements) où traitements
+    est un tableau JSON [{"traitement_id", "planning_id"}, ...].
+    =====================================================
+*/
+
+USE Planificator;
+
+DELIMITER $$
+
+CREATE PROCEDURE creer_contrat_complet(IN donnees JSON)
+BEGIN
+    DECLARE v_client_id INT;
+    DECLARE v_contrat_id INT;
+    DECLARE v_type_id INT;
+    DECLARE v_traitement_id INT;
+    DECLARE v_planning_id INT;
+    DECLARE v_traitement JSON;
+    DECLARE v_ids JSON DEFAULT JSON_ARRAY();
+    DECLARE i INT DEFAULT 0;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    INSERT INTO Client (nom, prenom, email, telephone, adresse, nif, stat, date_ajout, categorie, axe)
+    VALUES (JSON_VALUE(donnees, '$.client.nom'),
+            JSON_VALUE(donnees, '$.client.prenom'),
+            JSON_VALUE(donnees, '$.client.email'),
+            JSON_VALUE(donnees, '$.client.telephone'),
+            JSON_VALUE(donnees, '$.client.adresse'),
+            JSON_VALUE(donnees, '$.client.nif'),
+            JSON_VALUE(donnees, '$.client.stat'),
+            JSON_VALUE(donnees, '$.client.date_ajout'),
+            JSON_VALUE(donnees, '$.client.categorie'),
+            JSON_VALUE(donnees, '$.client.axe'));
+    SET v_client_id = LAST_INSERT_ID();
+
+    INSERT INTO Contrat (client_id, reference_contrat, date_contrat, date_debut, date_fin, duree_contrat, duree, categorie)
+    VALUES (v_client_id,
+            JSON_VALUE(donnees, '$.contrat.reference'),
+            JSON_VALUE(donnees, '$.contrat.date_contrat'),
+            JSON_VALUE(donnees, '$.contrat.date_debut'),
+            JSON_VALUE(donnees, '$.contrat.date_fin'),
+            JSON_VALUE(donnees, '$.contrat.duree_contrat' RETURNING SIGNED),
+            JSON_VALUE(donnees, '$.contrat.duree'),
+            JSON_VALUE(donnees, '$.contrat.categorie'));
+    SET v_contrat_id = LAST_INSERT_ID();
+
+    WHILE i < JSON_LENGTH(donnees, '$.traitements') DO
+        SET v_traitement = JSON_EXTRACT(donnees, CONCAT('$.traitements[', i, ']'));
+
+        INSERT INTO TypeTraitement (categorieTraitement, typeTraitement)
+        VALUES (JSON_VALUE(v_traitement, '$.categorie'), JSON_VALUE(v_traitement, '$.type'));
+        SET v_type_id = LAST_INSERT_ID();
+
+        INSERT INTO Traitement (contrat_id, id_type_traitement) VALUES (v_contrat_id, v_type_id);
+        SET v_traitement_id = LAST_INSERT_ID();
+
+        INSERT INTO Planning (traitement_id, date_debut_planification, mois_debut, mois_fin, redondance, date_fin_planification)
+        VALUES (v_traitement_id,
+                JSON_VALUE(v_traitement, '$.planning.date_debut'),
+                JSON_VALUE(v_traitement, '$.planning.mois_debut' RETURNING SIGNED),
+                JSON_VALUE(v_traitement, '$.planning.mois_fin' RETURNING SIGNED),
+                JSON_VALUE(v_traitement, '$.planning.redondance' RETURNING SIGNED),
+                JSON_VALUE(v_traitement, '$.planning.date_fin'));
+        SET v_planning_id = LAST_INSERT_ID();
+
+        -- Toutes les dates puis toutes les factures du planning : deux INSERT ensemblistes
+        INSERT INTO PlanningDetails (planning_id, date_planification, statut)
+        SELECT v_planning_id, d.jour, 'À venir'
+        FROM JSON_TABLE(v_traitement, '$.dates[*]' COLUMNS (jour DATE PATH '$')) d;
+
+        INSERT INTO Facture (planning_detail_id, montant, date_traitement, etat, axe)
+        SELECT pdl.planning_detail_id,
+               JSON_VALUE(v_traitement, '$.montant' RETURNING SIGNED),
+               pdl.date_planification,
+               'Non payé',
+               JSON_VALUE(v_traitement, '$.axe')
+        FROM PlanningDetails pdl
+        WHERE pdl.planning_id = v_planning_id;
+
+        SET v_ids = JSON_ARRAY_APPEND(v_ids, '$',
+                                      JSON_OBJECT('traitement_id', v_traitement_id, 'planning_id', v_planning_id));
+        SET i = i + 1;
+    END WHILE;
+
+    COMMIT;
+
+    SELECT v_client_id AS client_id, v_contrat_id AS contrat_id, v_ids AS traitements;
+END$$
+
+DELIMITER ;
+
+-- =====================================================
+-- COMMANDES DE ROLLBACK (EN CAS DE PROBLÈME)
+-- =====================================================
+/*
+DROP PROCEDURE creer_contrat_complet;
+*/
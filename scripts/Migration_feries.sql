@@ -0,0 +1,64 @@
+/*
+    =====================================================
+    PHASE 5: JOURS FÉRIÉS CÔTÉ SERVEUR
+    =====================================================
+    Status: PRÊT POUR EXÉCUTION (avec backup avant)
+
+    Les jours fériés sont calculés en Python (tester_date.jours_feries). Cette
+    table en est une copie pour que les requêtes ensemblistes et les travaux
+    en lot puissent éviter les fériés directement dans MySQL.
+
+    La table est remplie et tenue à jour par l'application
+    (DatabaseManager.synchroniser_feries, lancée chaque jour avec l'extension
+    des plannings) pour les années de config.json "feries_annees"
+    ([première, dernière]) ou, par défaut, de l'année précédente jusqu'à la
+    fin de l'horizon de planification. Ne pas la modifier à la main.
+    =====================================================
+*/
+
+USE Planificator;
+
+-- =====================================================
+-- PARTIE 1: TABLE DES JOURS FÉRIÉS
+-- =====================================================
+
+CREATE TABLE JoursFeries (
+    date_ferie DATE PRIMARY KEY,
+    libelle VARCHAR(100) NOT NULL,
+    annee SMALLINT NOT NULL,
+    INDEX idx_feries_annee (annee)
+);
+
+-- =====================================================
+-- PARTIE 2: PREMIER JOUR OUVRÉ (équivalent de tester_date.jour_ouvre_suivant)
+-- =====================================================
+/*
+    Exemple: décaler d'un mois tous les traitements à venir d'un planning
+    en restant sur des jours ouvrés, sans lire les lignes côté application :
+
+    UPDATE PlanningDetails
+    SET date_planification = jour_ouvre(DATE_ADD(date_planification, INTERVAL 1 MONTH))
+    WHERE planning_id = 42 AND date_planification >= CURDATE();
+*/
+
+DELIMITER $$
+
+CREATE FUNCTION jour_ouvre(jour DATE)
+    RETURNS DATE
+    READS SQL DATA
+BEGIN
+    WHILE DAYOFWEEK(jour) = 1 OR EXISTS (SELECT 1 FROM JoursFeries WHERE date_ferie = jour) DO
+        SET jour = DATE_ADD(jour, INTERVAL 1 DAY);
+    END WHILE;
+    RETURN jour;
+END$$
+
+DELIMITER ;
+
+-- =====================================================
+-- COMMANDES DE ROLLBACK (EN CAS DE PROBLÈME)
+-- =====================================================
+/*
+DROP FUNCTION jour_ouvre;
+DROP TABLE JoursFeries;
+*/
@@ -0,0 +1,44 @@
+/*
+    =====================================================
+    PHASE 7: CLÉS D'IDEMPOTENCE DES ÉCRITURES (OPTIONNEL)
+    =====================================================
+    Status: PRÊT POUR EXÉCUTION (avec backup avant)
+
+    create_contrat, create_planning_details et create_facture sont rejouées
+    automatiquement après une erreur transitoire (@reessayer). Si la connexion
+    est perdue après le COMMIT, la nouvelle tentative insérait un doublon
+    (deux factures pour la même date).
+
+    Avec "cles_idempotence": true dans config.json, chaque appel porte une clé
+    (UUID généré par l'application, identique pour toutes ses tentatives)
+    enregistrée dans cle_idempotence. L'index unique refuse le doublon (erreur
+    1062) et l'application renvoie alors l'id de la ligne déjà créée.
+
+    La colonne est NULL pour les lignes existantes et celles créées en lot
+    (extension des plannings, procédure creer_contrat_complet) : un index
+    unique accepte plusieurs NULL.
+    =====================================================
+*/
+
+USE Planificator;
+
+ALTER TABLE Contrat
+    ADD COLUMN cle_idempotence CHAR(36) NULL,
+    ADD UNIQUE INDEX uq_contrat_cle (cle_idempotence);
+
+ALTER TABLE PlanningDetails
+    ADD COLUMN cle_idempotence CHAR(36) NULL,
+    ADD UNIQUE INDEX uq_planning_details_cle (cle_idempotence);
+
+ALTER TABLE Facture
+    ADD COLUMN cle_idempotence CHAR(36) NULL,
+    ADD UNIQUE INDEX uq_facture_cle (cle_idempotence);
+
+-- =====================================================
+-- COMMANDES DE ROLLBACK (EN CAS DE PROBLÈME)
+-- =====================================================
+/*
+ALTER TABLE Facture DROP INDEX uq_facture_cle, DROP COLUMN cle_idempotence;
+ALTER TABLE PlanningDetails DROP INDEX uq_planning_details_cle, DROP COLUMN cle_idempotence;
+ALTER TABLE Contrat DROP INDEX uq_contrat_cle, DROP COLUMN cle_idempotence;
+*/
@@ -0,0 +1,72 @@
+/*
+    =====================================================
+    PHASE 4: STOCKAGE DES PLANNINGS PAR RÈGLE (OPTIONNEL)
+    =====================================================
+    Status: PRÊT POUR EXÉCUTION (avec backup avant)
+
+    En mode règle ("stockage_regles": true dans config.json), un planning ne
+    stocke plus une ligne PlanningDetails + Facture par occurrence : il stocke
+    sa règle de récurrence (PlanningRegle) et les occurrences sont calculées à
+    la lecture pour la période demandée.
+
+    Seules les exceptions sont enregistrées en lignes : une occurrence est
+    matérialisée (PlanningDetails + Facture) dès qu'elle est consultée pour une
+    action (traitement effectué, signalement, paiement). date_origine garde la
+    date brute de la règle pour relier la ligne à son occurrence.
+
+    Un décalage/avancement ne met plus à jour toutes les lignes : le segment
+    de règle en cours est coupé et un nouveau segment décalé est ajouté.
+
+    Les plannings existants restent en mode 'Lignes' et ne changent pas.
+    =====================================================
+*/
+
+USE Planificator;
+
+-- =====================================================
+-- PARTIE 1: MODE DE STOCKAGE DU PLANNING
+-- =====================================================
+
+ALTER TABLE Planning
+ADD COLUMN stockage ENUM ('Lignes', 'Règle') NOT NULL DEFAULT 'Lignes';
+
+-- =====================================================
+-- PARTIE 2: SEGMENTS DE RÈGLE
+-- =====================================================
+/*
+    Un planning en mode règle a un ou plusieurs segments : un segment par
+    décalage. Occurrences d'un segment : debut + i * pas mois, jusqu'à fin
+    (NULL = contrat à durée indéterminée), puis ajustées au jour ouvré.
+*/
+
+CREATE TABLE PlanningRegle (
+    regle_id INT PRIMARY KEY AUTO_INCREMENT,
+    planning_id INT NOT NULL,
+    debut DATE NOT NULL,
+    pas INT NOT NULL,
+    fin DATE NULL,
+    montant INT NOT NULL,
+    axe ENUM ('Nord (N)', 'Sud (S)', 'Est (E)', 'Ouest (O)', 'Centre (C)') NOT NULL,
+    FOREIGN KEY (planning_id) REFERENCES Planning(planning_id) ON DELETE CASCADE,
+    INDEX idx_regle_planning (planning_id, debut)
+);
+
+-- =====================================================
+-- PARTIE 3: EXCEPTIONS MATÉRIALISÉES
+-- =====================================================
+
+ALTER TABLE PlanningDetails
+ADD COLUMN date_origine DATE NULL;
+
+-- Une seule ligne par occurrence (NULL pour les plannings en mode 'Lignes')
+CREATE UNIQUE INDEX uq_planning_details_origine ON PlanningDetails(planning_id, date_origine);
+
+-- =====================================================
+-- COMMANDES DE ROLLBACK (EN CAS DE PROBLÈME)
+-- =====================================================
+/*
+DROP INDEX uq_planning_details_origine ON PlanningDetails;
+ALTER TABLE PlanningDetails DROP COLUMN date_origine;
+DROP TABLE PlanningRegle;
+ALTER TABLE Planning DROP COLUMN stockage;
+*/
@@ -0,0 +1,183 @@
+/*
+    =====================================================
+    PHASE 3: JOURNAL DES MODIFICATIONS (SYNCHRONISATION ENTRE POSTES)
+    =====================================================
+    Status: PRÊT POUR EXÉCUTION (avec backup avant)
+
+    Plusieurs postes partagent la même base. Chaque écriture ajoute une ligne
+    au journal JournalModifications (table, identifiant de la ligne,
+    suppression ou non). L'application relit toutes les quelques secondes les
+    entrées postérieures à la dernière vue (parcours de la clé primaire) et
+    ne recharge que les lignes concernées.
+
+    Le journal est en ajout seul : deux transactions n'écrivent jamais la
+    même ligne, les écritures des postes ne sont donc pas sérialisées (un
+    compteur unique par table l'était, verrouillé jusqu'au COMMIT).
+    En contrepartie les identifiants ne deviennent pas visibles dans l'ordre :
+    un identifiant manquant (transaction pas encore validée) est attendu
+    quelques dizaines de secondes par l'application avant d'être considéré
+    comme annulé (synchronisation.py).
+
+    ⚠️ Les suppressions en cascade (ON DELETE CASCADE) ne déclenchent pas les
+    triggers MySQL : seule la suppression directe est journalisée.
+    L'application recharge alors toutes les vues.
+    =====================================================
+*/
+
+USE Planificator;
+
+-- =====================================================
+-- PARTIE 1: JOURNAL
+-- =====================================================
+
+CREATE TABLE JournalModifications (
+    modification_id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    nom_table VARCHAR(64) NOT NULL,
+    ligne_id INT NOT NULL,
+    suppression BOOLEAN NOT NULL DEFAULT FALSE,
+    date_modification TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_journal_date (date_modification)
+);
+
+-- =====================================================
+-- PARTIE 2: TRIGGERS
+-- =====================================================
+
+DELIMITER $$
+
+-- PlanningDetails
+CREATE TRIGGER journal_ajout_planning_details
+    AFTER INSERT ON PlanningDetails
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('PlanningDetails', NEW.planning_detail_id);
+END$$
+
+CREATE TRIGGER journal_maj_planning_details
+    AFTER UPDATE ON PlanningDetails
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('PlanningDetails', NEW.planning_detail_id);
+END$$
+
+CREATE TRIGGER journal_suppression_planning_details
+    AFTER DELETE ON PlanningDetails
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id, suppression) VALUES ('PlanningDetails', OLD.planning_detail_id, TRUE);
+END$$
+
+-- Client
+CREATE TRIGGER journal_ajout_client
+    AFTER INSERT ON Client
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Client', NEW.client_id);
+END$$
+
+CREATE TRIGGER journal_maj_client
+    AFTER UPDATE ON Client
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Client', NEW.client_id);
+END$$
+
+CREATE TRIGGER journal_suppression_client
+    AFTER DELETE ON Client
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id, suppression) VALUES ('Client', OLD.client_id, TRUE);
+END$$
+
+-- Contrat
+CREATE TRIGGER journal_ajout_contrat
+    AFTER INSERT ON Contrat
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Contrat', NEW.contrat_id);
+END$$
+
+CREATE TRIGGER journal_maj_contrat
+    AFTER UPDATE ON Contrat
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Contrat', NEW.contrat_id);
+END$$
+
+CREATE TRIGGER journal_suppression_contrat
+    AFTER DELETE ON Contrat
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id, suppression) VALUES ('Contrat', OLD.contrat_id, TRUE);
+END$$
+
+-- Planning
+CREATE TRIGGER journal_ajout_planning
+    AFTER INSERT ON Planning
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Planning', NEW.planning_id);
+END$$
+
+CREATE TRIGGER journal_maj_planning
+    AFTER UPDATE ON Planning
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Planning', NEW.planning_id);
+END$$
+
+CREATE TRIGGER journal_suppression_planning
+    AFTER DELETE ON Planning
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id, suppression) VALUES ('Planning', OLD.planning_id, TRUE);
+END$$
+
+-- Facture
+CREATE TRIGGER journal_ajout_facture
+    AFTER INSERT ON Facture
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Facture', NEW.facture_id);
+END$$
+
+CREATE TRIGGER journal_maj_facture
+    AFTER UPDATE ON Facture
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id) VALUES ('Facture', NEW.facture_id);
+END$$
+
+CREATE TRIGGER journal_suppression_facture
+    AFTER DELETE ON Facture
+    FOR EACH ROW
+BEGIN
+    INSERT INTO JournalModifications (nom_table, ligne_id, suppression) VALUES ('Facture', OLD.facture_id, TRUE);
+END$$
+
+DELIMITER ;
+
+-- =====================================================
+-- PARTIE 3: PURGE DU JOURNAL
+-- =====================================================
+/*
+    Les postes ne relisent que les dernières secondes du journal : les
+    entrées de plus d'un jour sont supprimées toutes les heures (nécessite
+    event_scheduler=ON, actif par défaut depuis MySQL 8.0).
+*/
+
+CREATE EVENT purge_journal_modifications
+    ON SCHEDULE EVERY 1 HOUR
+    DO DELETE FROM JournalModifications WHERE date_modification < NOW() - INTERVAL 1 DAY;
+
+-- =====================================================
+-- COMMANDES DE ROLLBACK (EN CAS DE PROBLÈME)
+-- =====================================================
+/*
+DROP EVENT purge_journal_modifications;
+DROP TRIGGER journal_ajout_planning_details;
+DROP TRIGGER journal_maj_planning_details;
+DROP TRIGGER journal_suppression_planning_details;
+-- ... (continuer pour tous les triggers journal_*)
+DROP TABLE JournalModifications;
+*/
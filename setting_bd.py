@@ -1,14 +1,35 @@
 import asyncio
 import datetime
+import functools
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import random
 import logging
 import sys
+import time
+import uuid
+from typing import NamedTuple
 
 import aiomysql
 
 import json
 import os
 
+from journalisation import configurer as configurer_journalisation
+from instrumentation import SEUIL_DETENTION_MS, SEUIL_LENT_MS, PoolInstrumente, VerrouMesure, instrumenter, mesures
+from evenements import (BusEvenements, ClientCree, ClientSupprime, CompteCree, CompteModifie, CompteSupprime,
+                        ContratCree, ContratResilie, DatePlanifieeModifiee, DetailPlanningCree, FactureCreee,
+                        FacturePayee, MontantFactureModifie, PlanningCree, PlanningDecale, PlanningsEtendus,
+                        RemarqueCreee, SignalementCree, TraitementCree, TraitementEffectue)
+from modeles import (ClientCourant, DetailPlanning, InfoDetailPlanning, LigneClient, LigneContrat,
+                     LigneFactureClient, LigneFactureMois, LignePlanning, LigneTraitementMois, PlanningAEtendre,
+                     SegmentRegle, curseur)
+from recurrence import (HORIZON_ANNEES, MARGE_AJUSTEMENT, Regle, ajouter_mois, developper_lot, fenetre, horizon,
+                        depart_brut, rang)
+from requetes import REQUETES
+from tester_date import ajuster_dates, jours_feries
+
 # =====================================================
 # LOGGING CONFIGURATION
 # =====================================================
@@ -35,22 +56,16 @@ except Exception as e:
     log_file = os.path.join(os.path.expanduser('~'), 'planificator_db.log')
     print(f"📍 Utilisation de: {log_file}")
 
-logging.basicConfig(
-    level=logging.DEBUG,  # ← Changé de INFO à DEBUG pour plus de détails
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)  # Aussi afficher dans console avec UTF-8
-    ]
-)
-logger = logging.getLogger(__name__)
-logger.info(f"✅ LOGGING DÉMARRÉ - Fichier: {log_file}")
-
 config_path = os.path.join(os.path.dirname(__file__), 'config.json')
 
 with open(config_path, "r", encoding="utf-8") as f:
     config = json.load(f)
-    logger.info(f"Configuration chargée depuis {config_path}")
+
+# File + thread d'écoute : fichier JSON rotatif, requetes_lentes.log, console (voir journalisation.py)
+configurer_journalisation(log_file, config.get('journalisation'))
+logger = logging.getLogger(__name__)
+logger.info(f"✅ LOGGING DÉMARRÉ - Fichier: {log_file}")
+logger.info(f"Configuration chargée depuis {config_path}")
 
 # =====================================================
 # VALIDATION & ERROR HANDLING
@@ -98,12 +113,169 @@ def safe_execute(func_name):
         return wrapper
     return decorator
 
+class UniteAnnulee(Exception):
+    """Une opération a échoué dans une unité de travail : toute l'unité est annulée."""
+
+
+class _ConnexionUnite:
+    """
+    Connexion épinglée par DatabaseManager.unite_de_travail.
+
+    Les BEGIN/COMMIT des méthodes appelées sont ignorés (un seul COMMIT en fin
+    d'unité) ; leur ROLLBACK annule l'unité entière au lieu de réessayer.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.annulee = False
+        self.erreur = None  # Première erreur d'origine (MySQL ou autre) de l'unité
+
+    def __getattr__(self, nom):
+        return getattr(self._conn, nom)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        # Appelé depuis le except de la méthode : l'erreur en cours est la cause à conserver
+        erreur = sys.exc_info()[1]
+        self.annulee = True
+        if self.erreur is None and not isinstance(erreur, UniteAnnulee):
+            self.erreur = erreur
+        if isinstance(erreur, UniteAnnulee):
+            raise erreur
+        raise UniteAnnulee(f"Opération en échec dans l'unité de travail : {erreur}") from erreur
+
+
+# Connexion de l'unité de travail de la tâche courante (None = une connexion du pool par opération)
+_unite = ContextVar('unite_de_travail', default=None)
+
+
+# =====================================================
+# POLITIQUE DE RÉESSAI
+# =====================================================
+
+# Erreurs MySQL transitoires : la même opération peut réussir si on la rejoue
+ERREURS_REESSAYABLES = {
+    1213: 'Deadlock',
+    1205: 'Lock wait timeout',
+    1020: 'Record has changed',
+    2006: 'MySQL server has gone away',
+    2013: 'Lost connection to MySQL server',
+}
+
+# Erreurs levées avant le COMMIT : l'écriture n'a pas eu lieu, la rejouer ne crée pas de doublon.
+# Une connexion perdue (2006/2013) peut l'être après un COMMIT réussi : seules les lectures et les
+# écritures à clé d'idempotence la rejouent.
+ERREURS_VERROU = {code: ERREURS_REESSAYABLES[code] for code in (1213, 1205, 1020)}
+
+
+class PolitiqueReessai(NamedTuple):
+    tentatives: int = 4          # Nombre total d'essais
+    delai_initial: float = 0.1   # Secondes, doublé à chaque essai
+    delai_max: float = 2.0       # Plafond d'une attente
+    budget: float = 10.0         # Durée maximale cumulée (essais + attentes)
+
+
+POLITIQUE_REESSAI = PolitiqueReessai()
+
+# {nom de méthode: Counter(appels, reessais, echecs, erreur_<code>)}
+compteurs_reessais = defaultdict(Counter)
+
+
+def code_mysql(erreur):
+    """Code d'erreur MySQL d'une exception pymysql/aiomysql (None si ce n'en est pas une)."""
+    code = erreur.args[0] if erreur.args else None
+    return code if isinstance(code, int) else None
+
+
+def nouvelle_cle():
+    """Clé d'idempotence d'une écriture (voir scripts/Migration_idempotence.sql)."""
+    return str(uuid.uuid4())
+
+
+async def annuler(conn):
+    """ROLLBACK qui ne masque pas l'erreur d'origine quand la connexion est déjà perdue."""
+    try:
+        await conn.rollback()
+    except UniteAnnulee:
+        raise
+    except Exception as e:
+        logger.debug(f"ROLLBACK impossible: {e}")
+
+
+def reessayer(politique=POLITIQUE_REESSAI, idempotent=False, erreurs=ERREURS_REESSAYABLES):
+    """
+    Décorateur : rejoue la méthode sur une erreur de `erreurs` (ERREURS_REESSAYABLES par défaut).
+
+    Attente exponentielle plafonnée à delai_max, avec gigue complète, et
+    abandon dès que le budget de temps serait dépassé. Toute autre erreur
+    remonte immédiatement. Dans une unité de travail, aucune tentative n'est
+    rejouée : c'est l'unité entière qui est annulée. La méthode décorée doit
+    prendre self.lock elle-même, pour ne pas le garder pendant l'attente.
+
+    idempotent=True : la méthode accepte un argument nommé `cle` ; s'il n'est
+    pas fourni, une clé est générée ici pour que toutes les tentatives d'un
+    même appel partagent la même. La clé n'est enregistrée que si
+    `self.cles_idempotence` est vrai : sinon la méthode est traitée comme un
+    INSERT sans clé et seules les erreurs de ERREURS_VERROU sont rejouées.
+
+    Les INSERT sans clé d'idempotence passent erreurs=ERREURS_VERROU : après
+    une connexion perdue, la ligne a peut-être été validée.
+    """
+    def decorator(func):
+        nom = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            compteurs = compteurs_reessais[nom]
+            compteurs['appels'] += 1
+            if idempotent and kwargs.get('cle') is None:
+                kwargs['cle'] = nouvelle_cle()
+            if _unite.get() is not None:
+                return await func(*args, **kwargs)
+
+            rejouables = erreurs
+            if idempotent and not getattr(args[0], 'cles_idempotence', False):
+                # Clé non stockée: une connexion perdue après COMMIT donnerait un doublon
+                rejouables = {code: texte for code, texte in erreurs.items() if code in ERREURS_VERROU}
+            debut = time.monotonic()
+            for essai in range(1, politique.tentatives + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    code = code_mysql(e)
+                    delai = random.uniform(0, min(politique.delai_max, politique.delai_initial * 2 ** (essai - 1)))
+                    if (code not in rejouables or essai == politique.tentatives
+                            or time.monotonic() - debut + delai > politique.budget):
+                        compteurs['echecs'] += 1
+                        logger.error(f"❌ {nom} abandonné après {essai} essai(s): {e}")
+                        raise
+                    compteurs['reessais'] += 1
+                    compteurs[f'erreur_{code}'] += 1
+                    logger.warning(f"🔄 {nom}: {ERREURS_REESSAYABLES[code]} ({code}), "
+                                   f"essai {essai + 1}/{politique.tentatives} dans {delai:.2f}s")
+                    await asyncio.sleep(delai)
+        return wrapper
+    return decorator
+
+
+@instrumenter
 class DatabaseManager:
     """Gestionnaire de la base de données utilisant aiomysql."""
     def __init__(self, loop):
         self.loop = loop
         self.pool = None
-        self.lock = asyncio.Lock()
+        self.lock = VerrouMesure()  # Attentes mesurées (écran Diagnostics)
+        self.evenements = BusEvenements()  # Publié après chaque écriture validée
+        # Nouveaux plannings stockés par règle (nécessite scripts/Migration_regles.sql)
+        self.stockage_regles = bool(config.get('stockage_regles', False))
+        self._procedure_contrat = None  # creer_contrat_complet installée ? (None = pas encore essayé)
+        # Clés d'idempotence sur Contrat/PlanningDetails/Facture (nécessite scripts/Migration_idempotence.sql)
+        self.cles_idempotence = bool(config.get('cles_idempotence', False))
 
     async def connect(self):
         try:
@@ -114,19 +286,26 @@ class DatabaseManager:
                 'port': config['port'],
                 'user': config['user'],
                 'password': config['password'],
-                'db': "Planificator",
+                'db': config.get('base', "Planificator"),
                 'loop': self.loop,
                 'autocommit': False,
                 'echo': False,
+                'minsize': config.get('pool_min', 1),
+                'maxsize': config.get('pool_max', 10),
             }
+            if config.get('attente_verrou_s'):
+                # innodb_lock_wait_timeout de chaque connexion (50 s par défaut côté serveur)
+                pool_config['init_command'] = f"SET SESSION innodb_lock_wait_timeout = {int(config['attente_verrou_s'])}"
             
             # Ajouter timeouts si c'est une connexion réseau (pas localhost)
             if config['host'] != 'localhost' and config['host'] != '127.0.0.1':
                 pool_config['connect_timeout'] = 10  # 10 sec pour se connecter
                 logger.warning(f"⚠️  Connexion réseau détectée ({config['host']}:{config['port']}) - timeout 10s activé")
             
-            self.pool = await aiomysql.create_pool(**pool_config)
-            logger.info(f"✅ Connexion BD réussie - Pool créé (host={config['host']}, port={config['port']}, db=Planificator)")
+            self.pool = PoolInstrumente(await aiomysql.create_pool(**pool_config),
+                                        config.get('seuil_requete_lente_ms', SEUIL_LENT_MS),
+                                        config.get('seuil_detention_ms', SEUIL_DETENTION_MS))
+            logger.info(f"✅ Connexion BD réussie - Pool créé (host={config['host']}, port={config['port']}, db={pool_config['db']})")
         except Exception as e:
             logger.error(f"❌ Erreur connexion BD: {e}", exc_info=True)
             raise
@@ -146,32 +325,110 @@ class DatabaseManager:
             logger.error(f"❌ Reconnexion échouée: {e}", exc_info=True)
             return False
     
+    @asynccontextmanager
+    async def connexion(self):
+        """Connexion de l'unité de travail en cours s'il y en a une, sinon une connexion du pool."""
+        unite = _unite.get()
+        if unite is not None:
+            yield unite
+        else:
+            async with self.pool.acquire() as conn:
+                yield conn
+
+    @asynccontextmanager
+    async def unite_de_travail(self):
+        """
+        Enchaîne plusieurs écritures sur une seule connexion et une seule transaction.
+
+            async with database.unite_de_travail():
+                client = await database.create_client(...)
+                contrat = await database.create_contrat(client, ...)
+
+        Un seul COMMIT à la sortie ; toute erreur annule l'ensemble (ROLLBACK).
+        Les événements sont publiés après le COMMIT. Une unité imbriquée fait
+        partie de l'unité englobante.
+        """
+        if _unite.get() is not None:
+            yield
+            return
+
+        async with self.pool.acquire() as conn:
+            unite = _ConnexionUnite(conn)
+            jeton = _unite.set(unite)
+            retenus = self.evenements.retenir()
+            valide = False
+            try:
+                await conn.begin()
+                yield
+                if unite.annulee:
+                    # Erreur interceptée par la méthode appelée : la remonter avec sa cause
+                    raise UniteAnnulee(f"Une opération de l'unité de travail a échoué : {unite.erreur}") \
+                        from unite.erreur
+                await conn.commit()
+                valide = True
+            except BaseException:
+                await annuler(conn)
+                logger.warning("↩️ Unité de travail annulée (ROLLBACK)")
+                raise
+            finally:
+                _unite.reset(jeton)
+                self.evenements.relacher(retenus, publier=valide)
+
+    async def _deja_insere(self, conn, cur, erreur, table, colonne_id, cle):
+        """
+        Id de la ligne déjà insérée avec `cle` quand `erreur` est un doublon
+        sur cle_idempotence (tentative précédente validée), sinon None.
+        """
+        if cle is None or code_mysql(erreur) != 1062:
+            return None
+        # FOR SHARE : lit la dernière version validée, même dans une transaction déjà ouverte
+        await cur.execute(f"SELECT {colonne_id} FROM {table} WHERE cle_idempotence = %s FOR SHARE", (cle,))
+        ligne = await cur.fetchone()
+        if ligne is None:
+            return None  # Doublon sur une autre contrainte unique
+        await conn.commit()
+        logger.info(f"♻️ {table} déjà créé(e) par une tentative précédente - ID={ligne[0]}")
+        return ligne[0]
+
     async def get_pool_status(self):
         """Retourne l'état de la connection pool."""
         if self.pool is None:
             return {"status": "disconnected", "message": "Pool non initialisée"}
         
         try:
-            free_size = self.pool._free_size if hasattr(self.pool, '_free_size') else 0
-            size = self.pool._size if hasattr(self.pool, '_size') else 0
-            
+            # Propriétés publiques du pool aiomysql (relayées par PoolInstrumente)
+            free_size = self.pool.freesize
+            size = self.pool.size
+            max_size = self.pool.maxsize
+            epuise = free_size == 0 and size >= max_size
+
             status = {
                 "status": "connected",
                 "total_connections": size,
                 "free_connections": free_size,
                 "active_connections": size - free_size,
-                "pool_healthy": free_size > 0
+                "max_connections": max_size,
+                "pool_healthy": not epuise
             }
             
             logger.debug(f"Pool status: {status}")
             
-            if free_size == 0:
+            # Pas de connexion libre mais pool sous maxsize: la prochaine acquisition en ouvre une
+            if epuise:
                 logger.warning("⚠️  ALERTE: Aucune connexion libre dans la pool!")
             
             return status
         except Exception as e:
             logger.error(f"Erreur lors de la vérification de la pool: {e}")
             return {"status": "error", "message": str(e)}
+
+    def statistiques_requetes(self):
+        """Histogrammes par méthode (ms : total, attente_pool, execution, lecture ; lignes): compte, moyenne, p50, p95, max."""
+        return mesures.resume()
+
+    def statistiques_reessais(self):
+        """Compteurs de la politique de réessai par méthode: {nom: {appels, reessais, echecs, erreur_<code>}}."""
+        return {nom: dict(compteurs) for nom, compteurs in compteurs_reessais.items()}
     
     async def health_check(self, auto_reconnect=True):
         """Vérifie la santé de la connexion BD avec reconnexion automatique si réseau."""
@@ -271,25 +528,28 @@ class DatabaseManager:
                     (nom, prenom, email, username, password, type_compte)
                 )
                 await conn.commit()
+                self.evenements.publier(CompteCree(email))
 
     async def update_user(self,new_nom, new_prenom, new_email, new_username, new_password, id):
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
                 await conn.begin()
                 await cur.execute(
-                    "UPDATE Account SET nom = %s, prenom= %s, email=%s, username=%s, password=%s WHERE id_compte = %s",
+                    REQUETES['update_user'].sql,
                     (new_nom, new_prenom, new_email, new_username, new_password, id)
                 )
                 await conn.commit()
+                self.evenements.publier(CompteModifie(id))
 
     async def delete_user(self, email):
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
-                    "DELETE FROM Account WHERE email = %s",
+                    REQUETES['delete_user'].sql,
                     email
                 )
                 await conn.commit()
+                self.evenements.publier(CompteSupprime(email))
 
     async def get_facture(self, client_id, traitement):
         def format_montant(montant):
@@ -301,29 +561,7 @@ class DatabaseManager:
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cursor:
                 try:
-                    await cursor.execute("""SELECT  pdl.date_planification,
-                                                    f.montant,
-                                                    f.etat
-                                            FROM
-                                                Client c
-                                            JOIN
-                                                Contrat co ON c.client_id = co.client_id
-                                            JOIN
-                                                Traitement t ON co.contrat_id = t.contrat_id
-                                            JOIN
-                                                Planning p ON t.traitement_id = p.traitement_id
-                                            JOIN
-                                                TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                            JOIN
-                                                PlanningDetails pdl ON p.planning_id = pdl.planning_id 
-                                            JOIN
-                                                Facture f ON pdl.planning_detail_id = f.planning_detail_id
-                                            WHERE
-                                                c.client_id = %s
-                                            AND
-                                                tt.typeTraitement = %s
-                                            ORDER BY 
-                                                pdl.date_planification""", (client_id,traitement))
+                    await cursor.execute(REQUETES['get_facture'].sql, (client_id,traitement))
 
                     resultat = await cursor.fetchall()
 
@@ -345,7 +583,7 @@ class DatabaseManager:
             async with conn.cursor() as cursor:
                 logger.debug(f"🔍 Vérification utilisateur: {username}")
                 await cursor.execute(
-                    "SELECT id_compte, nom, prenom, email, username, password, type_compte FROM Account WHERE username = %s", (username,)
+                    REQUETES['verify_user'].sql, (username,)
                 )
                 result = await cursor.fetchone()
                 return result
@@ -357,7 +595,7 @@ class DatabaseManager:
                 try:
                     logger.debug("📅 Récupération tous utilisateurs")
                     await cursor.execute(
-                        "SELECT id_compte, username, email, type_compte FROM Account WHERE type_compte != 'Administrateur' ORDER BY username ASC"
+                        REQUETES['get_all_user'].sql
                     )
                     resultat = await cursor.fetchall()
                     logger.info(f"✅ {len(resultat)} utilisateurs récupérés")
@@ -373,7 +611,7 @@ class DatabaseManager:
                 try:
                     logger.debug(f"🔍 Récupération utilisateur ID={id_compte}")
                     await cursor.execute(
-                        "SELECT id_compte, nom, prenom, email, username, type_compte FROM Account WHERE id_compte = %s",
+                        REQUETES['get_current_user'].sql,
                         (id_compte,)
                     )
                     current = await cursor.fetchone()
@@ -389,7 +627,7 @@ class DatabaseManager:
                 try:
                     logger.debug(f"🔍 Récupération utilisateur: {username}")
                     await cursor.execute(
-                        "SELECT id_compte, nom, prenom, email, username, password, type_compte FROM Account WHERE username = %s",
+                        REQUETES['get_user'].sql,
                         (username,)
                     )
                     current = await cursor.fetchone()
@@ -398,90 +636,64 @@ class DatabaseManager:
                     logger.error(f"❌ Erreur get_user: {e}", exc_info=True)
                     return None
 
+    @reessayer(idempotent=True)
     async def create_contrat(self, client_id,numero_contrat,  date_contrat, date_debut, date_fin, duree, duree_contrat, categorie,
-                             max_retries=3):
+                             *, cle=None):
         logger.info(f"📋 Création contrat - client_id={client_id}, ref={numero_contrat}, categorie={categorie}")
-        
-        for attempt in range(max_retries + 1):
-            try:
-                async with self.lock:
-                    async with self.pool.acquire() as conn:
-                        async with conn.cursor() as cur:
-                            await cur.execute(
-                                "INSERT INTO Contrat (client_id,reference_contrat, date_contrat, date_debut, date_fin, duree_contrat, duree, categorie) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-                                (client_id, numero_contrat, date_contrat, date_debut, date_fin, duree, duree_contrat, categorie)
-                            )
-                            await conn.commit()
-                            contrat_id = cur.lastrowid
-                            logger.info(f"✅ Contrat créé - ID={contrat_id}")
-                            return contrat_id
-
-            except Exception as e:
-                logger.warning(f"⚠️  Tentative {attempt + 1} échouée pour create_contrat: {e}")
-                await conn.rollback()
-
-                if attempt == max_retries:
-                    logger.error(f"❌ Échec définitif après {max_retries + 1} tentatives pour client_id={client_id}", exc_info=True)
-                    raise e
-
-                base_delay = 2 ** attempt
-                jitter = random.uniform(0, 0.1 * base_delay)
-                delay = base_delay + jitter
-
-                logger.debug(f"Retry dans {delay:.2f}s...")
-                await asyncio.sleep(delay)
+        cle = cle if self.cles_idempotence else None
+        colonnes = "client_id,reference_contrat, date_contrat, date_debut, date_fin, duree_contrat, duree, categorie"
+        valeurs = (client_id, numero_contrat, date_contrat, date_debut, date_fin, duree, duree_contrat, categorie)
+        if cle is not None:
+            colonnes += ", cle_idempotence"
+            valeurs += (cle,)
 
-        return None
-
-    async def create_client(self, nom, prenom, email, telephone, adresse, date_ajout, categorie, axe, nif, stat,
-                            max_retries=3):
-        for attempt in range(max_retries + 1):
-            try:
-                async with self.lock:
-                    async with self.pool.acquire() as conn:
-                        async with conn.cursor() as cur:
-                            await cur.execute(
-                                "INSERT INTO Client (nom, prenom, email, telephone, adresse, nif, stat, date_ajout, categorie, axe) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
-                                (nom, prenom, email, telephone, adresse, nif, stat, date_ajout, categorie, axe)
-                            )
-                            await conn.commit()
-                            return cur.lastrowid
-
-            except Exception as e:
-                logger.warning(f"⚠️  Tentative {attempt + 1} échouée pour create_client: {e}")
-                await conn.rollback()
-
-                if attempt == max_retries:
-                    logger.error(f"❌ Échec définitif après {max_retries + 1} tentatives pour create_client", exc_info=True)
-                    raise e
-
-                base_delay = 2 ** attempt
-                jitter = random.uniform(0, 0.1 * base_delay)
-                delay = base_delay + jitter
-
-                logger.debug(f"Retry dans {delay:.2f}s...")
-                await asyncio.sleep(delay)
+        async with self.lock:
+            async with self.connexion() as conn:
+                async with conn.cursor() as cur:
+                    try:
+                        await cur.execute(
+                            f"INSERT INTO Contrat ({colonnes}) VALUES ({', '.join(['%s'] * len(valeurs))})",
+                            valeurs
+                        )
+                        await conn.commit()
+                        contrat_id = cur.lastrowid
+                        logger.info(f"✅ Contrat créé - ID={contrat_id}")
+                        self.evenements.publier(ContratCree(contrat_id, client_id))
+                        return contrat_id
+                    except Exception as e:
+                        contrat_id = await self._deja_insere(conn, cur, e, 'Contrat', 'contrat_id', cle)
+                        if contrat_id is not None:
+                            self.evenements.publier(ContratCree(contrat_id, client_id))
+                            return contrat_id
+                        logger.warning(f"⚠️  create_contrat échoué pour client_id={client_id}: {e}")
+                        await annuler(conn)
+                        raise
 
-        return None
+    @reessayer(erreurs=ERREURS_VERROU)
+    async def create_client(self, nom, prenom, email, telephone, adresse, date_ajout, categorie, axe, nif, stat):
+        async with self.lock:
+            async with self.connexion() as conn:
+                async with conn.cursor() as cur:
+                    try:
+                        await cur.execute(
+                            "INSERT INTO Client (nom, prenom, email, telephone, adresse, nif, stat, date_ajout, categorie, axe) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                            (nom, prenom, email, telephone, adresse, nif, stat, date_ajout, categorie, axe)
+                        )
+                        await conn.commit()
+                        self.evenements.publier(ClientCree(cur.lastrowid))
+                        return cur.lastrowid
+                    except Exception as e:
+                        logger.warning(f"⚠️  create_client échoué: {e}")
+                        await annuler(conn)
+                        raise
 
     async def get_all_client(self, limit=5000):
         """Récupère tous les clients avec leur date de contrat le plus récent."""
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
+            async with conn.cursor(curseur(LigneClient)) as cur:
                 try:
                     logger.info(f"📋 Récupération tous clients (limite: {limit})")
-                    await cur.execute(f"""
-                        SELECT c.client_id, 
-                               CONCAT(c.nom, ' ', c.prenom) AS nom_complet,
-                               c.email, 
-                               c.adresse,
-                               COALESCE(MAX(co.date_contrat), '') AS date_contrat
-                        FROM Client c
-                        LEFT JOIN Contrat co ON c.client_id = co.client_id
-                        GROUP BY c.client_id, c.nom, c.prenom, c.email, c.adresse
-                        ORDER BY c.nom ASC 
-                        LIMIT {int(limit)}
-                    """)
+                    await cur.execute(REQUETES['get_all_client'].sql, (int(limit),))
                     result = await cur.fetchall()
                     logger.info(f"✅ {len(result)} clients récupérés")
                     return result
@@ -489,83 +701,49 @@ class DatabaseManager:
                     logger.error(f"❌ Erreur get_all_client: {e}", exc_info=True)
                     return []
 
-    async def typetraitement(self, categorie, type, max_retries=3):
-        for attempt in range(max_retries + 1):
-            try:
-                async with self.lock:
-                    async with self.pool.acquire() as conn:
-                        async with conn.cursor() as cursor:
-                            await cursor.execute(
-                                "INSERT INTO TypeTraitement (categorieTraitement, typeTraitement) VALUES (%s, %s)",
-                                (categorie, type)
-                            )
-                            await conn.commit()
-                            return cursor.lastrowid
-
-            except Exception as e:
-                logger.warning(f"⚠️  Tentative {attempt + 1} échouée pour create_type_traitement: {e}")
-                await conn.rollback()
-
-                if attempt == max_retries:
-                    logger.error(f"❌ Échec définitif après {max_retries + 1} tentatives pour create_type_traitement", exc_info=True)
-                    raise e
+    @reessayer(erreurs=ERREURS_VERROU)
+    async def typetraitement(self, categorie, type):
+        async with self.lock:
+            async with self.connexion() as conn:
+                async with conn.cursor() as cursor:
+                    try:
+                        await cursor.execute(
+                            "INSERT INTO TypeTraitement (categorieTraitement, typeTraitement) VALUES (%s, %s)",
+                            (categorie, type)
+                        )
+                        await conn.commit()
+                        return cursor.lastrowid
+                    except Exception as e:
+                        logger.warning(f"⚠️  create_type_traitement échoué: {e}")
+                        await annuler(conn)
+                        raise
 
-                base_delay = 2 ** attempt
-                jitter = random.uniform(0, 0.1 * base_delay)
-                delay = base_delay + jitter
+    @reessayer(erreurs=ERREURS_VERROU)
+    async def creation_traitement(self, contrat_id, id_type_traitement):
+        async with self.lock:
+            async with self.connexion() as conn:
+                async with conn.cursor() as cur:
+                    try:
+                        await conn.begin()
+                        await cur.execute("""
+                            INSERT INTO Traitement (contrat_id, id_type_traitement) 
+                            VALUES (%s, %s)
+                        """, (contrat_id, id_type_traitement))
 
-                logger.debug(f"Retry dans {delay:.2f}s...")
-                await asyncio.sleep(delay)
+                        await conn.commit()
+                        logger.debug(f"✅ Traitement créé - id={cur.lastrowid}")
+                        self.evenements.publier(TraitementCree(cur.lastrowid, contrat_id))
+                        return cur.lastrowid
 
-        return None
+                    except Exception as e:
+                        logger.error(f"❌ Erreur creation_traitement: {e}")
+                        await annuler(conn)
+                        raise
 
-    async def creation_traitement(self, contrat_id, id_type_traitement, max_retries=3):
+    @reessayer(erreurs=ERREURS_VERROU)
+    async def create_planning(self, traitement_id, date_debut, mois_debut, mois_fin, redondance, date_fin):
         async with self.lock:
-            # Boucle de retry
-            for attempt in range(max_retries):
-                async with self.pool.acquire() as conn:
-                    async with conn.cursor() as cur:
-                        try:
-                            await conn.begin()
-                            await cur.execute("""
-                                INSERT INTO Traitement (contrat_id, id_type_traitement) 
-                                VALUES (%s, %s)
-                            """, (contrat_id, id_type_traitement))
-
-                            await conn.commit()
-                            print(f"✅ Traitement créé avec succès, ID: {cur.lastrowid}")
-                            return cur.lastrowid
-
-                        except Exception as e:
-                            await conn.rollback()
-                            print(f'creation_traitement tentative {attempt + 1}/{max_retries}: {e}')
-
-                            # Erreurs retryables
-                            retryable_errors = [
-                                "Record has changed",
-                                "Deadlock found",
-                                "Connection lost",
-                                "Lost connection to MySQL server",
-                                "MySQL server has gone away"
-                            ]
-
-                            is_retryable = any(error in str(e) for error in retryable_errors)
-
-                            if is_retryable and attempt < max_retries - 1:
-                                wait_time = 0.1 * (2 ** attempt)  # Backoff exponentiel
-                                print(f"🔄 Retry dans {wait_time} seconde...")
-                                await asyncio.sleep(wait_time)
-                                continue
-
-                            # Dernière tentative ou erreur non-retryable
-                            print("🚫 Abandon, erreur finale")
-                            raise e
-
-    async def create_planning(self, traitement_id, date_debut, mois_debut, mois_fin, redondance, date_fin,
-                              max_retries=3):
-
-        for attempt in range(max_retries):
-            async with self.pool.acquire() as conn:
+            async with self.connexion() as conn:
                 async with conn.cursor() as cur:
                     try:
                         await conn.begin()
@@ -577,33 +755,167 @@ class DatabaseManager:
                         await conn.commit()
                         planning_id = cur.lastrowid
 
-                        print(f"✅ Planning créé avec succès, ID: {planning_id}")
+                        logger.debug(f"✅ Planning créé - id={planning_id}")
+                        self.evenements.publier(PlanningCree(planning_id, traitement_id))
                         return planning_id
 
                     except Exception as e:
-                        await conn.rollback()
-                        print(f'create_planning tentative {attempt + 1}/{max_retries}: {e}')
+                        logger.error(f"❌ Erreur create_planning: {e}")
+                        await annuler(conn)
+                        raise
+
+    # ---- Plannings en mode règle (scripts/Migration_regles.sql) ----
+
+    async def create_planning_regle(self, traitement_id, date_debut, mois_debut, mois_fin, redondance, premiere, fin,
+                                    montant, axe):
+        """Crée un planning en mode règle : la ligne Planning et son segment de règle, sans aucune occurrence."""
+        async with self.connexion() as conn:
+            async with conn.cursor() as cur:
+                try:
+                    await conn.begin()
+                    await cur.execute("""
+                        INSERT INTO Planning (traitement_id, date_debut_planification, mois_debut, mois_fin, redondance, date_fin_planification, stockage)
+                        VALUES (%s, %s, %s, %s, %s, %s, 'Règle')
+                    """, (traitement_id, date_debut, mois_debut, mois_fin, redondance, fin))
+                    planning_id = cur.lastrowid
+                    await cur.execute(
+                        "INSERT INTO PlanningRegle (planning_id, debut, pas, fin, montant, axe) VALUES (%s, %s, %s, %s, %s, %s)",
+                        (planning_id, premiere, redondance, fin, montant, axe)
+                    )
+                    await conn.commit()
+                except Exception as e:
+                    logger.error(f"❌ Erreur create_planning_regle: {e}", exc_info=True)
+                    await annuler(conn)
+                    raise
 
-                        # Erreurs retryables
-                        retryable_errors = [
-                            "Record has changed",
-                            "Deadlock found",
-                            "Connection lost",
-                            "Lost connection to MySQL server",
-                            "MySQL server has gone away"
-                        ]
+        logger.info(f"✅ Planning (règle) créé - ID={planning_id}, tous les {redondance} mois à partir du {premiere}")
+        self.evenements.publier(PlanningCree(planning_id, traitement_id))
+        return planning_id
 
-                        is_retryable = any(error in str(e) for error in retryable_errors)
+    async def _occurrences_regles(self, conn, debut, fin, planning_id=None):
+        """
+        Occurrences calculées des plannings en mode règle entre `debut` et `fin`.
 
-                        if is_retryable and attempt < max_retries - 1:
-                            wait_time = 0.1 * (2 ** attempt)  # Backoff exponentiel
-                            print(f"🔄 Retry dans {wait_time} seconde...")
-                            await asyncio.sleep(wait_time)
-                            continue
+        Retourne [(segment, origine, date)] trié par date, sans les occurrences
+        déjà matérialisées (celles-ci sont lues dans PlanningDetails).
+        """
+        filtre = "AND r.planning_id = %s" if planning_id is not None else ""
+        parametres = (fin, debut - MARGE_AJUSTEMENT) + ((planning_id,) if planning_id is not None else ())
+        async with conn.cursor(curseur(SegmentRegle)) as cur:
+            await cur.execute(
+                REQUETES['occurrences_regles'].sql.format(filtre=filtre),
+                parametres
+            )
+            segments = await cur.fetchall()
+        if not segments:
+            return []
 
-                        # Dernière tentative ou erreur non-retryable
-                        print("🚫 Abandon, erreur finale")
-                        raise e
+        async with conn.cursor() as cur:
+            await cur.execute(
+                REQUETES['occurrences_materialisees'].sql,
+                (tuple({segment.planning_id for segment in segments}), debut - MARGE_AJUSTEMENT, fin)
+            )
+            materialisees = set(await cur.fetchall())
+
+        occurrences = [(segment, origine, jour)
+                       for segment in segments
+                       for origine, jour in fenetre(Regle(segment.debut, segment.pas, segment.fin), debut, fin)
+                       if (segment.planning_id, origine) not in materialisees]
+        occurrences.sort(key=lambda occurrence: occurrence[2])
+        return occurrences
+
+    async def materialiser_occurrence(self, planning_id, jour):
+        """
+        Enregistre l'occurrence calculée du `jour` (PlanningDetails + Facture) d'un planning en mode règle.
+
+        Retourne le planning_detail_id (existant si l'occurrence est déjà
+        matérialisée), None si `jour` n'est pas une occurrence de la règle.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                try:
+                    await conn.begin()
+                    # Verrou sur les segments: deux postes ne matérialisent pas la même occurrence
+                    await cur.execute(
+                        REQUETES['materialiser_occurrence_regle'].sql,
+                        (planning_id, jour)
+                    )
+                    trouvee = next(((origine, montant, axe)
+                                    for debut, pas, fin, montant, axe in await cur.fetchall()
+                                    for origine, _ in fenetre(Regle(debut, pas, fin), jour, jour)), None)
+                    if trouvee is None:
+                        await conn.commit()
+                        return None
+                    origine, montant, axe = trouvee
+
+                    await cur.execute(
+                        REQUETES['materialiser_occurrence_existante'].sql,
+                        (planning_id, origine)
+                    )
+                    existante = await cur.fetchone()
+                    if existante:
+                        await conn.commit()
+                        return existante[0]
+
+                    await cur.execute(
+                        """INSERT INTO PlanningDetails (planning_id, date_planification, statut, date_origine)
+                           VALUES (%s, %s, 'À venir', %s)""",
+                        (planning_id, jour, origine)
+                    )
+                    planning_detail_id = cur.lastrowid
+                    await cur.execute(
+                        "INSERT INTO Facture (planning_detail_id, montant, date_traitement, etat, axe) VALUES (%s, %s, %s, 'Non payé', %s)",
+                        (planning_detail_id, montant, jour, axe)
+                    )
+                    facture_id = cur.lastrowid
+                    await conn.commit()
+                except Exception as e:
+                    logger.error(f"❌ Erreur materialiser_occurrence: {e}", exc_info=True)
+                    await annuler(conn)
+                    raise
+
+        logger.info(f"✅ Occurrence du {jour} matérialisée - planning_id={planning_id}, detail_id={planning_detail_id}")
+        self.evenements.publier(DetailPlanningCree(planning_detail_id, planning_id))
+        self.evenements.publier(FactureCreee(facture_id, planning_detail_id))
+        return planning_detail_id
+
+    async def _decaler_regle(self, cur, planning_id, origine, mois):
+        """
+        Décale de `mois` (négatif = avancement) les occurrences d'un planning en mode règle à partir de `origine`.
+
+        Le segment en cours est coupé avant `origine` et prolongé par un segment
+        décalé ; seules les exceptions déjà matérialisées sont mises à jour. La
+        fin du contrat (celle du dernier segment) est conservée : les
+        occurrences repoussées au-delà ne sont plus générées.
+        """
+        # La fin du dernier segment est celle du contrat : elle ne bouge pas avec le décalage
+        await cur.execute(REQUETES['decaler_regle_fin'].sql, (planning_id,))
+        ligne = await cur.fetchone()
+        fin_contrat = ligne[0] if ligne else None
+        await cur.execute(
+            REQUETES['decaler_regle_segments'].sql,
+            (mois, fin_contrat, mois, planning_id, origine)
+        )
+        await cur.execute(
+            REQUETES['decaler_regle_en_cours'].sql,
+            (planning_id, origine, origine)
+        )
+        for regle_id, pas, fin, montant, axe in await cur.fetchall():
+            await cur.execute(REQUETES['decaler_regle_couper'].sql,
+                              (origine, regle_id))
+            if fin is not None and fin != fin_contrat:
+                fin = ajouter_mois(fin, mois)
+            await cur.execute(
+                """INSERT INTO PlanningRegle (planning_id, debut, pas, fin, montant, axe)
+                   VALUES (%s, DATE_ADD(%s, INTERVAL %s MONTH), %s, %s, %s, %s)""",
+                (planning_id, origine, mois, pas, fin, montant, axe)
+            )
+        # Ordre des mises à jour choisi pour ne pas heurter l'index unique (planning_id, date_origine)
+        ordre = 'DESC' if mois > 0 else 'ASC'
+        await cur.execute(
+            REQUETES['decaler_regle_details'].sql.format(ordre=ordre),
+            (mois, mois, planning_id, origine)
+        )
 
     async def traitement_en_cours(self, year, month):
         async with self.lock:
@@ -612,42 +924,31 @@ class DatabaseManager:
                 async with conn.cursor() as curseur:
                     try:
                         await curseur.execute(
-                            """SELECT c.nom AS nom_client,
-                                      tt.typeTraitement AS type_traitement,
-                                      pdl.statut,
-                                      pdl.date_planification,
-                                      p.planning_id,
-                                      c.axe
-                                   FROM
-                                      Client c
-                                   JOIN
-                                      Contrat co ON c.client_id = co.client_id
-                                   JOIN
-                                      Traitement t ON co.contrat_id = t.contrat_id
-                                   JOIN
-                                      TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                   JOIN
-                                      Planning p ON t.traitement_id = p.traitement_id
-                                   JOIN
-                                      PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                                   WHERE
-                                      MONTH(pdl.date_planification) = %s
-                                   AND
-                                      YEAR(pdl.date_planification) = %s
-                                   AND
-                                      pdl.statut != 'Classé sans suite'
-                                   ORDER BY
-                                      pdl.date_planification; """,
+                            REQUETES['traitement_en_cours'].sql,
                             (month,year)
                         )
                         rows = await curseur.fetchall()
-                        for nom, traitement, statut, date_str, idplanning, axe in rows:
+                        for nom, traitement, statut, date_str, iddetail, axe in rows:
                             traitements.append({
                                 "traitement": f'{traitement.partition("(")[0].strip()} pour {nom}',
                                 "date": date_str,
                                 'etat': statut,
-                                'axe': axe
+                                'axe': axe,
+                                'id': iddetail
                             })
+                        if self.stockage_regles:
+                            # Occurrences calculées: identifiées par (planning_id, origine) tant qu'elles ne sont pas matérialisées
+                            debut = datetime.date(year, month, 1)
+                            fin = (debut + datetime.timedelta(days=31)).replace(day=1) - datetime.timedelta(days=1)
+                            for segment, origine, jour in await self._occurrences_regles(conn, debut, fin):
+                                traitements.append({
+                                    "traitement": f'{segment.type_traitement.partition("(")[0].strip()} pour {segment.nom}',
+                                    "date": jour,
+                                    'etat': 'À venir',
+                                    'axe': segment.axe,
+                                    'id': (segment.planning_id, origine)
+                                })
+                            traitements.sort(key=lambda traitement: traitement['date'])
                         logger.info(f"✅ Traitements en cours récupérés - {len(traitements)} items")
                         return traitements
                     except Exception as e:
@@ -663,36 +964,8 @@ class DatabaseManager:
                     try:
                         # ✅ CORRECTION: Requête pour les traitements à venir (futurs plannings)
                         await curseur.execute(
-                            """SELECT c.nom AS nom_client,
-                                      tt.typeTraitement AS type_traitement,
-                                      pdl.statut,
-                                      MIN(pdl.date_planification) AS min_date,
-                                      p.planning_id,
-                                      c.axe
-                                   FROM
-                                      Client c
-                                   JOIN
-                                      Contrat co ON c.client_id = co.client_id
-                                   JOIN
-                                      Traitement t ON co.contrat_id = t.contrat_id
-                                   JOIN
-                                      TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                   JOIN
-                                      Planning p ON t.traitement_id = p.traitement_id
-                                   JOIN
-                                      PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                                   WHERE p.planning_id NOT IN (
-                                        SELECT DISTINCT p.planning_id
-                                        FROM Planning p
-                                        JOIN PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                                        WHERE MONTH(pdl.date_planification) = %s
-                                        AND YEAR(pdl.date_planification) = %s
-                                   )
-                                   AND pdl.date_planification >= CURDATE()
-                                   AND p.redondance != 1
-                                   AND pdl.statut != 'Classé sans suite'
-                                   GROUP BY p.planning_id
-                                   ORDER BY min_date""",
+                            REQUETES['traitement_prevision'].sql.format(
+                                regle="AND p.stockage = 'Lignes'" if self.stockage_regles else ""),
                             (month, year)
                         )
                         rows = await curseur.fetchall()
@@ -701,71 +974,140 @@ class DatabaseManager:
                                 "traitement": f'{traitement.partition("(")[0].strip()} pour {nom}',
                                 "date": date_str,
                                 'etat': statut,
-                                'axe': axe
+                                'axe': axe,
+                                'id': idplanning
                             })
+                        if self.stockage_regles:
+                            # Prochaine occurrence calculée des plannings en mode règle sans traitement ce mois-ci
+                            aujourdhui = datetime.date.today()
+                            debut = datetime.date(year, month, 1)
+                            fin = (debut + datetime.timedelta(days=31)).replace(day=1) - datetime.timedelta(days=1)
+                            ce_mois = {segment.planning_id for segment, _, _ in await self._occurrences_regles(conn, debut, fin)}
+                            prochaines = {}
+                            for segment, _, jour in await self._occurrences_regles(conn, aujourdhui, horizon(aujourdhui, 1)):
+                                if segment.pas != 1 and segment.planning_id not in ce_mois:
+                                    prochaines.setdefault(segment.planning_id, (segment, jour))
+                            for planning_id, (segment, jour) in prochaines.items():
+                                traitements.append({
+                                    "traitement": f'{segment.type_traitement.partition("(")[0].strip()} pour {segment.nom}',
+                                    "date": jour,
+                                    'etat': 'À venir',
+                                    'axe': segment.axe,
+                                    'id': planning_id
+                                })
+                            traitements.sort(key=lambda traitement: traitement['date'])
                         logger.info(f"✅ Traitements à venir récupérés - {len(traitements)} items")
                         return traitements
                     except Exception as e:
                         logger.error(f"❌ Erreur traitement_prevision: {e}", exc_info=True)
                         return []
 
-    async def create_planning_details(self, planning_id, date, statut='À venir', max_retries=3):
-        for attempt in range(max_retries + 1):
-            try:
-                async with self.pool.acquire() as conn:
-                    async with conn.cursor() as cur:
-                        try:
-                            await conn.begin()
-                            await cur.execute(
-                                "INSERT INTO PlanningDetails (planning_id, date_planification, statut) VALUES (%s, %s, %s)",
-                                (planning_id, date, statut)
-                            )
-                            await conn.commit()
-                            return cur.lastrowid
-                        except Exception as e:
-                            await conn.rollback()
+    async def get_derniere_modification(self):
+        """
+        Identifiant de la dernière entrée de JournalModifications (scripts/Migration_synchro.sql).
 
-            except Exception as e:
-                print(f"Tentative {attempt + 1} échouée pour create_planning_details: {e}")
-                await conn.rollback()
+        Retourne 0 si le journal est vide, False si la migration n'a pas été
+        appliquée, None en cas d'erreur.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(REQUETES['get_derniere_modification'].sql)
+                    (dernier,) = await cursor.fetchone()
+                    await conn.commit()  # Fin du snapshot: la prochaine lecture verra les nouvelles entrées
+                    return dernier
+                except Exception as e:
+                    if e.args and e.args[0] == 1146:  # Table inexistante
+                        logger.warning("⚠️ JournalModifications absent - synchronisation désactivée")
+                        return False
+                    logger.error(f"❌ Erreur get_derniere_modification: {e}", exc_info=True)
+                    return None
 
-                if attempt == max_retries:
-                    print(f"Échec définitif après {max_retries + 1} tentatives")
-                    raise e
+    async def get_modifications(self, depuis_id):
+        """
+        Entrées du journal postérieures à `depuis_id` : [(modification_id, nom_table, ligne_id, suppression)].
 
-                base_delay = 2 ** attempt  # 1s, 2s, 4s, 8s...
-                jitter = random.uniform(0, 0.1 * base_delay)
-                delay = base_delay + jitter
+        Retourne None en cas d'erreur.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(REQUETES['get_modifications'].sql, (depuis_id,))
+                    rows = await cursor.fetchall()
+                    await conn.commit()
+                    return [(modification_id, nom_table, ligne_id, bool(suppression))
+                            for modification_id, nom_table, ligne_id, suppression in rows]
+                except Exception as e:
+                    logger.error(f"❌ Erreur get_modifications: {e}", exc_info=True)
+                    return None
 
-                print(f"Retry dans {delay:.2f}s...")
-                await asyncio.sleep(delay)
+    async def get_planning_details_modifies(self, depuis_id):
+        """
+        Lignes de PlanningDetails journalisées après `depuis_id` (même format que traitement_en_cours).
 
-        return None
+        Une ligne modifiée plusieurs fois revient une fois par entrée du journal
+        ('modification' = identifiant de l'entrée).
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(
+                        REQUETES['get_planning_details_modifies'].sql,
+                        (depuis_id,)
+                    )
+                    rows = await cursor.fetchall()
+                    await conn.commit()
+                    details = [{
+                        "traitement": f'{traitement.partition("(")[0].strip()} pour {nom}',
+                        "date": date_str,
+                        'etat': statut,
+                        'axe': axe,
+                        'id': iddetail,
+                        'modification': modification_id
+                    } for nom, traitement, statut, date_str, iddetail, axe, modification_id in rows]
+                    logger.info(f"✅ PlanningDetails modifiés depuis #{depuis_id} - {len(details)} items")
+                    return details
+                except Exception as e:
+                    logger.error(f"❌ Erreur get_planning_details_modifies: {e}", exc_info=True)
+                    return None
+
+    @reessayer(idempotent=True)
+    async def create_planning_details(self, planning_id, date, statut='À venir', *, cle=None):
+        cle = cle if self.cles_idempotence else None
+        colonnes = "planning_id, date_planification, statut"
+        valeurs = (planning_id, date, statut)
+        if cle is not None:
+            colonnes += ", cle_idempotence"
+            valeurs += (cle,)
+
+        async with self.connexion() as conn:
+            async with conn.cursor() as cur:
+                try:
+                    await conn.begin()
+                    await cur.execute(
+                        f"INSERT INTO PlanningDetails ({colonnes}) VALUES ({', '.join(['%s'] * len(valeurs))})",
+                        valeurs
+                    )
+                    await conn.commit()
+                    self.evenements.publier(DetailPlanningCree(cur.lastrowid, planning_id))
+                    return cur.lastrowid
+                except Exception as e:
+                    detail_id = await self._deja_insere(conn, cur, e, 'PlanningDetails', 'planning_detail_id', cle)
+                    if detail_id is not None:
+                        self.evenements.publier(DetailPlanningCree(detail_id, planning_id))
+                        return detail_id
+                    logger.error(f"❌ Erreur create_planning_details: {e}")
+                    await annuler(conn)
+                    raise
     
     async def get_all_planning(self, limit=5000):
         """Récupère tous les plannings avec LIMIT et avec logging."""
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(curseur(LignePlanning)) as cursor:
                 try:
                     logger.info(f"📅 Récupération tous plannings (limite: {limit})")
                     await cursor.execute(
-                        f"""SELECT c.nom AS nom_client,
-                                  tt.typeTraitement AS type_traitement,
-                                  p.redondance ,
-                                  p.planning_id
-                           FROM
-                              Client c
-                           JOIN
-                              Contrat co ON c.client_id = co.client_id
-                           JOIN
-                              Traitement t ON co.contrat_id = t.contrat_id
-                           JOIN
-                              Planning p ON t.traitement_id = p.traitement_id
-                           JOIN
-                              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                           ORDER BY
-                              c.nom ASC
-                           LIMIT {int(limit)}"""
+                        REQUETES['get_all_planning'].sql, (int(limit),)
                     )
                     result = await cursor.fetchall()
                     logger.info(f"✅ {len(result)} plannings récupérés")
@@ -780,13 +1122,16 @@ class DatabaseManager:
             async with conn.cursor() as cursor:
                 try:
                     logger.debug(f"🔍 Récupération détails planning_id={planning_id}")
-                    await cursor.execute("""SELECT
-                                                date_planification, statut
-                                            FROM
-                                                PlanningDetails
-                                            WHERE
-                                                planning_id = %s""", (planning_id,))
+                    await cursor.execute(REQUETES['get_details'].sql, (planning_id,))
                     result = await cursor.fetchall()
+                    if self.stockage_regles:
+                        # Planning en mode règle: occurrences calculées jusqu'à l'horizon, fusionnées aux exceptions
+                        calculees = await self._occurrences_regles(conn, datetime.date.min + MARGE_AJUSTEMENT,
+                                                                   horizon(datetime.date.today()), planning_id)
+                        if calculees:
+                            result = sorted(list(result) + [(jour, 'À venir') for _, _, jour in calculees],
+                                            key=lambda detail: detail[0])
+                        await conn.commit()
                     logger.debug(f"✅ {len(result)} détails trouvés")
                     return result
                 except Exception as e:
@@ -794,102 +1139,119 @@ class DatabaseManager:
                     return []
 
 
-    async def get_info_planning(self, planning_id, date, max_retries=3):
-        for attempt in range(max_retries + 1):
-            try:
-                async with self.pool.acquire() as conn:
-                    async with conn.cursor() as cursor:
-                        try:
-                            await cursor.execute("""SELECT c.nom AS nom_client,
-                                                      tt.typeTraitement AS type_traitement,
-                                                      p.duree_traitement,
-                                                      co.date_debut,
-                                                      co.date_fin,
-                                                      c.client_id,
-                                                      f.facture_id,
-                                                      p.planning_id,
-                                                      pdl.planning_detail_id,
-                                                      pdl.date_planification
-
-                                                FROM
-                                                    Client c
-                                                JOIN
-                                                    Contrat co ON c.client_id = co.client_id
-                                                JOIN
-                                                    Traitement t ON co.contrat_id = t.contrat_id
-                                                JOIN
-                                                    Planning p ON t.traitement_id = p.traitement_id
-                                                JOIN
-                                                    TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                                JOIN
-                                                    PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                                                JOIN
-                                                    Facture f ON pdl.planning_detail_id = f.planning_detail_id
-                                                WHERE
-                                                    p.planning_id = %s AND pdl.date_planification = %s""",
-                                                 (planning_id, date))
-                            resultat = await cursor.fetchone()
-                            return resultat
-                        except Exception as e:
-                            print('get_info', e)
-
-            except Exception as e:
-                print(f'tentive {attempt +1 } échouée pour get info planning: {e}')
-
-                await conn.rollback()
-                if attempt == max_retries:
-                    print(f"Échec définitif après {max_retries + 1} tentatives")
-                raise e
+    async def get_info_planning(self, planning_id, date):
+        """Détail (client, facture...) d'une date de planning ; None si introuvable ou en erreur."""
+        try:
+            resultat = await self._lire_info_planning('info_planning', (planning_id, date))
+        except Exception as e:
+            logger.error(f"❌ Erreur get_info_planning: {e}", exc_info=True)
+            return None
+        if resultat is None and self.stockage_regles:
+            # Occurrence calculée d'un planning en mode règle: on la matérialise avant l'action
+            jour = datetime.date.fromisoformat(str(date))
+            planning_detail_id = await self.materialiser_occurrence(planning_id, jour)
+            if planning_detail_id:
+                # Relecture unique par identifiant : la ligne vient d'être créée (ou existait déjà)
+                try:
+                    resultat = await self._lire_info_planning('info_planning_detail', (planning_detail_id,))
+                except Exception as e:
+                    logger.error(f"❌ Erreur get_info_planning: {e}", exc_info=True)
+                    return None
+        return resultat
 
-                base_delay = 2 ** attempt
-                jitter = random.uniform(0, 0.1 * base_delay)
-                delay = base_delay + jitter
+    @reessayer()
+    async def _lire_info_planning(self, requete, parametres):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(curseur(DetailPlanning)) as cursor:
+                try:
+                    await cursor.execute(REQUETES[requete].sql, parametres)
+                    resultat = await cursor.fetchone()
+                    await conn.commit()  # Termine la lecture (nouveau snapshot au prochain appel)
+                except Exception as e:
+                    logger.error(f"❌ Erreur get_info_planning: {e}")
+                    await annuler(conn)
+                    raise
+        return resultat
 
-                print(f"Retry dans {delay:.2f}s...")
-                await asyncio.sleep(delay)
+    async def _decaler_dates(self, cur, planning_id, depuis, mois):
+        """
+        Décale de `mois` (négatif = avancement) les dates du planning à partir du `depuis` inclus.
+
+        Ce sont les dates brutes de la règle (départ + n mois, avant le report
+        des dimanches et jours fériés) qui sont décalées, puis ajustées de
+        nouveau avec les mêmes règles qu'à la création (voir tester_date) :
+        une date reportée au lundi ne reste pas décalée d'un jour. Les dates
+        sont appliquées par un seul UPDATE ... CASE.
+        Retourne [(planning_detail_id, avant, après)].
+        """
+        await cur.execute(REQUETES['depart_planning'].sql, (planning_id,))
+        debut, premiere = await cur.fetchone() or (None, None)
+        await cur.execute(
+            REQUETES['decaler_dates'].sql,
+            (planning_id, depuis)
+        )
+        lignes = await cur.fetchall()
+        if not lignes:
+            return []
 
-        return None
+        depart = depart_brut(debut, premiere)
+        apres = ajuster_dates([ajouter_mois(depart, rang(depart, jour) + mois) for _, jour in lignes])
+        changements = [(detail_id, avant, nouvelle) for (detail_id, avant), nouvelle in zip(lignes, apres)]
+        cas = " ".join(["WHEN %s THEN %s"] * len(changements))
+        await cur.execute(
+            f"""UPDATE PlanningDetails
+                SET date_planification = CASE planning_detail_id {cas} END
+                WHERE planning_detail_id IN %s""",
+            [valeur for detail_id, _, nouvelle in changements for valeur in (detail_id, nouvelle)]
+            + [tuple(detail_id for detail_id, _, _ in changements)]
+        )
+        return changements
+
+    async def modifier_date_signalement(self, planning_id, planning_detail_id, option, interval):
+        """
+        Décale (option 'décalage') ou avance de `interval` mois ce traitement et tous les suivants du planning.
 
-    async def modifier_date_signalement(self,planning_id, planning_detail_id, option, interval):
+        Une seule transaction ; retourne [(planning_detail_id, avant, après)]
+        pour l'affichage ([] en mode règle, où seul le segment est coupé).
+        En cas d'erreur, la transaction est annulée et l'erreur remonte.
+        """
+        mois = interval if option == 'décalage' else -interval
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
                 try:
-                    avancement = """UPDATE PlanningDetails 
-                                    SET 
-                                        date_planification =DATE_SUB(date_planification, INTERVAL %s MONTH)
-                                    WHERE
-                                        planning_id = %s
-                                    AND
-                                        planning_detail_id >= %s"""
-
-                    décalage = """UPDATE PlanningDetails 
-                                  SET 
-                                     date_planification =DATE_ADD(date_planification, INTERVAL %s MONTH)
-                                  WHERE
-                                     planning_id = %s
-                                  AND
-                                     planning_detail_id >= %s"""
-
-                    requete = décalage if option == 'décalage' else avancement
                     await conn.begin()
-                    await cur.execute(requete, (interval, planning_id, planning_detail_id))
+                    origine = None
+                    if self.stockage_regles:
+                        await cur.execute(REQUETES['date_origine'].sql,
+                                          (planning_detail_id,))
+                        (origine,) = await cur.fetchone() or (None,)
+                    if origine is not None:
+                        # Planning en mode règle: le segment est coupé, pas de mise à jour de chaque occurrence
+                        await self._decaler_regle(cur, planning_id, origine, mois)
+                        changements = []
+                    else:
+                        await cur.execute(REQUETES['date_planification'].sql,
+                                          (planning_detail_id,))
+                        (depuis,) = await cur.fetchone()
+                        changements = await self._decaler_dates(cur, planning_id, depuis, mois)
                     await conn.commit()
+                    logger.info(f"✅ Planning {planning_id}: {len(changements)} date(s) décalée(s) de {mois} mois")
+                    self.evenements.publier(PlanningDecale(planning_id, planning_detail_id, option, interval))
+                    return changements
 
                 except Exception as e:
-                    await conn.rollback()
-                    print('Changement de date', e)
+                    await annuler(conn)
+                    logger.error(f"❌ Erreur modifier_date_signalement: {e}", exc_info=True)
+                    raise
 
     async def modifier_date(self, planning_detail_id, new_date):
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
                 try:
                     await conn.begin()
-                    await cur.execute('''UPDATE PlanningDetails
-                                   SET
-                                      date_planification = %s
-                                   WHERE
-                                      planning_detail_id = %s''', (new_date, planning_detail_id))
+                    await cur.execute(REQUETES['modifier_date'].sql, (new_date, planning_detail_id))
                     await conn.commit()
+                    self.evenements.publier(DatePlanifieeModifiee(planning_detail_id, new_date))
                 except Exception as e:
                     await conn.rollback()
 
@@ -905,6 +1267,7 @@ class DatabaseManager:
                     (client, planning_details, facture, contenu, probleme, action))
                     await conn.commit()
                     logger.info(f"✅ Remarque créée - client_id={client}")
+                    self.evenements.publier(RemarqueCreee(client, planning_details))
                 except Exception as e:
                     await conn.rollback()
                     logger.error(f"❌ Erreur création remarque: {e}", exc_info=True)
@@ -916,34 +1279,7 @@ class DatabaseManager:
                 try:
                     logger.info(f"📜 Récupération historique remarques - planning_id={planning_id}")
                     await cur.execute(
-                        f""" SELECT
-                                pdl.date_planification AS Date, 
-                                COALESCE(NULLIF(r.contenu, ''), 'Aucune remarque') AS Remarque, 
-                                COALESCE(sa.motif, 'Aucun') AS Avancement, 
-                                COALESCE(sd.motif, 'Aucun') AS Décalage, 
-                                COALESCE(NULLIF(r.issue, ''), 'Aucun problème') AS probleme, 
-                                COALESCE(NULLIF(r.action, ''), 'Aucune action') AS action
-                            FROM
-                               Client c
-                            JOIN
-                               Contrat co ON c.client_id = co.client_id
-                            JOIN
-                               Traitement t ON co.contrat_id = t.contrat_id
-                            JOIN
-                               TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                            JOIN
-                               Planning p ON t.traitement_id = p.traitement_id
-                            JOIN
-                               PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                            LEFT JOIN
-                               Remarque r ON pdl.planning_detail_id = r.planning_detail_id
-                            LEFT JOIN
-                                Signalement sa ON r.planning_detail_id = sa.planning_detail_id AND sa.type = 'Avancement'
-                            LEFT JOIN
-                                Signalement sd ON r.planning_detail_id = sd.planning_detail_id AND sd.type = 'Décalage'
-                            WHERE
-                                p.planning_id = %s
-                            LIMIT {int(limit)};""", (planning_id,))
+                        REQUETES['get_historique_remarque'].sql, (planning_id, int(limit)))
                     result = await cur.fetchall()
                     logger.info(f"✅ {len(result)} remarques récupérées")
                     return result
@@ -958,15 +1294,10 @@ class DatabaseManager:
                 try:
                     await conn.begin()
                     await cur.execute(
-                        """ UPDATE Facture 
-                            SET reference_facture = %s,
-                                etablissement_payeur = %s, 
-                                date_cheque = %s, 
-                                numero_cheque = %s, 
-                                etat = %s, 
-                                mode = %s 
-                            WHERE facture_id = %s ;""", (reference, etablissement, date, num_cheque, 'Payé', payement, facture))
+                        REQUETES['update_etat_facture'].sql,
+                        (reference, etablissement, date, num_cheque, 'Payé', payement, facture))
                     await conn.commit()
+                    self.evenements.publier(FacturePayee(facture))
                 except Exception as e:
                     await conn.rollback()
                     logger.error(f"❌ Erreur mise à jour facture: {e}", exc_info=True)
@@ -979,7 +1310,7 @@ class DatabaseManager:
                     await conn.begin()
                     # ✅ CORRECTION: Mettre à jour le statut
                     await cur.execute(
-                        "UPDATE PlanningDetails SET statut = %s WHERE planning_detail_id = %s",
+                        REQUETES['update_etat_planning'].sql,
                         ('Effectué', details_id)
                     )
                     # ✅ CORRECTION: Vérifier que la mise à jour s'est bien faite
@@ -991,6 +1322,7 @@ class DatabaseManager:
                     
                     await conn.commit()
                     logger.info(f"✅ Planning detail {details_id} marqué comme 'Effectué'")
+                    self.evenements.publier(TraitementEffectue(details_id))
                     return True
                 except Exception as e:
                     await conn.rollback()
@@ -1003,7 +1335,7 @@ class DatabaseManager:
             async with conn.cursor() as cur:
                 try:
                     await cur.execute(
-                        "SELECT statut FROM PlanningDetails WHERE planning_detail_id = %s",
+                        REQUETES['verify_planning_status'].sql,
                         (details_id,)
                     )
                     result = await cur.fetchone()
@@ -1026,6 +1358,7 @@ class DatabaseManager:
                     await cursor.execute("""INSERT INTO Signalement (planning_detail_id, motif, type) VALUES (%s, %s, %s)""",
                                    (planning_detail, motif, option))
                     await conn.commit()
+                    self.evenements.publier(SignalementCree(planning_detail, option))
             except Exception as e:
                 await conn.rollback()
                 logger.error(f"❌ Erreur création signalement: {e}", exc_info=True)
@@ -1036,31 +1369,7 @@ class DatabaseManager:
             async with conn.cursor() as cursor:
                 try:
                     logger.info(f"📊 Récupération historique client - nom={nom}")
-                    await cursor.execute(f""" SELECT c.nom,
-                                                co.duree,
-                                                tt.typeTraitement,
-                                                count(r.remarque_id) as nb_remarques,
-                                                p.planning_id
-                                             FROM
-                                                Client c
-                                             JOIN
-                                                Contrat co ON c.client_id = co.client_id
-                                             JOIN
-                                                Traitement t ON co.contrat_id = t.contrat_id
-                                             JOIN
-                                                TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                             JOIN
-                                                Planning p ON t.traitement_id = p.traitement_id
-                                             JOIN
-                                                PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                                             LEFT JOIN
-                                                Remarque r ON pdl.planning_detail_id = r.planning_detail_id
-                                             WHERE
-                                                c.nom = %s
-                                             GROUP BY
-                                                c.client_id, c.nom, co.duree, tt.typeTraitement, p.planning_id
-                                             LIMIT {int(limit)}
-                                                """, (nom,))
+                    await cursor.execute(REQUETES['get_historic_par_client'].sql, (nom, int(limit)))
                     result = await cursor.fetchall()
                     logger.info(f"✅ {len(result)} résultats trouvés pour client {nom}")
                     return result
@@ -1074,31 +1383,7 @@ class DatabaseManager:
             async with conn.cursor() as cursor:
                 try:
                     logger.info(f"📈 Récupération historique par catégorie - {categorie}")
-                    await cursor.execute(f""" SELECT c.nom,
-                                                co.duree,
-                                                tt.typeTraitement,
-                                                count(r.remarque_id) as nb_remarques,
-                                                p.planning_id
-                                             FROM
-                                                Client c
-                                             JOIN
-                                                Contrat co ON c.client_id = co.client_id
-                                             JOIN
-                                                Traitement t ON co.contrat_id = t.contrat_id
-                                             JOIN
-                                                TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                             JOIN
-                                                Planning p ON t.traitement_id = p.traitement_id
-                                             JOIN
-                                                PlanningDetails pdl ON p.planning_id = pdl.planning_id
-                                             LEFT JOIN
-                                                Remarque r ON pdl.planning_detail_id = r.planning_detail_id
-                                             WHERE
-                                                tt.categorieTraitement = %s
-                                             GROUP BY
-                                                c.client_id, c.nom, co.duree, tt.typeTraitement, p.planning_id
-                                             LIMIT {int(limit)}
-                                                """, (categorie,))
+                    await cursor.execute(REQUETES['get_historic'].sql, (categorie, int(limit)))
                     result = await cursor.fetchall()
                     logger.info(f"✅ {len(result)} résultats trouvés pour catégorie {categorie}")
                     return result
@@ -1108,42 +1393,10 @@ class DatabaseManager:
                     
     async def get_current_contrat(self, client, date, traitement):
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(curseur(ClientCourant)) as cursor:
                 try:
                     logger.debug(f"🔍 get_current_contrat - {client}, {date}, {traitement}")
-                    await cursor.execute("""SELECT c.client_id AS id,
-                                  c.nom AS nom_client,
-                                  c.prenom AS prenom_client,
-                                  c.categorie AS categorie,
-                                  co.date_contrat,
-                                  tt.typeTraitement AS type_traitement,
-                                  co.duree AS duree_contrat,
-                                  co.date_debut AS debut_contrat,
-                                  co.date_fin AS fin_contrat,
-                                  c.email,
-                                  c.adresse,
-                                  c.axe,
-                                  c.telephone,
-                                  p.planning_id,
-                                  f.facture_id,
-                                  c.nif,
-                                  c.stat
-                           FROM
-                              Client c
-                           JOIN
-                              Contrat co ON c.client_id = co.client_id
-                           JOIN
-                              Traitement t ON co.contrat_id = t.contrat_id
-                           JOIN
-                              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                           JOIN
-                               Planning p ON t.traitement_id = p.traitement_id
-                           JOIN
-                               PlanningDetails pld ON p.planning_id = pld.planning_id
-                           JOIN
-                               Facture f ON pld.planning_detail_id = f.planning_detail_id
-                           WHERE
-                              c.nom = %s AND co.date_contrat = %s AND tt.typeTraitement = %s; """, (client, date, traitement))
+                    await cursor.execute(REQUETES['get_current_contrat'].sql, (client, date, traitement))
                     resultat = await cursor.fetchone()
                     if resultat:
                         logger.info(f"✅ Contrat trouvé - {resultat[1]}")
@@ -1158,13 +1411,13 @@ class DatabaseManager:
                 try:
                     logger.info(f"📝 Suppression client - id={id_contrat}")
                     await conn.begin() #commencer une transaction
-                    await cursor.execute("""DELETE FROM Client where client_id = %s""", (id_contrat,))
+                    await cursor.execute(REQUETES['delete_client'].sql, (id_contrat,))
                     await conn.commit()
                     logger.info(f"✅ Client supprimé - id={id_contrat}")
+                    self.evenements.publier(ClientSupprime(id_contrat))
                 except Exception as e:
                     await conn.rollback() #rollback en cas d'erreur
                     logger.error(f"❌ Erreur delete_client: {e}", exc_info=True)
-                    print("Delete",e)
 
     async def get_latest_contract_date_for_client(self, client_id):
         """Récupère la date du contrat ACTIF/PLUS RÉCENT du client par client_id."""
@@ -1172,13 +1425,7 @@ class DatabaseManager:
             async with conn.cursor() as cursor:
                 try:
                     logger.debug(f"🔍 Recherche dernier contrat pour client_id: {client_id}")
-                    await cursor.execute("""
-                        SELECT co.date_contrat
-                        FROM Contrat co
-                        WHERE co.client_id = %s
-                        ORDER BY co.date_contrat DESC
-                        LIMIT 1
-                    """, (client_id,))
+                    await cursor.execute(REQUETES['get_latest_contract_date_for_client'].sql, (client_id,))
                     resultat = await cursor.fetchone()
                     if resultat:
                         logger.debug(f"✅ Date contrat trouvée: {resultat[0]}")
@@ -1193,41 +1440,13 @@ class DatabaseManager:
     async def get_current_client(self, client_name, date):
         """Récupère les infos client avec tous les JOINs nécessaires par nom du client et date de contrat."""
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(curseur(ClientCourant)) as cursor:
                 try:
                     logger.debug(f"🔍 Récupération client: {client_name}, date: {date}")
                     
                     # ✅ Requête simplifiée: juste Client + Contrat + TypeTraitement (si existe)
                     # Sans les Planning/PlanningDetails/Facture qui causent des NULL
-                    await cursor.execute("""SELECT 
-                                  c.client_id AS id,
-                                  c.nom AS nom_client,
-                                  c.prenom AS prenom_client,
-                                  c.categorie AS categorie,
-                                  co.date_contrat,
-                                  COALESCE(tt.typeTraitement, 'Non défini') AS type_traitement,
-                                  co.duree AS duree_contrat,
-                                  co.date_debut AS debut_contrat,
-                                  co.date_fin AS fin_contrat,
-                                  c.email,
-                                  c.adresse,
-                                  c.axe,
-                                  c.telephone,
-                                  NULL AS planning_id,
-                                  NULL AS facture_id,
-                                  c.nif,
-                                  c.stat
-                           FROM
-                              Client c
-                           JOIN
-                              Contrat co ON c.client_id = co.client_id
-                           LEFT JOIN
-                              Traitement t ON co.contrat_id = t.contrat_id
-                           LEFT JOIN
-                              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                           WHERE
-                              c.nom = %s AND co.date_contrat = %s
-                           LIMIT 1; """, (client_name, date))
+                    await cursor.execute(REQUETES['get_current_client'].sql, (client_name, date))
                     resultat = await cursor.fetchone()
                     if resultat:
                         logger.debug(f"✅ Client trouvé: {resultat[1]}")
@@ -1240,37 +1459,15 @@ class DatabaseManager:
                     
     async def get_client(self):
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(curseur(LigneContrat)) as cursor:
                 try:
                     await cursor.execute(
-                        """SELECT DISTINCT c.nom ,
-                                  co.date_contrat,
-                                  tt.typeTraitement,
-                                  GROUP_CONCAT(DISTINCT p.redondance),
-                                  co.date_debut ,
-                                  co.date_fin ,
-                                  c.categorie ,
-                                  count(t.traitement_id),
-                                  c.client_id
-                           FROM
-                              Client c
-                           JOIN
-                              Contrat co ON c.client_id = co.client_id
-                           JOIN
-                              Traitement t ON co.contrat_id = t.contrat_id
-                           JOIN
-                              TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                           JOIN
-                              Planning p ON t.traitement_id = p.traitement_id
-                           GROUP BY
-                              c.client_id
-                           ORDER BY
-                              c.nom ASC;"""
+                        REQUETES['get_client'].sql
                     )
                     result = await cursor.fetchall()
                     return result
                 except Exception as e:
-                    print(e)
+                    logger.error(f"❌ Erreur get_client: {e}")
                     
     async def traitement_par_client(self, nom_client_ou_id):
         """Récupère tous les traitements d'un client (par nom ou ID)"""
@@ -1281,50 +1478,12 @@ class DatabaseManager:
                     if isinstance(nom_client_ou_id, str):
                         # Si c'est un string, chercher par nom
                         logger.debug(f"🔍 Traitement par client - nom='{nom_client_ou_id}'")
-                        sql = """SELECT c.nom AS nom_client,
-                                        co.date_contrat,
-                                        tt.typeTraitement AS type_traitement,
-                                        co.duree_contrat AS duree_contrat,
-                                        co.date_debut AS debut_contrat,
-                                        co.date_fin AS fin_contrat,
-                                        c.categorie AS categorie,
-                                        p.redondance
-                                 FROM
-                                    Client c
-                                 JOIN
-                                    Contrat co ON c.client_id = co.client_id
-                                 JOIN
-                                    Traitement t ON co.contrat_id = t.contrat_id
-                                 JOIN
-                                    TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                 JOIN
-                                    Planning p ON t.traitement_id = p.traitement_id
-                                 WHERE
-                                    c.nom = %s;"""
+                        sql = REQUETES['traitement_par_client_nom'].sql
                         param = nom_client_ou_id
                     else:
                         # Si c'est un nombre, chercher par ID
                         logger.debug(f"🔍 Traitement par client - client_id={nom_client_ou_id}")
-                        sql = """SELECT c.nom AS nom_client,
-                                        co.date_contrat,
-                                        tt.typeTraitement AS type_traitement,
-                                        co.duree_contrat AS duree_contrat,
-                                        co.date_debut AS debut_contrat,
-                                        co.date_fin AS fin_contrat,
-                                        c.categorie AS categorie,
-                                        p.redondance
-                                 FROM
-                                    Client c
-                                 JOIN
-                                    Contrat co ON c.client_id = co.client_id
-                                 JOIN
-                                    Traitement t ON co.contrat_id = t.contrat_id
-                                 JOIN
-                                    TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                 JOIN
-                                    Planning p ON t.traitement_id = p.traitement_id
-                                 WHERE
-                                    c.client_id = %s;"""
+                        sql = REQUETES['traitement_par_client_id'].sql
                         param = nom_client_ou_id
                     
                     await cursor.execute(sql, (param,))
@@ -1335,13 +1494,10 @@ class DatabaseManager:
                     logger.error(f"❌ Erreur traitement_par_client: {e}", exc_info=True)
                     return []
 
-    import asyncio
-    import random
-    from typing import Optional
-
-    async def create_facture(self, planning_detail_id, montant, date, axe, etat='Non payé', max_retries=3):
+    @reessayer(idempotent=True)
+    async def create_facture(self, planning_detail_id, montant, date, axe, etat='Non payé', *, cle=None):
         """
-        Crée une facture avec retry automatique et backoff exponentiel
+        Crée une facture (réessais gérés par @reessayer)
 
         Args:
             planning_detail_id: ID du détail de planning
@@ -1349,55 +1505,258 @@ class DatabaseManager:
             date: Date de traitement
             axe: Axe de la facture
             etat: État de la facture (défaut: 'Non payé')
-            max_retries: Nombre maximum de tentatives (défaut: 3)
+            cle: Clé d'idempotence (générée si absente) : rejouer un appel
+                 avec la même clé renvoie la facture déjà créée
 
         Returns:
-            ID de la facture créée ou None en cas d'échec
+            ID de la facture créée
         """
         logger.info(f"📝 Création facture - detail_id={planning_detail_id}, montant={montant}, axe={axe}")
-        
-        for attempt in range(max_retries + 1):
-            try:
-                async with self.lock:
-                    async with self.pool.acquire() as conn:
-                        async with conn.cursor() as cur:
-                            await conn.begin()
-                            await cur.execute(
-                                "INSERT INTO Facture (planning_detail_id, montant, date_traitement, etat, axe) VALUES (%s, %s, %s, %s, %s)",
-                                (planning_detail_id, montant, date, etat, axe)
-                            )
-                            await conn.commit()
-                            facture_id = cur.lastrowid
-                            logger.info(f"✅ Facture créée - ID={facture_id}")
+        cle = cle if self.cles_idempotence else None
+        colonnes = "planning_detail_id, montant, date_traitement, etat, axe"
+        valeurs = (planning_detail_id, montant, date, etat, axe)
+        if cle is not None:
+            colonnes += ", cle_idempotence"
+            valeurs += (cle,)
+
+        async with self.lock:
+            async with self.connexion() as conn:
+                async with conn.cursor() as cur:
+                    try:
+                        await conn.begin()
+                        await cur.execute(
+                            f"INSERT INTO Facture ({colonnes}) VALUES ({', '.join(['%s'] * len(valeurs))})",
+                            valeurs
+                        )
+                        await conn.commit()
+                        facture_id = cur.lastrowid
+                        logger.info(f"✅ Facture créée - ID={facture_id}")
+                        self.evenements.publier(FactureCreee(facture_id, planning_detail_id))
+                        return facture_id
+                    except Exception as e:
+                        facture_id = await self._deja_insere(conn, cur, e, 'Facture', 'facture_id', cle)
+                        if facture_id is not None:
+                            self.evenements.publier(FactureCreee(facture_id, planning_detail_id))
                             return facture_id
+                        logger.warning(f"⚠️  create_facture échoué pour detail_id={planning_detail_id}: {e}")
+                        await annuler(conn)
+                        raise
 
-            except Exception as e:
-                logger.warning(f"⚠️  Tentative {attempt + 1} échouée pour create_facture: {e}")
-                await conn.rollback()
+    async def un_jour(self, contrat_id):
+        async with self.connexion() as conn:
+            async with conn.cursor() as cur:
+                await conn.begin()
+                await cur.execute(
+                    REQUETES['un_jour'].sql,
+                    (contrat_id, ))
+                await conn.commit()
 
-                # Si c'est la dernière tentative, on lève l'exception
-                if attempt == max_retries:
-                    logger.error(f"❌ Échec définitif après {max_retries + 1} tentatives pour facture detail_id={planning_detail_id}", exc_info=True)
-                    raise e
+    async def create_full_contract(self, donnees):
+        """
+        Crée client, contrat, traitements, plannings, dates et factures en un seul appel.
 
-                # Calcul du délai avec backoff exponentiel + jitter
-                base_delay = 2 ** attempt  # 1s, 2s, 4s, 8s...
-                jitter = random.uniform(0, 0.1 * base_delay)  # Ajoute un peu d'aléatoire
-                delay = base_delay + jitter
+        `donnees` suit le format JSON décrit dans scripts/Migration_contrat.sql
+        (un traitement peut porter une clé 'regle' {'premiere', 'fin'} au lieu de
+        'dates' en mode règle). Retourne {'client_id', 'contrat_id',
+        'traitements': [{'traitement_id', 'planning_id'}, ...]}.
 
-                logger.debug(f"Retry dans {delay:.2f}s...")
-                await asyncio.sleep(delay)
+        Un aller-retour via la procédure creer_contrat_complet ; si elle est
+        absente (ou en mode règle), mêmes insertions dans une unité de travail.
+        """
+        if self._procedure_contrat is not False and not any(t.get('regle') for t in donnees['traitements']):
+            try:
+                async with self.pool.acquire() as conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("CALL creer_contrat_complet(%s)", (json.dumps(donnees, default=str),))
+                        client_id, contrat_id, traitements = await cur.fetchone()
+                        while await cur.nextset():
+                            pass
+                        await conn.commit()
+                self._procedure_contrat = True
+            except Exception as e:
+                if not (e.args and e.args[0] == 1305):  # 1305: procédure inexistante
+                    logger.error(f"❌ Erreur create_full_contract: {e}", exc_info=True)
+                    raise
+                logger.warning("⚠️ Procédure creer_contrat_complet absente - création par étapes")
+                self._procedure_contrat = False
+            else:
+                resultat = {'client_id': client_id, 'contrat_id': contrat_id, 'traitements': json.loads(traitements)}
+                logger.info(f"✅ Contrat complet créé - contrat_id={contrat_id}, {len(resultat['traitements'])} traitement(s)")
+                self.evenements.publier(ClientCree(client_id))
+                self.evenements.publier(ContratCree(contrat_id, client_id))
+                for ids in resultat['traitements']:
+                    self.evenements.publier(TraitementCree(ids['traitement_id'], contrat_id))
+                    self.evenements.publier(PlanningCree(ids['planning_id'], ids['traitement_id']))
+                self.evenements.publier(PlanningsEtendus(tuple(ids['planning_id'] for ids in resultat['traitements']),
+                                                         sum(len(t['dates']) for t in donnees['traitements'])))
+                return resultat
+
+        return await self._creer_contrat_par_etapes(donnees)
+
+    async def _creer_contrat_par_etapes(self, donnees):
+        """Repli de create_full_contract : les méthodes unitaires enchaînées dans une unité de travail."""
+        client, contrat = donnees['client'], donnees['contrat']
+        async with self.unite_de_travail():
+            client_id = await self.create_client(client['nom'], client['prenom'], client['email'], client['telephone'],
+                                                 client['adresse'], client['date_ajout'], client['categorie'],
+                                                 client['axe'], client['nif'], client['stat'])
+            contrat_id = await self.create_contrat(client_id, contrat['reference'], contrat['date_contrat'],
+                                                   contrat['date_debut'], contrat['date_fin'], contrat['duree_contrat'],
+                                                   contrat['duree'], contrat['categorie'])
+            traitements = []
+            for traitement in donnees['traitements']:
+                type_id = await self.typetraitement(traitement['categorie'], traitement['type'])
+                traitement_id = await self.creation_traitement(contrat_id, type_id)
+                planning = traitement['planning']
+                if traitement.get('regle'):
+                    planning_id = await self.create_planning_regle(
+                        traitement_id, planning['date_debut'], planning['mois_debut'], planning['mois_fin'],
+                        planning['redondance'], traitement['regle']['premiere'], traitement['regle']['fin'],
+                        traitement['montant'], traitement['axe'])
+                else:
+                    planning_id = await self.create_planning(
+                        traitement_id, planning['date_debut'], planning['mois_debut'], planning['mois_fin'],
+                        planning['redondance'], planning['date_fin'])
+                    for jour in traitement['dates']:
+                        detail_id = await self.create_planning_details(planning_id, jour)
+                        await self.create_facture(detail_id, traitement['montant'], jour, traitement['axe'])
+                traitements.append({'traitement_id': traitement_id, 'planning_id': planning_id})
+
+        return {'client_id': client_id, 'contrat_id': contrat_id, 'traitements': traitements}
+
+    async def etendre_plannings_ouverts(self, avant, jusqua):
+        """
+        Prolonge les plannings des contrats actifs à durée indéterminée.
 
-        return None
+        Sélectionne les plannings dont la dernière date est antérieure à `avant`,
+        reprend leur règle après cette dernière date jusqu'à `jusqua` (depuis la
+        date brute de départ du planning, en gardant les décalages déjà faits)
+        et insère en lot les nouvelles dates puis leurs factures (montant et axe
+        de la dernière facture du planning), en une seule transaction.
 
-    async def un_jour(self, contrat_id):
+        Idempotent : seules les dates postérieures à la dernière date existante
+        sont insérées, et GET_LOCK empêche deux postes de lancer l'extension en
+        même temps. Retourne {planning_id: nombre de dates ajoutées}.
+        """
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
-                await conn.begin()
-                await cur.execute(
-                    "UPDATE Contrat SET duree_contrat = 1 WHERE contrat_id = %s",
-                    (contrat_id, ))
-                await conn.commit()
+                await cur.execute("SELECT GET_LOCK('planificator_horizon', 0)")
+                (verrou,) = await cur.fetchone()
+                if not verrou:
+                    await conn.commit()
+                    logger.info("⏭️ Extension des plannings déjà en cours sur un autre poste")
+                    return {}
+                try:
+                    await conn.begin()
+                    lecture = await conn.cursor(curseur(PlanningAEtendre))
+                    await lecture.execute(
+                        REQUETES['plannings_a_etendre'].sql.format(
+                            regle="AND p.stockage = 'Lignes'" if self.stockage_regles else ""),
+                        (avant,)
+                    )
+                    plannings = {ligne.planning_id: ligne for ligne in await lecture.fetchall()}
+                    await lecture.close()
+                    if not plannings:
+                        await conn.commit()
+                        return {}
+
+                    regles = {}
+                    for pid, p in plannings.items():
+                        depart = depart_brut(p.debut, p.premiere)
+                        regles[pid] = Regle(depart, p.redondance, decalage=rang(depart, p.derniere) + p.redondance)
+                    dates = developper_lot(regles, jusqua)
+                    nouvelles = {pid: [jour for jour in dates[pid] if jour > plannings[pid].derniere]
+                                 for pid in plannings}
+                    nouvelles = {pid: jours for pid, jours in nouvelles.items() if jours}
+                    if not nouvelles:
+                        await conn.commit()
+                        return {}
+
+                    # Que des %s dans VALUES : executemany l'envoie en requêtes multi-lignes
+                    await cur.executemany(
+                        "INSERT INTO PlanningDetails (planning_id, date_planification, statut) VALUES (%s, %s, %s)",
+                        [(pid, jour, 'À venir') for pid, jours in nouvelles.items() for jour in jours]
+                    )
+                    # Factures de toutes les nouvelles dates (après la dernière date connue) en une requête
+                    etendus = " UNION ALL ".join(
+                        ["SELECT %s AS planning_id, %s AS montant, %s AS axe, CAST(%s AS DATE) AS derniere"]
+                        + ["SELECT %s, %s, %s, %s"] * (len(nouvelles) - 1))
+                    await cur.execute(
+                        f"""INSERT INTO Facture (planning_detail_id, montant, date_traitement, etat, axe)
+                            SELECT pdl.planning_detail_id, e.montant, pdl.date_planification, 'Non payé', e.axe
+                            FROM ({etendus}) e
+                            JOIN PlanningDetails pdl ON pdl.planning_id = e.planning_id
+                                                    AND pdl.date_planification > e.derniere
+                            WHERE NOT EXISTS (SELECT 1 FROM Facture f WHERE f.planning_detail_id = pdl.planning_detail_id)""",
+                        [valeur for pid in nouvelles
+                         for valeur in (pid, plannings[pid].montant, plannings[pid].axe, plannings[pid].derniere)]
+                    )
+                    await cur.executemany(
+                        REQUETES['etendre_fin_planification'].sql,
+                        [(jusqua, pid) for pid in nouvelles]
+                    )
+                    await conn.commit()
+                except Exception as e:
+                    logger.error(f"❌ Erreur etendre_plannings_ouverts: {e}", exc_info=True)
+                    await annuler(conn)
+                    raise
+                finally:
+                    # Connexion peut-être perdue : ne pas masquer l'erreur d'origine (le verrou
+                    # nommé est de toute façon libéré à la fermeture de la session)
+                    try:
+                        await cur.execute("SELECT RELEASE_LOCK('planificator_horizon')")
+                        await cur.fetchall()
+                        await conn.commit()
+                    except Exception as e:
+                        logger.warning(f"⚠️ RELEASE_LOCK planificator_horizon impossible: {e}")
+
+        ajouts = {pid: len(jours) for pid, jours in nouvelles.items()}
+        logger.info(f"✅ {len(ajouts)} planning(s) prolongé(s) jusqu'au {jusqua} - {sum(ajouts.values())} date(s)")
+        self.evenements.publier(PlanningsEtendus(tuple(ajouts), sum(ajouts.values())))
+        return ajouts
+
+    def annees_feries(self):
+        """Années couvertes par JoursFeries : config "feries_annees" [première, dernière] ou autour de l'horizon."""
+        if config.get('feries_annees'):
+            premiere, derniere = config['feries_annees']
+        else:
+            annee = datetime.date.today().year
+            premiere, derniere = annee - 1, annee + HORIZON_ANNEES + 1
+        return range(int(premiere), int(derniere) + 1)
+
+    async def synchroniser_feries(self, annees=None):
+        """
+        Recopie les jours fériés de tester_date dans JoursFeries (scripts/Migration_feries.sql).
+
+        Une transaction : ajout/mise à jour des fériés des `annees` et
+        suppression de ceux qui n'en sont plus. Retourne le nombre de fériés
+        de la période, None si la table est absente ou en cas d'erreur.
+        """
+        annees = annees or self.annees_feries()
+        feries = [(jour, libelle, annee) for annee in annees for libelle, jour in jours_feries(annee).items()]
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                try:
+                    await conn.begin()
+                    await cur.executemany(
+                        """INSERT INTO JoursFeries (date_ferie, libelle, annee) VALUES (%s, %s, %s)
+                           ON DUPLICATE KEY UPDATE libelle = VALUES(libelle), annee = VALUES(annee)""",
+                        feries
+                    )
+                    await cur.execute(
+                        REQUETES['supprimer_feries'].sql,
+                        (annees[0], annees[-1], tuple(jour for jour, _, _ in feries))
+                    )
+                    await conn.commit()
+                    logger.info(f"✅ JoursFeries synchronisée - {len(feries)} fériés ({annees[0]}-{annees[-1]})")
+                    return len(feries)
+                except Exception as e:
+                    await conn.rollback()
+                    if e.args and e.args[0] == 1146:  # Table inexistante
+                        logger.warning("⚠️ Table JoursFeries absente - synchronisation des fériés ignorée")
+                        return None
+                    logger.error(f"❌ Erreur synchroniser_feries: {e}", exc_info=True)
+                    return None
 
     async def get_all_client_name(self, limit=5000):
         """Récupère tous les noms de clients avec LIMIT pour éviter les surcharges."""
@@ -1406,7 +1765,7 @@ class DatabaseManager:
                 try:
                     logger.info(f"📋 Récupération liste clients (limite: {limit})")
                     await cur.execute(
-                        f"""SELECT DISTINCT CONCAT(nom , ' ', prenom) as full_name From Client LIMIT {int(limit)}"""
+                        REQUETES['get_all_client_name'].sql, (int(limit),)
                     )
                     result = await cur.fetchall()
                     logger.info(f"✅ {len(result)} clients récupérés")
@@ -1421,14 +1780,7 @@ class DatabaseManager:
                 try:
                     logger.debug(f"🔍 get_facture_id - client_id={client_id}, date={date}")
                     await cursor.execute(
-                        """SELECT f.facture_id
-                           FROM Facture f
-                           JOIN PlanningDetails pd ON f.planning_detail_id = pd.planning_detail_id
-                           JOIN Planning p ON pd.planning_id = p.planning_id
-                           JOIN Traitement t ON p.traitement_id = t.traitement_id
-                           JOIN Contrat c ON t.contrat_id = c.contrat_id
-                           WHERE c.client_id = %s
-                           AND pd.date_planification = %s;""", (client_id, date)
+                        REQUETES['get_facture_id'].sql, (client_id, date)
                     )
                     result = await cursor.fetchone()
                     logger.debug(f"✅ Facture trouvée: {result}")
@@ -1452,13 +1804,7 @@ class DatabaseManager:
                     await conn.begin()
 
                     # 0. Récupérer la facture pour connaître la date et le traitement
-                    await cursor.execute("""
-                        SELECT f.facture_id, pdl.date_planification, pdl.planning_detail_id, p.planning_id
-                        FROM Facture f
-                        JOIN PlanningDetails pdl ON f.planning_detail_id = pdl.planning_detail_id
-                        JOIN Planning p ON pdl.planning_id = p.planning_id
-                        WHERE f.facture_id = %s
-                    """, (facture_id,))
+                    await cursor.execute(REQUETES['maj_montant_facture'].sql, (facture_id,))
                     current_facture = await cursor.fetchone()
                     
                     if not current_facture:
@@ -1468,7 +1814,7 @@ class DatabaseManager:
                     planning_id = current_facture[3]
                     
                     # 1. Mettre à jour le montant de LA facture actuelle
-                    update_query = "UPDATE Facture SET montant = %s WHERE facture_id = %s;"
+                    update_query = REQUETES['maj_montant'].sql
                     await cursor.execute(update_query, (new_amount, facture_id))
 
                     # 2. Insérer l'entrée d'historique pour la facture actuelle
@@ -1482,19 +1828,13 @@ class DatabaseManager:
 
                     # ✅ CORRECTION: Mettre à jour TOUS les prix futurs du MÊME planning
                     # Récupérer toutes les factures du même planning après cette date
-                    await cursor.execute("""
-                        SELECT f.facture_id, f.montant
-                        FROM Facture f
-                        JOIN PlanningDetails pdl ON f.planning_detail_id = pdl.planning_detail_id
-                        WHERE pdl.planning_id = %s 
-                        AND pdl.date_planification > %s
-                    """, (planning_id, current_date))
+                    await cursor.execute(REQUETES['maj_montant_suivantes'].sql, (planning_id, current_date))
                     future_factures = await cursor.fetchall()
                     
                     # Mettre à jour chaque facture future
                     for future_facture_id, future_montant in future_factures:
                         await cursor.execute(
-                            "UPDATE Facture SET montant = %s WHERE facture_id = %s;",
+                            REQUETES['maj_montant'].sql,
                             (new_amount, future_facture_id)
                         )
                         # Enregistrer dans l'historique
@@ -1507,6 +1847,7 @@ class DatabaseManager:
 
                     # Valider la transaction
                     await conn.commit()
+                    self.evenements.publier(MontantFactureModifie(facture_id, old_amount, new_amount))
                     return True
 
                 except Exception as e:
@@ -1522,69 +1863,27 @@ class DatabaseManager:
         conn = None
         try:
             conn = await self.pool.acquire()
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                query = """
-                        SELECT cl.nom                  AS client_nom,
-                               COALESCE(cl.prenom, '') AS client_prenom,
-                               cl.adresse              AS client_adresse,
-                               cl.telephone            AS client_telephone,
-                               cl.categorie            AS client_categorie,
-                               cl.axe                  AS client_axe,
-                               co.contrat_id,
-                               co.reference_contrat    AS `Référence Contrat`,
-                               co.date_contrat,
-                               co.date_debut           AS contrat_date_debut,
-                               co.date_fin             AS contrat_date_fin,
-                               co.statut_contrat,
-                               co.duree                AS contrat_duree_type,
-                               f.reference_facture     AS `Numéro Facture`,
-                               tt.typeTraitement       AS `Type de Traitement`,
-                               pd.date_planification   AS `Date de Planification`,
-                               pd.statut               AS `Etat du Planning`,
-                               p.redondance            AS `Redondance (Mois)`,
-                               f.date_traitement       AS `Date de Facturation`,
-                               f.etat                  AS `Etat de Paiement`,
-                               f.mode                  AS `Mode de Paiement`,
-                               f.date_cheque         AS `Date de Paiement`,
-                               f.numero_cheque         AS `Numéro du Chèque`,
-                               f.etablissement_payeur   AS `Établissement Payeur`,
-                               COALESCE(
-                                       (SELECT hp.new_amount
-                                        FROM Historique_prix hp
-                                        WHERE hp.facture_id = f.facture_id
-                                        ORDER BY hp.change_date DESC, hp.history_id DESC
-                                        LIMIT 1),
-                                       f.montant
-                               )                       AS `Montant Facturé`
-                        FROM Client cl
-                                 JOIN Contrat co ON cl.client_id = co.client_id
-                                 JOIN Traitement tr ON co.contrat_id = tr.contrat_id
-                                 JOIN TypeTraitement tt ON tr.id_type_traitement = tt.id_type_traitement
-                                 JOIN Planning p ON tr.traitement_id = p.traitement_id
-                                 INNER JOIN PlanningDetails pd ON p.planning_id = pd.planning_id
-                                 INNER JOIN Facture f ON pd.planning_detail_id = f.planning_detail_id
-                        WHERE cl.nom = %s
-                        """
+            async with conn.cursor(curseur(LigneFactureClient)) as cursor:
+                periode = ""
                 params = [client_name]
 
                 if start_date and end_date:
-                    query += " AND f.date_traitement BETWEEN %s AND %s"
+                    periode = "AND f.date_traitement BETWEEN %s AND %s"
                     params.append(start_date)
                     params.append(end_date)
                 elif start_date:
-                    query += " AND f.date_traitement >= %s"
+                    periode = "AND f.date_traitement >= %s"
                     params.append(start_date)
                 elif end_date:
-                    query += " AND f.date_traitement <= %s"
+                    periode = "AND f.date_traitement <= %s"
                     params.append(end_date)
 
-                query += " ORDER BY `Date de Planification` ASC, `Date de Facturation` ASC;"
-
+                query = REQUETES['get_factures_data_for_client_comprehensive'].sql.format(periode=periode)
                 await cursor.execute(query, tuple(params))
                 result = await cursor.fetchall()
                 return result
         except Exception as e:
-            print(f"Erreur lors de la récupération des données de facture complètes : {e}")
+            logger.error(f"❌ Erreur récupération données de facture complètes: {e}")
             return []
         finally:
             if conn:
@@ -1595,44 +1894,8 @@ class DatabaseManager:
         conn = None
         try:
             conn = await self.pool.acquire()
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                query = """
-                        SELECT cl.nom                  AS client_nom,
-                               COALESCE(cl.prenom, '') AS client_prenom,
-                               cl.adresse              AS client_adresse,
-                               cl.telephone            AS client_telephone,
-                               cl.categorie            AS client_categorie,
-                               cl.axe                  AS client_axe,
-                               co.reference_contrat    AS `Référence Contrat`,
-                               f.reference_facture     AS `Numéro Facture`,
-                               f.date_traitement       AS `Date de traitement`,
-                               tt.typeTraitement       AS `Traitement (Type)`,
-                               pd.statut               AS `Etat traitement`,
-                               f.etat                  AS `Etat paiement (Payée ou non)`,
-                               f.mode                  AS `Mode de Paiement`,
-                               f.date_cheque         AS `Date de Paiement`,
-                               f.numero_cheque         AS `Numéro du Chèque`,
-                               f.etablissement_payeur   AS `Établissement Payeur`,
-                               COALESCE(
-                                       (SELECT hp.new_amount
-                                        FROM Historique_prix hp
-                                        WHERE hp.facture_id = f.facture_id
-                                        ORDER BY hp.change_date DESC, hp.history_id DESC
-                                        LIMIT 1),
-                                       f.montant
-                               )                       AS montant_facture
-                        FROM Facture f
-                                 JOIN PlanningDetails pd ON f.planning_detail_id = pd.planning_detail_id
-                                 JOIN Planning p ON pd.planning_id = p.planning_id
-                                 JOIN Traitement tr ON p.traitement_id = tr.traitement_id
-                                 JOIN TypeTraitement tt ON tr.id_type_traitement = tt.id_type_traitement
-                                 JOIN Contrat co ON tr.contrat_id = co.contrat_id
-                                 JOIN Client cl ON co.client_id = cl.client_id
-                        WHERE cl.nom = %s
-                          AND YEAR(f.date_traitement) = %s
-                          AND MONTH(f.date_traitement) = %s
-                        ORDER BY f.date_traitement;
-                        """
+            async with conn.cursor(curseur(LigneFactureMois)) as cursor:
+                query = REQUETES['obtenirDataFactureClient'].sql
                 await cursor.execute(query, (client_name, year, month))
                 result = await cursor.fetchall()
                 logger.info(f"✅ Données factures récupérées - {len(result)} items")
@@ -1648,35 +1911,13 @@ class DatabaseManager:
         conn = None
         try:
             conn = await self.pool.acquire()
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                query = """
-                        SELECT pd.date_planification        AS `Date du traitement`,
-                               tt.typeTraitement            AS `Traitement concerné`,
-                               tt.categorieTraitement       AS `Catégorie du traitement`,
-                               CONCAT(c.nom, ' ', c.prenom) AS `Client concerné`,
-                               c.categorie                  AS `Catégorie du client`,
-                               c.axe                        AS `Axe du client`,
-                               pd.statut                    AS `Etat traitement` -- AJOUT DE CETTE COLONNE
-                        FROM PlanningDetails pd
-                                 JOIN
-                             Planning p ON pd.planning_id = p.planning_id
-                                 JOIN
-                             Traitement t ON p.traitement_id = t.traitement_id
-                                 JOIN
-                             TypeTraitement tt ON t.id_type_traitement = tt.id_type_traitement
-                                 JOIN
-                             Contrat co ON t.contrat_id = co.contrat_id
-                                 JOIN
-                             Client c ON co.client_id = c.client_id
-                        WHERE YEAR(pd.date_planification) = %s
-                          AND MONTH(pd.date_planification) = %s
-                        ORDER BY pd.date_planification;
-                        """
+            async with conn.cursor(curseur(LigneTraitementMois)) as cursor:
+                query = REQUETES['get_traitements_for_month'].sql
                 await cursor.execute(query, (year, month))
                 result = await cursor.fetchall()
                 return result
         except Exception as e:
-            print(f"Erreur lors de la récupération des traitements : {e}")
+            logger.error(f"❌ Erreur récupération traitements: {e}")
             return []
         finally:
             if conn:
@@ -1687,16 +1928,12 @@ class DatabaseManager:
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cursor:
                 try:
-                    await cursor.execute("""SELECT pdl.planning_detail_id,pdl.date_planification
-                                            FROM PlanningDetails pdl
-                                            JOIN Planning p ON pdl.planning_id = p.planning_id
-                                            WHERE p.planning_id = %s 
-                                            AND pdl.date_planification >= %s;""",
+                    await cursor.execute(REQUETES['get_planningdetails_id'].sql,
                                          (planning_id, datetime.datetime.today()))
                     result = await cursor.fetchone()
                     return result
                 except Exception as e:
-                    print('Get details', e)
+                    logger.error(f"❌ Erreur get_planningdetails_id: {e}")
 
     async def get_planning_detail_info(self, planning_detail_id: int):
         """
@@ -1707,26 +1944,13 @@ class DatabaseManager:
         conn = None
         try:
             conn = await self.pool.acquire()  # Obtenir une connexion du pool
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                query = """
-                        SELECT pd.planning_detail_id, \
-                               pd.planning_id, \
-                               pd.date_planification, \
-                               pd.statut, \
-                               p.traitement_id, \
-                               t.contrat_id
-                        FROM PlanningDetails pd \
-                                 JOIN \
-                             Planning p ON pd.planning_id = p.planning_id \
-                                 JOIN \
-                             Traitement t ON p.traitement_id = t.traitement_id
-                        WHERE pd.planning_detail_id = %s; \
-                        """
+            async with conn.cursor(curseur(InfoDetailPlanning)) as cursor:
+                query = REQUETES['get_planning_detail_info'].sql
                 await cursor.execute(query, (planning_detail_id,))
                 result = await cursor.fetchone()
                 return result
         except Exception as e:
-            print(f"Erreur lors de la récupération des informations du planning_detail {planning_detail_id}: {e}")
+            logger.error(f"❌ Erreur récupération planning_detail {planning_detail_id}: {e}")
             return None
         finally:
             if conn:
@@ -1742,15 +1966,16 @@ class DatabaseManager:
         conn = None
         try:
             logger.info(f"📝 Abrogation contrat - planning_detail_id={planning_detail_id}")
-            conn = await self.pool.acquire()
             # 1. Récupérer les informations initiales pour obtenir planning_id et contrat_id
+            # (avant d'acquérir la connexion : get_planning_detail_info en prend une autre)
             detail_info = await self.get_planning_detail_info(planning_detail_id)
             if not detail_info:
                 logger.error(f"❌ Planning detail non trouvé: {planning_detail_id}")
                 return False
+            conn = await self.pool.acquire()
 
-            current_planning_id = detail_info['planning_id']
-            current_contrat_id = detail_info['contrat_id']
+            current_planning_id = detail_info.planning_id
+            current_contrat_id = detail_info.contrat_id
             logger.debug(f"🔍 Contrat={current_contrat_id}, Planning={current_planning_id}")
 
             async with conn.cursor() as cursor:
@@ -1758,11 +1983,7 @@ class DatabaseManager:
                 
                 # 2. Marquer TOUS les PlanningDetails comme 'Classé sans suite' (incluant les passés)
                 try:
-                    mark_planning_details_query = """
-                                                  UPDATE PlanningDetails
-                                                  SET statut = 'Classé sans suite'
-                                                  WHERE planning_id = %s;
-                                                  """
+                    mark_planning_details_query = REQUETES['abrogate_contract_details'].sql
                     await cursor.execute(mark_planning_details_query, (current_planning_id,))
                     marked_count = cursor.rowcount
                     logger.info(f"✅ {marked_count} PlanningDetails marqués comme 'Classé sans suite'")
@@ -1773,11 +1994,7 @@ class DatabaseManager:
 
                 # 3. Marquer tous les PlanningDetails comme 'Classé sans suite'
                 try:
-                    mark_planning_query = """
-                                         UPDATE PlanningDetails
-                                         SET statut = 'Classé sans suite'
-                                         WHERE planning_id = %s;
-                                         """
+                    mark_planning_query = REQUETES['abrogate_contract_details'].sql
                     await cursor.execute(mark_planning_query, (current_planning_id,))
                     logger.info(f"✅ Planning marqué comme 'Classé sans suite' - id={current_planning_id}")
                 except Exception as e:
@@ -1787,13 +2004,7 @@ class DatabaseManager:
 
                 # 4. Mettre à jour le statut du contrat
                 try:
-                    update_contract_query = """
-                                            UPDATE Contrat
-                                            SET statut_contrat = 'Terminé', 
-                                                date_fin       = %s, 
-                                                duree          = 'Déterminée'
-                                            WHERE contrat_id = %s; 
-                                            """
+                    update_contract_query = REQUETES['abrogate_contract'].sql
                     await cursor.execute(update_contract_query, (date, current_contrat_id))
                     logger.info(f"✅ Contrat abrogé - id={current_contrat_id}")
                 except Exception as e:
@@ -1802,12 +2013,11 @@ class DatabaseManager:
                     return False
 
                 await conn.commit()
+                self.evenements.publier(ContratResilie(current_contrat_id, current_planning_id))
                 return True
 
         except Exception as e:
-            print(f"❌ Erreur lors de l'abrogation du contrat: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"❌ Erreur abrogation contrat: {e}", exc_info=True)
             if conn:
                 await conn.rollback()
             return False
@@ -0,0 +1,132 @@
+"""
+Synchronisation incrémentale entre postes partageant la même base.
+
+Les triggers de scripts/Migration_synchro.sql ajoutent une entrée au journal
+JournalModifications à chaque écriture (table, ligne, suppression). Le
+SurveillantVersions relit toutes les quelques secondes les entrées
+postérieures à la dernière vue (parcours de la clé primaire) et ne récupère
+que les lignes de PlanningDetails concernées.
+
+Les identifiants du journal sont attribués à l'insertion mais visibles au
+COMMIT : une transaction lente peut valider l'entrée n après l'entrée n + 1.
+Un identifiant manquant est donc gardé comme « trou » et relu pendant
+`DELAI_TROUS` secondes ; passé ce délai il est tenu pour annulé (ROLLBACK,
+identifiants réservés mais inutilisés).
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Durée d'attente d'un identifiant du journal non encore visible (secondes)
+DELAI_TROUS = 60
+
+
+class SurveillantVersions:
+    """
+    Scrute JournalModifications sur la boucle asyncio de l'application.
+
+    `rappel(tables, suppression, details)` est une coroutine appelée à chaque
+    changement : `tables` est l'ensemble des tables modifiées, `suppression`
+    indique qu'au moins une ligne a été supprimée (les vues doivent alors être
+    rechargées), `details` contient les lignes de PlanningDetails modifiées.
+    """
+
+    def __init__(self, database, intervalle=5, delai_trous=DELAI_TROUS):
+        self.database = database
+        self.intervalle = intervalle
+        self.delai_trous = delai_trous
+        self.plancher = None  # Toutes les entrées <= plancher ont été traitées
+        self.vues = set()  # Entrées > plancher déjà traitées
+        self.trous = {}  # {identifiant manquant: instant de sa détection}
+        self.absent = False
+        self._tache = None
+
+    @property
+    def actif(self):
+        return self._tache is not None and not self._tache.done()
+
+    def demarrer(self, loop, rappel):
+        """Lance la scrutation depuis n'importe quel thread (sans effet si déjà active)."""
+        if not self.actif:
+            self.plancher = None
+            self.vues = set()
+            self.trous = {}
+            self.absent = False
+            self._tache = asyncio.run_coroutine_threadsafe(self._boucle(rappel), loop)
+
+    def arreter(self):
+        if self._tache is not None:
+            self._tache.cancel()
+            self._tache = None
+
+    async def verifier(self):
+        """Une scrutation. Retourne (tables, suppression, details) ou None si rien n'a changé."""
+        if self.plancher is None:
+            # Première lecture: les vues viennent d'être chargées, on ne fait que mémoriser
+            dernier = await self.database.get_derniere_modification()
+            if dernier is False:
+                self.absent = True
+            elif dernier is not None:
+                self.plancher = dernier
+            return None
+
+        entrees = await self.database.get_modifications(self.plancher)
+        if entrees is None:
+            return None
+        nouvelles = [entree for entree in entrees if entree[0] not in self.vues]
+        if not nouvelles:
+            self._avancer(entrees)
+            return None
+
+        tables = {nom_table for _, nom_table, _, _ in nouvelles}
+        suppression = any(supprimee for _, _, _, supprimee in nouvelles)
+        details = []
+        if 'PlanningDetails' in tables and not suppression:
+            modifies = await self.database.get_planning_details_modifies(self.plancher)
+            if modifies is None:
+                return None  # Journal non avancé: nouvel essai au prochain passage
+            identifiants = {entree[0] for entree in nouvelles}
+            # Une ligne par planning_detail_id (la même ligne peut avoir plusieurs entrées)
+            details = list({detail['id']: detail for detail in modifies
+                            if detail['modification'] in identifiants}.values())
+
+        logger.info(f"🔄 Changements détectés: {sorted(tables)} ({len(details)} ligne(s) PlanningDetails)")
+        self.vues.update(entree[0] for entree in nouvelles)
+        self._avancer(entrees)
+        return tables, suppression, details
+
+    def _avancer(self, entrees):
+        """Relève les trous entre les entrées lues et avance le plancher jusqu'au premier trou en attente."""
+        maintenant = time.monotonic()
+        presents = {entree[0] for entree in entrees}
+        if presents:
+            for identifiant in range(self.plancher + 1, max(presents)):
+                if identifiant not in presents and identifiant not in self.vues:
+                    self.trous.setdefault(identifiant, maintenant)
+        for identifiant in presents:
+            self.trous.pop(identifiant, None)
+        expires = [i for i, depuis in self.trous.items() if maintenant - depuis >= self.delai_trous]
+        for identifiant in expires:
+            del self.trous[identifiant]
+        if expires:
+            logger.debug(f"Synchronisation: {len(expires)} entrée(s) du journal jamais validée(s)")
+
+        self.plancher = min(self.trous) - 1 if self.trous else max(presents | self.vues, default=self.plancher)
+        self.vues = {i for i in self.vues if i > self.plancher}
+
+    async def _boucle(self, rappel):
+        logger.info(f"✅ Synchronisation démarrée (intervalle {self.intervalle}s)")
+        while True:
+            try:
+                changements = await self.verifier()
+                if self.absent:
+                    return  # Migration absente: rien à scruter
+                if changements:
+                    await rappel(*changements)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur synchronisation: {e}", exc_info=True)
+            await asyncio.sleep(self.intervalle)
@@ -1,4 +1,5 @@
 from datetime import date, timedelta, datetime
+from functools import lru_cache
 
 
 def ajuster_si_weekend(date):
@@ -51,3 +52,45 @@ def jours_feries(annee):
     })
 
     return feries
+
+
+@lru_cache(maxsize=64)
+def feries_annee(annee):
+    """Ensemble (figé) des jours fériés d'une année, calculé une seule fois par année."""
+    return frozenset(jours_feries(annee).values())
+
+
+def feries_entre(debut, fin):
+    """Jours fériés triés de l'intervalle [debut, fin], sur plusieurs années si besoin."""
+    return sorted(jour
+                  for annee in range(debut.year, fin.year + 1)
+                  for jour in feries_annee(annee)
+                  if debut <= jour <= fin)
+
+
+def est_jour_ouvre(jour):
+    """Un jour est ouvré s'il n'est ni un dimanche ni un jour férié (test en O(1))."""
+    return jour.weekday() != 6 and jour not in feries_annee(jour.year)
+
+
+def jour_ouvre_suivant(jour):
+    """Premier jour ouvré à partir de `jour` (inclus) : couvre ajuster_si_weekend et les fériés."""
+    while not est_jour_ouvre(jour):
+        jour += timedelta(days=1)
+    return jour
+
+
+def ajuster_dates(dates):
+    """Applique jour_ouvre_suivant à une liste de dates (ensembles de fériés récupérés une fois par année)."""
+    feries = {}
+    resultat = []
+    for jour in dates:
+        while True:
+            annee = feries.get(jour.year)
+            if annee is None:
+                annee = feries[jour.year] = feries_annee(jour.year)
+            if jour.weekday() != 6 and jour not in annee:
+                break
+            jour += timedelta(days=1)
+        resultat.append(jour)
+    return resultat
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def setting_bd():
+    """Module setting_bd (nécessite aiomysql et config.json, sinon test ignoré)."""
+    try:
+        import setting_bd
+    except (ImportError, FileNotFoundError) as e:
+        pytest.skip(f"setting_bd indisponible: {e}")
+    return setting_bd
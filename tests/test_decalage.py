@@ -0,0 +1,33 @@
+import asyncio
+from datetime import date
+
+
+class FauxCurseur:
+    """Rejoue les résultats des SELECT et garde les paramètres de l'UPDATE."""
+
+    def __init__(self, depart, lignes):
+        self.resultats = [depart, lignes]
+        self.maj = None
+
+    async def execute(self, sql, params=None):
+        if sql.lstrip().startswith('UPDATE'):
+            self.maj = params
+
+    async def fetchone(self):
+        return self.resultats.pop(0)
+
+    async def fetchall(self):
+        return self.resultats.pop(0)
+
+
+def test_decalage_repart_des_dates_brutes(setting_bd):
+    # Départ le dimanche 1er juin 2025, reporté au lundi 2 : le décalage d'un mois
+    # part du 1er juin et donne le mardi 1er juillet, pas le 2
+    cur = FauxCurseur((date(2025, 6, 1), date(2025, 6, 2)),
+                      [(1, date(2025, 6, 2)), (2, date(2025, 8, 1))])
+
+    changements = asyncio.run(setting_bd.DatabaseManager._decaler_dates(None, cur, 7, date(2025, 6, 2), 1))
+
+    assert changements == [(1, date(2025, 6, 2), date(2025, 7, 1)),
+                           (2, date(2025, 8, 1), date(2025, 9, 1))]
+    assert cur.maj[:4] == [1, date(2025, 7, 1), 2, date(2025, 9, 1)]
@@ -0,0 +1,40 @@
+import asyncio
+
+
+class FauxPool:
+    """Propriétés publiques d'un pool aiomysql."""
+
+    def __init__(self, size, freesize, maxsize):
+        self.size = size
+        self.freesize = freesize
+        self.maxsize = maxsize
+
+
+def _etat(setting_bd, pool):
+    database = setting_bd.DatabaseManager(None)
+    database.pool = pool
+    return asyncio.run(database.get_pool_status())
+
+
+def test_etat_pool(setting_bd):
+    etat = _etat(setting_bd, FauxPool(size=3, freesize=2, maxsize=5))
+    assert etat['total_connections'] == 3
+    assert etat['free_connections'] == 2
+    assert etat['active_connections'] == 1
+    assert etat['max_connections'] == 5
+    assert etat['pool_healthy']
+
+
+def test_pool_sans_connexion_libre_sous_maximum(setting_bd):
+    assert _etat(setting_bd, FauxPool(size=2, freesize=0, maxsize=5))['pool_healthy']
+
+
+def test_pool_epuise(setting_bd):
+    assert not _etat(setting_bd, FauxPool(size=5, freesize=0, maxsize=5))['pool_healthy']
+
+
+def test_etat_pool_instrumente(setting_bd):
+    from instrumentation import PoolInstrumente
+
+    etat = _etat(setting_bd, PoolInstrumente(FauxPool(size=4, freesize=1, maxsize=4)))
+    assert (etat['free_connections'], etat['active_connections']) == (1, 3)
@@ -0,0 +1,43 @@
+import asyncio
+
+import pymysql
+import pytest
+
+
+def _gestionnaire(setting_bd, cles_idempotence, code):
+    """Faux DatabaseManager dont la méthode échoue une fois avec l'erreur MySQL `code`."""
+    politique = setting_bd.PolitiqueReessai(tentatives=3, delai_initial=0, delai_max=0)
+
+    class Gestionnaire:
+        def __init__(self):
+            self.cles_idempotence = cles_idempotence
+            self.appels = 0
+
+        @setting_bd.reessayer(politique, idempotent=True)
+        async def creer(self, *, cle=None):
+            self.appels += 1
+            if self.appels == 1:
+                raise pymysql.err.OperationalError(code, 'erreur simulée')
+            return cle
+
+    return Gestionnaire()
+
+
+def test_connexion_perdue_sans_cle_pas_rejouee(setting_bd):
+    gestionnaire = _gestionnaire(setting_bd, cles_idempotence=False, code=2013)
+    with pytest.raises(pymysql.err.OperationalError):
+        asyncio.run(gestionnaire.creer())
+    assert gestionnaire.appels == 1
+
+
+def test_connexion_perdue_avec_cle_rejouee(setting_bd):
+    gestionnaire = _gestionnaire(setting_bd, cles_idempotence=True, code=2013)
+    cle = asyncio.run(gestionnaire.creer())
+    assert gestionnaire.appels == 2
+    assert cle
+
+
+def test_interblocage_sans_cle_rejoue(setting_bd):
+    gestionnaire = _gestionnaire(setting_bd, cles_idempotence=False, code=1213)
+    asyncio.run(gestionnaire.creer())
+    assert gestionnaire.appels == 2
@@ -0,0 +1,27 @@
+import asyncio
+
+import pymysql
+import pytest
+
+
+class FausseConnexion:
+    async def rollback(self):
+        pass
+
+
+def test_rollback_dans_unite_conserve_l_erreur(setting_bd):
+    unite = setting_bd._ConnexionUnite(FausseConnexion())
+    origine = pymysql.err.IntegrityError(1062, "Duplicate entry 'x' for key 'PRIMARY'")
+
+    async def operation():
+        try:
+            raise origine
+        except Exception:
+            await setting_bd.annuler(unite)
+            raise
+
+    with pytest.raises(setting_bd.UniteAnnulee) as erreur:
+        asyncio.run(operation())
+    assert erreur.value.__cause__ is origine
+    assert 'Duplicate entry' in str(erreur.value)
+    assert unite.annulee and unite.erreur is origine
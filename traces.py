@@ -0,0 +1,192 @@
+"""
+Traces de bout en bout : d'une action de l'interface jusqu'aux requêtes SQL.
+
+Un span mesure une étape (`span`, `@trace`) ; il est rattaché au span
+courant, porté par une ContextVar. Le contexte suit de lui-même
+asyncio.run_coroutine_threadsafe (la coroutine hérite d'une copie du contexte
+du thread appelant) ; pour un callback Clock.schedule_once programmé depuis la
+boucle asyncio, l'envelopper avec `rappel()`, qui le rattache à la trace de
+l'appelant et mesure aussi l'attente avant son exécution par Clock.
+
+Les spans sont écrits au format Chrome trace (JSON, à ouvrir dans
+chrome://tracing ou ui.perfetto.dev) par un thread d'écriture : enregistrer
+un span ne fait qu'ajouter un dict à une file. Les spans exécutés sur la
+boucle asyncio sont des événements asynchrones ('b'/'e', identifiés par la
+trace) : les coroutines s'y entrelacent sur un même thread, ce que les
+événements complets ('X', à imbrication stricte par thread) ne représentent
+pas ; les autres threads (Kivy, écriture) gardent des événements 'X'.
+Désactivé par défaut ("traces":
+true dans config.json) ; tant que le traceur est inactif, `span` et `rappel`
+ne coûtent qu'un test.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+_identifiants = itertools.count(1)
+
+
+class _Span:
+    __slots__ = ('trace', 'id')
+
+    def __init__(self, trace, identifiant):
+        self.trace = trace
+        self.id = identifiant
+
+
+# Span en cours dans le contexte courant (None hors trace)
+_courant = contextvars.ContextVar('span_courant', default=None)
+
+
+class Traceur:
+    """File des événements et thread d'écriture du fichier de trace."""
+
+    def __init__(self):
+        self.actif = False
+        self.chemin = None
+        self._file = queue.SimpleQueue()
+        self._ecrivain = None
+        self._threads_nommes = set()
+
+    def activer(self, chemin):
+        if self.actif:
+            return
+        self.chemin = chemin
+        self.actif = True
+        self._ecrivain = threading.Thread(target=self._ecrire, name='traces', daemon=True)
+        self._ecrivain.start()
+
+    def arreter(self):
+        """Écrit les spans en attente et ferme le fichier."""
+        if not self.actif:
+            return
+        self.actif = False
+        self._file.put(None)
+        self._ecrivain.join(timeout=5)
+
+    def enregistrer(self, nom, categorie, debut, fin, args):
+        thread = threading.current_thread()
+        if thread.ident not in self._threads_nommes:
+            self._threads_nommes.add(thread.ident)
+            self._file.put({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': thread.ident,
+                            'args': {'name': thread.name}})
+        if _sur_boucle():
+            # Chrome imbrique les événements asynchrones par (cat, id) : une catégorie
+            # commune pour que toute la trace soit un seul arbre, la vraie dans args
+            commun = {'name': nom, 'cat': 'asyncio', 'id': args.get('trace'), 'pid': os.getpid(),
+                      'tid': thread.ident}
+            self._file.put({**commun, 'ph': 'b', 'ts': debut * 1e6, 'args': {'categorie': categorie, **args}})
+            self._file.put({**commun, 'ph': 'e', 'ts': fin * 1e6})
+            return
+        self._file.put({'name': nom, 'cat': categorie, 'ph': 'X', 'pid': os.getpid(), 'tid': thread.ident,
+                        'ts': debut * 1e6, 'dur': (fin - debut) * 1e6, 'args': args})
+
+    def _ecrire(self):
+        with open(self.chemin, 'w', encoding='utf-8') as fichier:
+            fichier.write('[\n')
+            premier = True
+            while True:
+                evenement = self._file.get()
+                if evenement is None:
+                    break
+                fichier.write(('' if premier else ',\n') + json.dumps(evenement, ensure_ascii=False, default=str))
+                premier = False
+                if self._file.empty():
+                    fichier.flush()
+            fichier.write('\n]\n')
+
+
+traceur = Traceur()
+
+
+def _sur_boucle():
+    """True si l'appelant s'exécute dans une tâche asyncio."""
+    try:
+        return asyncio.current_task() is not None
+    except RuntimeError:
+        return False
+
+
+@contextmanager
+def span(nom, categorie='ui', **args):
+    """Mesure le bloc comme un span enfant du span courant (ou début d'une nouvelle trace)."""
+    if not traceur.actif:
+        yield None
+        return
+    parent = _courant.get()
+    identifiant = next(_identifiants)
+    courant = _Span(parent.trace if parent is not None else identifiant, identifiant)
+    jeton = _courant.set(courant)
+    debut = time.perf_counter()
+    try:
+        yield courant
+    finally:
+        fin = time.perf_counter()
+        _courant.reset(jeton)
+        traceur.enregistrer(nom, categorie, debut, fin,
+                            {'trace': courant.trace, 'span': courant.id,
+                             'parent': parent.id if parent is not None else None, **args})
+
+
+def etape(nom, categorie, debut, fin, **args):
+    """Span déjà chronométré (debut/fin en time.perf_counter()), enfant du span courant."""
+    if not traceur.actif:
+        return
+    parent = _courant.get()
+    identifiant = next(_identifiants)
+    traceur.enregistrer(nom, categorie, debut, fin,
+                        {'trace': parent.trace if parent is not None else identifiant, 'span': identifiant,
+                         'parent': parent.id if parent is not None else None, **args})
+
+
+def trace(nom=None, categorie='ui'):
+    """Décorateur : chaque appel de la fonction (ou coroutine) est un span."""
+    def decorator(func):
+        libelle = nom or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with span(libelle, categorie):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with span(libelle, categorie):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def rappel(fonction, nom=None):
+    """
+    Enveloppe un callback Clock pour qu'il s'exécute dans la trace de l'appelant.
+
+        Clock.schedule_once(rappel(lambda dt: self.maj_ecran(), 'maj_ecran'), 0)
+
+    Deux spans : 'attente Clock' (de la programmation à l'exécution) puis le
+    callback lui-même. Sans traceur actif, renvoie `fonction` inchangée.
+    """
+    if not traceur.actif:
+        return fonction
+    contexte = contextvars.copy_context()
+    programme = time.perf_counter()
+    libelle = nom or getattr(fonction, '__qualname__', 'rappel')
+
+    def executer(*args):
+        parent = _courant.get()
+        if parent is not None:
+            traceur.enregistrer('attente Clock', 'clock', programme, time.perf_counter(),
+                                {'trace': parent.trace, 'parent': parent.id, 'rappel': libelle})
+        with span(libelle, 'clock'):
+            return fonction(*args)
+
+    return lambda *args: contexte.run(executer, *args)
@@ -0,0 +1,217 @@
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+COULEURS_ETAT = {
+    "Effectué": '008000',
+    "À venir": 'ff0000',
+    "Classé sans suite": 'FFA500'
+}
+
+
+@lru_cache(maxsize=4096)
+def inverser_date(ex_date):
+    """Inverse une date AAAA-MM-JJ <-> JJ-MM-AAAA (résultat mis en cache)."""
+    if not ex_date:
+        return 'N/A'
+    date_str = str(ex_date).strip()
+    parts = date_str.split('-')
+    if len(parts) != 3:
+        return date_str  # Format inattendu: renvoyé tel quel
+    y, m, d = parts
+    return f'{d}-{m}-{y}'
+
+
+@lru_cache(maxsize=128)
+def format_frequence(redondance):
+    """Formate une redondance (int ou GROUP_CONCAT '1,3') : 0='1 jour', 1='1 mois', ..."""
+    if redondance is None:
+        return '0 mois'
+    return ', '.join('1 jour' if int(val) == 0 else f'{int(val)} mois'
+                     for val in str(redondance).split(','))
+
+
+def ligne_coloree(couleurs, source):
+    """(date, traitement, etat, axe) → tuple balisé [color=...] pour les tableaux Home."""
+    date, traitement, etat, axe = source
+    color = couleurs.get(etat, "000000")
+    return tuple(f"[color={color}]{valeur}[/color]"
+                 for valeur in (inverser_date(date), traitement, etat, axe))
+
+
+def ligne_prevision(source):
+    date, traitement, etat, axe = source
+    return inverser_date(date), traitement, etat, axe
+
+
+def ligne_contrat(source):
+    """Ligne de get_client → (client, date, traitement, fréquence)."""
+    client = source[0] if source[0] is not None else "N/A"
+    date = inverser_date(source[1]) if source[1] is not None else "N/A"
+    traitement = source[7] if source[7] is not None else "N/A"
+    return client, date, traitement, format_frequence(source[3])
+
+
+def ligne_client(source):
+    """Ligne de get_all_client → (client, email, adresse, date du contrat)."""
+    return source[1], source[2], source[3], inverser_date(source[4])
+
+
+def ligne_planning(source):
+    """Ligne de get_all_planning → (client, traitement, fréquence, option)."""
+    client = source[0] if source[0] is not None else "N/A"
+    traitement = source[1] if source[1] is not None else "N/A"
+    return client, traitement, format_frequence(source[2]), 'Aucun decalage'
+
+
+class VueTableau:
+    """
+    Convertit des lignes BD en tuples d'affichage une seule fois.
+
+    Les lignes formatées sont mises en cache par ligne source : lors d'un
+    rafraîchissement, seules les lignes nouvelles ou modifiées sont reformatées.
+    Un formateur peut retourner None pour écarter une ligne invalide.
+    `cle_primaire` identifie une ligne d'un rafraîchissement à l'autre (voir
+    TableSynchronisee) ; par défaut c'est la ligne source elle-même.
+    """
+
+    def __init__(self, formateur, cle=tuple, minimum=0, cle_primaire=None):
+        self._formateur = formateur
+        self._cle = cle
+        self._minimum = minimum
+        self._cle_primaire = cle_primaire
+        self._cache = {}
+        self.sources = []
+        self.lignes = []
+        self.cles = []
+
+    def actualiser(self, donnees):
+        ancien = self._cache
+        cache = {}
+        sources = []
+        lignes = []
+        cles = []
+        reformatees = 0
+
+        for donnee in donnees or []:
+            try:
+                cle = self._cle(donnee)
+                if len(cle) < self._minimum:
+                    logger.warning(f"⚠️ Ligne incomplète ignorée: {donnee}")
+                    continue
+                if cle in cache:
+                    ligne = cache[cle]
+                elif cle in ancien:
+                    ligne = ancien[cle]
+                else:
+                    ligne = self._formateur(cle)
+                    reformatees += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Ligne ignorée ({e}): {donnee}")
+                continue
+
+            cache[cle] = ligne
+            if ligne is not None:
+                sources.append(donnee)
+                lignes.append(ligne)
+                cles.append(self._cle_primaire(donnee) if self._cle_primaire else cle)
+
+        self._cache = cache
+        self.sources = sources
+        self.lignes = lignes
+        self.cles = cles
+        logger.debug(f"VueTableau: {len(lignes)} lignes, {reformatees} reformatées")
+        return lignes
+
+    def vider(self):
+        self._cache = {}
+        self.sources = []
+        self.lignes = []
+        self.cles = []
+
+
+class TableSynchronisee:
+    """
+    Met à jour un MDDataTable ligne à ligne, par clé primaire.
+
+    Les lignes supprimées, modifiées et ajoutées en fin de tableau passent par
+    remove_row / update_row / add_row ; les autres lignes ne sont pas
+    touchées. Les données sont réaffectées en bloc (`row_data`) au premier
+    chargement, quand l'ordre change (ex: changement de date, insertion au
+    milieu) et quand plus de la moitié des lignes changent. Le widget n'est
+    plus retiré puis réajouté à son parent, ce qui supprime le scintillement.
+    À appeler depuis le thread principal Kivy.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.cles = []
+
+    def placer(self, parent):
+        """Ajoute le tableau à `parent` s'il n'y est pas déjà. Retourne True s'il a été (re)placé."""
+        if self.table.parent is parent:
+            return False
+        if self.table.parent:
+            self.table.parent.remove_widget(self.table)
+        parent.add_widget(self.table)
+        return True
+
+    def est_place(self, parent):
+        return self.table.parent is parent
+
+    def reinitialiser(self):
+        self.cles = []
+
+    def appliquer(self, cles, lignes):
+        """
+        Applique le diff entre les lignes affichées et (cles, lignes).
+
+        Retourne le nombre de lignes insérées, supprimées ou modifiées (0 :
+        tableau intact).
+        """
+        cles = list(cles)
+        lignes = list(lignes)
+        actuelles = list(self.table.row_data)
+        if cles == self.cles and lignes == actuelles:
+            return 0
+
+        # remove_row / update_row retrouvent la ligne par sa valeur : lignes et clés doivent être uniques
+        coherent = (self.cles and len(actuelles) == len(self.cles)
+                    and len(set(self.cles)) == len(self.cles) and len(set(cles)) == len(cles)
+                    and len(set(map(tuple, actuelles))) == len(actuelles))
+        if not coherent:
+            return self._remplacer(cles, lignes)
+
+        avant = dict(zip(self.cles, actuelles))
+        apres = dict(zip(cles, lignes))
+        conservees = [cle for cle in cles if cle in avant]
+        # add_row ajoute en fin : l'ordre des lignes conservées doit être inchangé et les ajouts en dernier
+        if [cle for cle in self.cles if cle in apres] != conservees or cles[:len(conservees)] != conservees:
+            return self._remplacer(cles, lignes)
+
+        supprimees = [cle for cle in self.cles if cle not in apres]
+        modifiees = [cle for cle in conservees if avant[cle] != apres[cle]]
+        ajoutees = cles[len(conservees):]
+        changements = len(supprimees) + len(modifiees) + len(ajoutees)
+        valeurs = set(map(tuple, actuelles))
+        if (changements > max(1, len(lignes) // 2)
+                or any(tuple(apres[cle]) in valeurs for cle in modifiees + ajoutees)):
+            return self._remplacer(cles, lignes, changements)
+
+        for cle in supprimees:
+            self.table.remove_row(avant[cle])
+        for cle in modifiees:
+            self.table.update_row(avant[cle], apres[cle])
+        for cle in ajoutees:
+            self.table.add_row(apres[cle])
+        self.cles = cles
+        logger.debug(f"TableSynchronisee: {len(supprimees)} supprimée(s), {len(modifiees)} modifiée(s), "
+                     f"{len(ajoutees)} ajoutée(s)")
+        return changements
+
+    def _remplacer(self, cles, lignes, changements=None):
+        self.table.row_data = lignes
+        self.cles = cles
+        logger.debug(f"TableSynchronisee: {changements or len(lignes)} changement(s), données remplacées")
+        return changements if changements is not None else len(lignes)